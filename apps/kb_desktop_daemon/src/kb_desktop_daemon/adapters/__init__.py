@@ -1,16 +1,28 @@
+from kb_desktop_daemon.adapters.artifact_store import LocalArtifactStore
 from kb_desktop_daemon.adapters.blob_store import LocalBlobStore
 from kb_desktop_daemon.adapters.chroma_vector import ChromaVectorIndex
+from kb_desktop_daemon.adapters.embedding_cache import SQLiteEmbeddingCache
+from kb_desktop_daemon.adapters.gateway import ProviderGateway
+from kb_desktop_daemon.adapters.hashing_embedder import HashingEmbedder
 from kb_desktop_daemon.adapters.parsers import DocxParser, PdfParser, TextParser, default_parsers
 from kb_desktop_daemon.adapters.providers import ProviderFactory
+from kb_desktop_daemon.adapters.rerankers import TermOverlapReranker
 from kb_desktop_daemon.adapters.sqlite_store import SQLiteRepository
+from kb_desktop_daemon.adapters.token_counters import TokenizerFileCounter
 
 __all__ = [
     "ChromaVectorIndex",
     "DocxParser",
+    "HashingEmbedder",
+    "LocalArtifactStore",
     "LocalBlobStore",
     "PdfParser",
     "ProviderFactory",
+    "ProviderGateway",
+    "SQLiteEmbeddingCache",
     "SQLiteRepository",
+    "TermOverlapReranker",
     "TextParser",
+    "TokenizerFileCounter",
     "default_parsers",
-]
+]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import glob
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from kb_core.models import ParsedDocument, ParsedSection
+
+
+class _GzipArtifactWriter:
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._tmp = path.with_name(f".{path.name}.{uuid4().hex}.tmp")
+        self._handle = gzip.open(self._tmp, "wt", encoding="utf-8", compresslevel=6)
+
+    def add(self, section: ParsedSection) -> None:
+        self._handle.write(json.dumps({"text": section.text, "metadata": section.metadata}, ensure_ascii=False))
+        self._handle.write("\n")
+
+    def commit(self, metadata: dict[str, Any]) -> None:
+        # The document-level metadata is only known once every section has streamed through.
+        self._handle.write(json.dumps({"document_metadata": metadata}, ensure_ascii=False))
+        self._handle.write("\n")
+        self._handle.close()
+        os.replace(self._tmp, self._path)
+
+    def abort(self) -> None:
+        self._handle.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class LocalArtifactStore:
+    """Gzipped JSON-lines parse results, one file per key: a line per section, then a metadata trailer.
+
+    Files are written to a temporary name and renamed on commit, so readers never see a partial artifact.
+    """
+
+    def __init__(self, base_dir: str) -> None:
+        self._base_dir = Path(base_dir)
+        self._base_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self._base_dir / f"{key}.jsonl.gz"
+
+    def open_writer(self, key: str) -> _GzipArtifactWriter:
+        return _GzipArtifactWriter(self._path(key))
+
+    def delete_prefix(self, prefix: str) -> None:
+        for path in self._base_dir.glob(f"{glob.escape(prefix)}*.jsonl.gz"):
+            path.unlink(missing_ok=True)
+
+    def read(self, key: str) -> ParsedDocument | None:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        sections: list[ParsedSection] = []
+        metadata: dict[str, Any] | None = None
+        with gzip.open(path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                record = json.loads(line)
+                if "document_metadata" in record:
+                    metadata = record["document_metadata"]
+                else:
+                    sections.append(ParsedSection(text=record["text"], metadata=record["metadata"]))
+        if metadata is None:
+            return None
+        return ParsedDocument(text="".join(section.text for section in sections), metadata=metadata, sections=sections)
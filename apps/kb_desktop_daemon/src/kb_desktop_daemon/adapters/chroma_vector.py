@@ -1,19 +1,103 @@
 from __future__ import annotations
 
+import heapq
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
 from typing import TYPE_CHECKING, Any
 
 import chromadb
+from chromadb.errors import ChromaError
 from kb_core.models import MetadataFilter, VectorHit, VectorItem
 
 if TYPE_CHECKING:
     from kb_desktop_daemon.adapters.sqlite_store import SQLiteRepository
 
 
+# (score, vector id, collection name, metadata, embedding): one raw candidate, cheap to merge.
+_Candidate = tuple[float, str, str, dict[str, Any], Any]
+
+
 class ChromaVectorIndex:
-    def __init__(self, persist_dir: str, repo: SQLiteRepository | None = None) -> None:
+    """Chroma-backed vector index with one Chroma collection per knowledge-base collection.
+
+    A query over several collections searches them concurrently on ``query_workers`` threads and
+    k-way merges the already ranked results, so latency tracks the slowest collection rather than
+    the sum, and hit objects are built only for the final ``top_k``.
+
+    Collection handles and the set of indexed collection ids are cached for the life of the
+    adapter and updated when collections are created or deleted through it, so steady-state
+    queries make no catalog calls. The adapter assumes it is the only writer to ``persist_dir``;
+    after outside changes, call :meth:`invalidate`.
+    """
+
+    def __init__(self, persist_dir: str, repo: SQLiteRepository | None = None, query_workers: int = 4) -> None:
         self._client = chromadb.PersistentClient(path=persist_dir)
         self._repo = repo
+        self._lock = threading.Lock()
+        self._handles: dict[str, Any] = {}
+        # Replaced, never mutated, so readers can iterate it without the lock.
+        self._known_ids: frozenset[str] | None = None
+        self._executor = (
+            ThreadPoolExecutor(max_workers=query_workers, thread_name_prefix="kb-chroma-query")
+            if query_workers > 1
+            else None
+        )
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    def invalidate(self) -> None:
+        """Forget every cached handle and the known-collection list; both reload on next use."""
+        with self._lock:
+            self._handles.clear()
+            self._known_ids = None
+
+    def _known(self) -> frozenset[str]:
+        known = self._known_ids
+        if known is None:
+            with self._lock:
+                if self._known_ids is None:
+                    names = (
+                        entry.name if hasattr(entry, "name") else str(entry)
+                        for entry in self._client.list_collections()
+                    )
+                    self._known_ids = frozenset(
+                        self._to_collection_id(name) for name in names if name.startswith("kb_")
+                    )
+                known = self._known_ids
+        return known
+
+    def _handle(self, collection_id: str, *, create: bool = False) -> Any:
+        """The open collection, or ``None`` when nothing was ever indexed into it and ``create`` is off."""
+        handle = self._handles.get(collection_id)
+        if handle is not None:
+            return handle
+        if not create and collection_id not in self._known():
+            return None
+        with self._lock:
+            handle = self._handles.get(collection_id)
+            if handle is None:
+                name = self._collection_name(collection_id)
+                try:
+                    handle = (
+                        self._client.get_or_create_collection(name=name)
+                        if create
+                        else self._client.get_collection(name)
+                    )
+                except (ChromaError, ValueError):
+                    if create:
+                        raise
+                    # Deleted behind our back: drop it from the known list.
+                    self._known_ids = None
+                    return None
+                self._handles[collection_id] = handle
+                if self._known_ids is not None:
+                    self._known_ids = self._known_ids | {collection_id}
+        return handle
 
     @staticmethod
     def _collection_name(collection_id: str) -> str:
@@ -34,87 +118,136 @@ class ChromaVectorIndex:
         return clean
 
     def upsert(self, items: list[VectorItem]) -> None:
+        """Upsert vectors, then record their chunk mappings in a single SQLite transaction.
+
+        The batch is all or nothing: if a Chroma write or the mapping transaction fails, vectors
+        already written by this call are deleted again before the error propagates, so neither store
+        keeps rows the other lacks. Vector ids are fresh per chunk, so nothing older is lost by that.
+        """
         grouped: dict[str, list[VectorItem]] = {}
         for item in items:
             grouped.setdefault(item.collection_id, []).append(item)
 
-        for collection_id, group_items in grouped.items():
-            coll = self._client.get_or_create_collection(name=self._collection_name(collection_id))
-            ids = [item.id for item in group_items]
-            vectors = [item.vector for item in group_items]
-            metadatas = [
-                self._sanitize_metadata(
-                    {
-                        "collection_id": item.collection_id,
-                        "document_id": item.document_id,
-                        "chunk_id": item.chunk_id,
-                        **item.metadata,
-                    }
-                )
-                for item in group_items
-            ]
-            documents = [item.chunk_id for item in group_items]
-            coll.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=documents)
+        applied: list[tuple[Any, list[str]]] = []
+        try:
+            for collection_id, group_items in grouped.items():
+                coll = self._handle(collection_id, create=True)
+                ids = [item.id for item in group_items]
+                vectors = [item.vector for item in group_items]
+                metadatas = [
+                    self._sanitize_metadata(
+                        {
+                            "collection_id": item.collection_id,
+                            "document_id": item.document_id,
+                            "chunk_id": item.chunk_id,
+                            **item.metadata,
+                        }
+                    )
+                    for item in group_items
+                ]
+                documents = [item.chunk_id for item in group_items]
+                coll.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=documents)
+                applied.append((coll, ids))
 
             if self._repo is not None:
-                for item in group_items:
-                    self._repo.upsert_chunk_vector_map(
-                        chunk_id=item.chunk_id,
-                        collection_id=item.collection_id,
-                        document_id=item.document_id,
-                        vector_id=item.id,
-                    )
+                self._repo.upsert_chunk_vector_map_many(
+                    [(item.chunk_id, item.collection_id, item.document_id, item.id) for item in items]
+                )
+        except Exception:
+            for coll, ids in applied:
+                try:
+                    coll.delete(ids=ids)
+                except (ChromaError, ValueError):
+                    pass
+            raise
 
     def query(
         self,
         vector: list[float],
         top_k: int,
         filter: MetadataFilter | None = None,
+        collection_ids: list[str] | None = None,
+        include_vectors: bool = False,
     ) -> list[VectorHit]:
         where = filter.equals if filter and filter.equals else None
-        hits: list[VectorHit] = []
-
-        for collection in self._list_collections():
-            result = collection.query(
-                query_embeddings=[vector],
-                n_results=top_k,
-                where=where,
-            )
-            ids = result.get("ids", [[]])[0]
-            distances = result.get("distances", [[]])[0]
-            metadatas = result.get("metadatas", [[]])[0]
-
-            for chunk_id, distance, metadata in zip(ids, distances, metadatas, strict=False):
-                metadata = metadata or {}
-                score = 1.0 - float(distance)
-                collection_id = str(metadata.get("collection_id") or self._to_collection_id(collection.name))
-                document_id = str(metadata.get("document_id") or "")
-                resolved_chunk_id = str(metadata.get("chunk_id") or chunk_id)
-                hits.append(
-                    VectorHit(
-                        id=str(chunk_id),
-                        score=score,
-                        collection_id=collection_id,
-                        document_id=document_id,
-                        chunk_id=resolved_chunk_id,
-                        metadata=metadata,
-                    )
-                )
+        collections = self._list_collections(collection_ids)
+        search = partial(self._search, vector=vector, top_k=top_k, where=where, include_vectors=include_vectors)
+        if self._executor is None or len(collections) <= 1:
+            ranked = [search(collection) for collection in collections]
+        else:
+            ranked = list(self._executor.map(search, collections))
+        # Chroma returns each collection nearest-first; ties keep collection order, as a stable sort would.
+        merged = heapq.merge(*ranked, key=lambda candidate: -candidate[0])
+        return [self._to_hit(*candidate) for candidate in islice(merged, top_k)]
 
-        hits.sort(key=lambda item: item.score, reverse=True)
-        return hits[:top_k]
+    @staticmethod
+    def _search(
+        collection: Any, *, vector: list[float], top_k: int, where: dict[str, Any] | None, include_vectors: bool
+    ) -> list[_Candidate]:
+        result = collection.query(
+            query_embeddings=[vector],
+            n_results=top_k,
+            where=where,
+            include=["metadatas", "distances", "embeddings"] if include_vectors else ["metadatas", "distances"],
+        )
+        ids = result.get("ids", [[]])[0]
+        distances = result.get("distances", [[]])[0]
+        metadatas = result.get("metadatas", [[]])[0]
+        embeddings = result.get("embeddings") if include_vectors else None
+        rows = embeddings[0] if embeddings is not None else [None] * len(ids)
+        return [
+            (1.0 - float(distance), str(vector_id), collection.name, metadata or {}, row)
+            for vector_id, distance, metadata, row in zip(ids, distances, metadatas, rows, strict=False)
+        ]
+
+    def _to_hit(
+        self, score: float, vector_id: str, collection_name: str, metadata: dict[str, Any], row: Any
+    ) -> VectorHit:
+        return VectorHit(
+            id=vector_id,
+            score=score,
+            collection_id=str(metadata.get("collection_id") or self._to_collection_id(collection_name)),
+            document_id=str(metadata.get("document_id") or ""),
+            chunk_id=str(metadata.get("chunk_id") or vector_id),
+            metadata=metadata,
+            vector=row,
+        )
+
+    def get_vectors(self, collection_id: str, vector_ids: list[str]) -> dict[str, list[float]]:
+        coll = self._handle(collection_id) if vector_ids else None
+        if coll is None:
+            return {}
+        result = coll.get(ids=vector_ids, include=["embeddings"])
+        embeddings = result.get("embeddings")
+        if embeddings is None:
+            return {}
+        return {
+            str(vector_id): [float(value) for value in embedding]
+            for vector_id, embedding in zip(result.get("ids", []), embeddings, strict=False)
+        }
 
     def delete_by_document(self, collection_id: str, document_id: str) -> None:
-        coll = self._client.get_or_create_collection(name=self._collection_name(collection_id))
-        coll.delete(where={"document_id": document_id})
+        coll = self._handle(collection_id)
+        if coll is not None:
+            coll.delete(where={"document_id": document_id})
         if self._repo is not None:
             self._repo.delete_chunk_vector_map_by_document(document_id=document_id)
 
-    def _list_collections(self) -> list[Any]:
-        collections = self._client.list_collections()
-        resolved = []
-        for entry in collections:
-            name = entry.name if hasattr(entry, "name") else str(entry)
-            if name.startswith("kb_"):
-                resolved.append(self._client.get_collection(name=name))
-        return resolved
+    def delete_collection(self, collection_id: str) -> None:
+        with self._lock:
+            self._handles.pop(collection_id, None)
+            if self._known_ids is not None:
+                self._known_ids = self._known_ids - {collection_id}
+            try:
+                self._client.delete_collection(self._collection_name(collection_id))
+            except (ChromaError, ValueError):
+                # Nothing was ever indexed into this collection.
+                pass
+
+    def _list_collections(self, collection_ids: list[str] | None = None) -> list[Any]:
+        known = self._known()
+        wanted = (
+            sorted(known) if collection_ids is None else [cid for cid in dict.fromkeys(collection_ids) if cid in known]
+        )
+        handles = (self._handle(collection_id) for collection_id in wanted)
+        return [handle for handle in handles if handle is not None]
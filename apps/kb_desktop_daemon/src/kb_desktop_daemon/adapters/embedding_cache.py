@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any
+
+# Stay well below SQLite's default host parameter limit when building IN (...) lists.
+_MAX_PARAMS = 500
+
+
+class SQLiteEmbeddingCache:
+    """Persistent float32 vector cache keyed by (provider, model, text hash) with LRU eviction."""
+
+    def __init__(self, db_path: str, max_bytes: int) -> None:
+        self._db_path = db_path
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._evictions = 0
+        self._init_schema()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), COALESCE(MAX(last_used), 0) FROM embedding_cache"
+            ).fetchone()
+        self._entries = int(row[0])
+        self._total_bytes = int(row[1])
+        self._clock = float(row[2])
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (provider, model, text_hash)
+                ) WITHOUT ROWID;
+
+                CREATE INDEX IF NOT EXISTS idx_embedding_cache_lru ON embedding_cache(last_used);
+                """
+            )
+            conn.commit()
+
+    def _tick(self) -> float:
+        # Strictly increasing wall-clock stamp so LRU order survives restarts and never ties.
+        self._clock = max(time.time(), self._clock + 1e-6)
+        return self._clock
+
+    @staticmethod
+    def _encode(vector: list[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _decode(blob: bytes) -> list[float]:
+        values = array("f")
+        values.frombytes(blob)
+        return values.tolist()
+
+    def get_many(self, provider: str, model: str, text_hashes: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        if not text_hashes:
+            return found
+        with self._connect() as conn:
+            for start in range(0, len(text_hashes), _MAX_PARAMS):
+                batch = text_hashes[start : start + _MAX_PARAMS]
+                placeholders = ",".join("?" for _ in batch)
+                rows = conn.execute(
+                    f"""
+                    SELECT text_hash, vector FROM embedding_cache
+                    WHERE provider = ? AND model = ? AND text_hash IN ({placeholders})
+                    """,
+                    (provider, model, *batch),
+                ).fetchall()
+                for row in rows:
+                    found[row["text_hash"]] = self._decode(row["vector"])
+        if found:
+            with self._lock, self._connect() as conn:
+                now = self._tick()
+                conn.executemany(
+                    "UPDATE embedding_cache SET last_used = ? WHERE provider = ? AND model = ? AND text_hash = ?",
+                    [(now, provider, model, digest) for digest in found],
+                )
+                conn.commit()
+        return found
+
+    def put_many(self, provider: str, model: str, vectors: dict[str, list[float]]) -> None:
+        if not vectors:
+            return
+        with self._lock, self._connect() as conn:
+            for digest, vector in vectors.items():
+                blob = self._encode(vector)
+                now = self._tick()
+                cursor = conn.execute(
+                    """
+                    INSERT INTO embedding_cache(provider, model, text_hash, dim, vector, size_bytes, last_used)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(provider, model, text_hash) DO NOTHING
+                    """,
+                    (provider, model, digest, len(vector), blob, len(blob), now),
+                )
+                if cursor.rowcount > 0:
+                    self._entries += 1
+                    self._total_bytes += len(blob)
+            if self._total_bytes > self._max_bytes:
+                self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Evict down to 90% of the budget so that a full cache does not evict on every insert.
+        excess = self._total_bytes - int(self._max_bytes * 0.9)
+        victims: list[tuple[str, str, str]] = []
+        freed = 0
+        for row in conn.execute(
+            "SELECT provider, model, text_hash, size_bytes FROM embedding_cache ORDER BY last_used ASC"
+        ):
+            victims.append((row["provider"], row["model"], row["text_hash"]))
+            freed += row["size_bytes"]
+            if freed >= excess:
+                break
+        conn.executemany(
+            "DELETE FROM embedding_cache WHERE provider = ? AND model = ? AND text_hash = ?",
+            victims,
+        )
+        self._entries -= len(victims)
+        self._total_bytes -= freed
+        self._evictions += len(victims)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": self._entries,
+                "size_bytes": self._total_bytes,
+                "max_bytes": self._max_bytes,
+                "evictions": self._evictions,
+            }
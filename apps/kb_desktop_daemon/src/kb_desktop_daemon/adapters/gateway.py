@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import (
+    AbstractAsyncContextManager,
+    AbstractContextManager,
+    asynccontextmanager,
+    contextmanager,
+    nullcontext,
+)
+from typing import Any
+
+# Responses that mean the provider is saturated rather than that the request was bad.
+OVERLOAD_STATUS = frozenset({429, 502, 503, 504})
+
+
+class TokenBucket:
+    """Reservation-style token bucket: callers take what they need now and sleep off any debt.
+
+    A request larger than the bucket is still admitted, after waiting for the balance to pay it.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        self._rate = rate_per_second
+        self._capacity = max(capacity, 1.0)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens and return how many seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(-self._tokens / self._rate, 0.0)
+
+    def available(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self._capacity, self._tokens + elapsed * self._rate)
+
+
+class _Waiter:
+    __slots__ = ("granted", "wake")
+
+    def __init__(self, wake: Callable[[], None]) -> None:
+        self.granted = False
+        self.wake = wake
+
+
+class AimdLimiter:
+    """Concurrency limit that grows additively while healthy and halves on overload.
+
+    Overload is a throttling response or a short-term latency average climbing above
+    ``latency_tolerance`` times the long-term one. Latency averages are kept per request kind and
+    size class (token counts within a factor of four), so a mix of one-text queries, large batches
+    and chat calls is not mistaken for a slowdown. At most one decrease happens per ``cooldown``
+    seconds, so one burst of 429s costs a single halving. Threads and coroutines share the same
+    FIFO of waiters; a released slot is handed straight to the oldest one.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial: int,
+        minimum: int = 1,
+        maximum: int = 16,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 1.0,
+    ) -> None:
+        self._min = max(minimum, 1)
+        self._max = max(maximum, self._min)
+        self._limit = float(min(max(initial, self._min), self._max))
+        self._latency_tolerance = latency_tolerance
+        self._cooldown = cooldown
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters: deque[_Waiter] = deque()
+        # (kind, size class) -> [short-term, long-term] latency average.
+        self._latency: dict[tuple[str, int], list[float]] = {}
+        self._last_latency: list[float] | None = None
+        self._last_decrease = float("-inf")
+        self._decreases = 0
+        self._last_decrease_reason: str | None = None
+
+    def _capacity(self) -> int:
+        return int(self._limit)
+
+    def _try_acquire(self) -> bool:
+        if not self._waiters and self._in_flight < self._capacity():
+            self._in_flight += 1
+            return True
+        return False
+
+    def _grant(self) -> None:
+        while self._waiters and self._in_flight < self._capacity():
+            waiter = self._waiters.popleft()
+            waiter.granted = True
+            self._in_flight += 1
+            waiter.wake()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._try_acquire():
+                return
+            event = threading.Event()
+            self._waiters.append(_Waiter(event.set))
+        event.wait()
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+
+        def resolve() -> None:
+            if not future.done():
+                future.set_result(None)
+
+        with self._lock:
+            if self._try_acquire():
+                return
+            waiter = _Waiter(lambda: loop.call_soon_threadsafe(resolve))
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was handed over just as we were cancelled; give it back.
+            self.release(None, overloaded=False)
+            raise
+
+    def release(self, latency: float | None, *, overloaded: bool, tokens: int = 0, kind: str = "") -> None:
+        """Free a slot. Only a measured ``latency`` grows the limit; without one the limit stays as is."""
+        with self._lock:
+            self._in_flight -= 1
+            reason = "throttled" if overloaded else None
+            if latency is not None and not overloaded:
+                key = (kind, max(tokens, 1).bit_length() // 2)
+                averages = self._latency.get(key)
+                if averages is None:
+                    averages = self._latency[key] = [latency, latency]
+                else:
+                    averages[0] = 0.7 * averages[0] + 0.3 * latency
+                    averages[1] = 0.98 * averages[1] + 0.02 * latency
+                self._last_latency = averages
+                if averages[0] > self._latency_tolerance * averages[1]:
+                    reason = "latency"
+            if reason is None:
+                if latency is not None:
+                    self._limit = min(float(self._max), self._limit + 1.0 / self._limit)
+            else:
+                now = time.monotonic()
+                if now - self._last_decrease >= self._cooldown:
+                    self._limit = max(float(self._min), self._limit / 2)
+                    self._last_decrease = now
+                    self._decreases += 1
+                    self._last_decrease_reason = reason
+            self._grant()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            # Latencies are those of the size class the last healthy call fell in.
+            recent, baseline = self._last_latency or (None, None)
+            return {
+                "limit": round(self._limit, 2),
+                "min": self._min,
+                "max": self._max,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "latency_ms_recent": None if recent is None else round(recent * 1000, 1),
+                "latency_ms_baseline": None if baseline is None else round(baseline * 1000, 1),
+                "latency_classes": len(self._latency),
+                "decreases": self._decreases,
+                "last_decrease_reason": self._last_decrease_reason,
+            }
+
+
+class GatewayCall:
+    """Handle for one request inside :meth:`ProviderGateway.slot`; set ``status`` from the response."""
+
+    def __init__(self, tokens: int = 0, kind: str = "") -> None:
+        self.status: int | None = None
+        self.tokens = tokens
+        self.kind = kind
+        self._started = time.perf_counter()
+        self.latency: float | None = None
+
+    def first_byte(self) -> None:
+        """Stop the latency clock early, e.g. when a streamed response starts."""
+        if self.latency is None:
+            self.latency = time.perf_counter() - self._started
+
+
+class ProviderGateway:
+    """Shared admission control for one provider endpoint: rate limits plus AIMD concurrency.
+
+    Requests wait on the request and token buckets first, so time spent rate limited never holds
+    a concurrency slot. A rate of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        requests_per_second: float = 0.0,
+        tokens_per_minute: float = 0.0,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 16,
+        latency_tolerance: float = 2.0,
+    ) -> None:
+        self.name = name
+        self._requests = TokenBucket(requests_per_second, requests_per_second) if requests_per_second > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute > 0 else None
+        self._limiter = AimdLimiter(
+            initial=initial_concurrency,
+            minimum=min_concurrency,
+            maximum=max_concurrency,
+            latency_tolerance=latency_tolerance,
+        )
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._overloaded = 0
+        self._errors = 0
+        self._rate_wait_seconds = 0.0
+
+    def _rate_wait(self, tokens: int) -> float:
+        wait = 0.0
+        if self._requests is not None:
+            wait = max(wait, self._requests.reserve(1))
+        if self._tokens is not None and tokens > 0:
+            wait = max(wait, self._tokens.reserve(tokens))
+        if wait > 0:
+            with self._lock:
+                self._rate_wait_seconds += wait
+        return wait
+
+    def _finish(self, call: GatewayCall, *, failed: bool) -> None:
+        overloaded = failed or call.status in OVERLOAD_STATUS
+        latency = None
+        if call.status is not None and not overloaded:
+            # Only answered, healthy calls say anything about service time; cancelled ones say nothing.
+            call.first_byte()
+            latency = call.latency
+        with self._lock:
+            self._calls += 1
+            self._overloaded += int(overloaded)
+            self._errors += int(failed)
+        self._limiter.release(latency, overloaded=overloaded, tokens=call.tokens, kind=call.kind)
+
+    @contextmanager
+    def slot(self, tokens: int = 0, kind: str = "") -> Iterator[GatewayCall]:
+        """Hold one concurrency slot; an exception before ``call.status`` is set counts as overload.
+
+        ``tokens`` is charged to the token bucket and, with ``kind``, picks the latency baseline.
+        """
+        wait = self._rate_wait(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        self._limiter.acquire()
+        call = GatewayCall(tokens, kind)
+        failed = False
+        try:
+            yield call
+        except Exception:
+            failed = call.status is None
+            raise
+        finally:
+            self._finish(call, failed=failed)
+
+    @asynccontextmanager
+    async def aslot(self, tokens: int = 0, kind: str = "") -> AsyncIterator[GatewayCall]:
+        wait = self._rate_wait(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self._limiter.acquire_async()
+        call = GatewayCall(tokens, kind)
+        failed = False
+        try:
+            yield call
+        except Exception:
+            failed = call.status is None
+            raise
+        finally:
+            self._finish(call, failed=failed)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = {
+                "calls": self._calls,
+                "overloaded": self._overloaded,
+                "transport_errors": self._errors,
+                "rate_wait_seconds": round(self._rate_wait_seconds, 3),
+            }
+        return {
+            **counters,
+            "concurrency": self._limiter.stats(),
+            "requests_available": None if self._requests is None else round(self._requests.available(), 2),
+            "tokens_available": None if self._tokens is None else round(self._tokens.available(), 1),
+        }
+
+
+def gateway_slot(
+    gateway: ProviderGateway | None, tokens: int = 0, kind: str = ""
+) -> AbstractContextManager[GatewayCall]:
+    return gateway.slot(tokens, kind) if gateway is not None else nullcontext(GatewayCall(tokens, kind))
+
+
+def gateway_aslot(
+    gateway: ProviderGateway | None, tokens: int = 0, kind: str = ""
+) -> AbstractAsyncContextManager[GatewayCall]:
+    return gateway.aslot(tokens, kind) if gateway is not None else nullcontext(GatewayCall(tokens, kind))
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+
+# FNV-1a 64-bit prime and a splitmix-style finalizer; uint64 arithmetic wraps, which is the point.
+_FNV_PRIME = np.uint64(0x100000001B3)
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+class HashingEmbedder:
+    """In-process feature-hashing embedder over character n-grams; no model, no network.
+
+    Text is lowercased and whitespace-collapsed, padded with a space on each side so word edges
+    form their own n-grams, and every n-gram in ``ngram_range`` is hashed into one of ``dim``
+    signed buckets. Counts are log-damped and L2-normalized, so cosine similarity measures shared
+    surface forms: a lexical stand-in for semantic search, deterministic across processes.
+    A batch is hashed in one vectorized pass over the concatenated code points.
+    """
+
+    def __init__(self, dim: int = 384, ngram_range: tuple[int, int] = (2, 4)) -> None:
+        if dim < 1:
+            raise ValueError("dim must be positive")
+        if not 1 <= ngram_range[0] <= ngram_range[1]:
+            raise ValueError("ngram_range must be (min_n, max_n) with 1 <= min_n <= max_n")
+        self._dim = dim
+        self._ngram_range = ngram_range
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    @property
+    def model(self) -> str:
+        return f"char{self._ngram_range[0]}-{self._ngram_range[1]}-d{self._dim}"
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        return self._embed(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_texts([text])[0]
+
+    def _embed(self, texts: list[str]) -> np.ndarray:
+        padded = []
+        for text in texts:
+            body = " ".join(text.lower().split())
+            padded.append(f" {body} " if body else "")
+        codes = np.frombuffer("".join(padded).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        counts = np.zeros(len(texts) * self._dim, dtype=np.float64)
+
+        min_n, max_n = self._ngram_range
+        for n in range(min_n, max_n + 1):
+            windows = len(codes) - n + 1
+            if windows <= 0:
+                break
+            hashes = np.full(windows, _FNV_OFFSET ^ np.uint64(n), dtype=np.uint64)
+            for offset in range(n):
+                hashes = (hashes ^ codes[offset : offset + windows]) * _FNV_PRIME
+            # Drop n-grams that straddle two texts of the batch.
+            inside = rows[:windows] == rows[n - 1 : n - 1 + windows]
+            hashes = hashes[inside]
+            hashes ^= hashes >> np.uint64(31)
+            hashes *= _MIX
+            hashes ^= hashes >> np.uint64(29)
+            buckets = (hashes % np.uint64(self._dim)).astype(np.int64) + rows[:windows][inside] * self._dim
+            # The top bit picks the sign, so collisions tend to cancel instead of piling up.
+            signs = 1.0 - 2.0 * (hashes >> np.uint64(63)).astype(np.float64)
+            counts += np.bincount(buckets, weights=signs, minlength=counts.size)
+
+        matrix = counts.reshape(len(texts), self._dim)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1.0, norms)
+        return matrix.astype(np.float32)
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import io
+import multiprocessing
+import threading
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
 
 from docx import Document as DocxDocument
-from kb_core.models import BlobRef, ParsedDocument, ParseOptions
+from kb_core.models import BlobRef, ParsedDocument, ParsedSection, ParseOptions
 from pypdf import PdfReader
 
+from kb_desktop_daemon.pdf_pages import extract_page_range
+
+# Upper bound on characters buffered per section when a format has no natural section boundary.
+SECTION_CHARS = 64 * 1024
+
 
 class TextParser:
     def can_parse(self, mime: str, ext: str) -> bool:
@@ -16,20 +26,90 @@ class TextParser:
         content = Path(blob.path).read_text(encoding="utf-8", errors="ignore")
         return ParsedDocument(text=content, metadata={"parser": "text"})
 
+    def iter_sections(self, blob: BlobRef, opts: ParseOptions) -> Iterator[ParsedSection]:
+        with open(blob.path, encoding="utf-8", errors="ignore") as handle:
+            while block := handle.read(SECTION_CHARS):
+                yield ParsedSection(text=block, metadata={"parser": "text"})
+
+
+def _page_section(text: str, page: int) -> ParsedSection:
+    body = f"{text}\n" if text.strip() else ""
+    return ParsedSection(text=f"{body}\n[page={page}]\n\n", metadata={"parser": "pdf", "page": page})
+
 
 class PdfParser:
+    """pypdf text extraction, one section per page.
+
+    With ``workers > 1`` documents of at least ``2 * pages_per_task`` pages are split into page
+    ranges extracted in a process pool, since pypdf extraction is CPU-bound pure Python. Ranges
+    are reassembled in page order, and only ``2 * workers`` ranges are in flight at a time so
+    streamed sections keep memory bounded.
+    """
+
+    def __init__(self, workers: int = 1, pages_per_task: int = 16) -> None:
+        self._workers = workers
+        self._pages_per_task = max(pages_per_task, 1)
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
     def can_parse(self, mime: str, ext: str) -> bool:
         return mime == "application/pdf" or ext == ".pdf"
 
     def parse(self, blob: BlobRef, opts: ParseOptions) -> ParsedDocument:
+        sections = list(self.iter_sections(blob, opts))
+        if sections:
+            # Only trailing whitespace is dropped so chunk offsets still index into the joined text.
+            last = sections[-1]
+            sections[-1] = last.model_copy(update={"text": last.text.rstrip()})
+        text = "".join(section.text for section in sections)
+        return ParsedDocument(text=text, metadata={"parser": "pdf"}, sections=sections)
+
+    def iter_sections(self, blob: BlobRef, opts: ParseOptions) -> Iterator[ParsedSection]:
         reader = PdfReader(blob.path)
-        lines: list[str] = []
-        for page_index, page in enumerate(reader.pages, start=1):
-            text = page.extract_text() or ""
-            if text.strip():
-                lines.append(text)
-            lines.append(f"\n[page={page_index}]\n")
-        return ParsedDocument(text="\n".join(lines).strip(), metadata={"parser": "pdf"})
+        page_count = len(reader.pages)
+        if self._workers <= 1 or page_count < 2 * self._pages_per_task:
+            for page_index, page in enumerate(reader.pages, start=1):
+                yield _page_section(page.extract_text() or "", page_index)
+            return
+
+        pool = self._executor()
+        ranges = iter(range(0, page_count, self._pages_per_task))
+        in_flight: deque[tuple[int, Future[list[str]]]] = deque()
+
+        def submit_next() -> None:
+            start = next(ranges, None)
+            if start is not None:
+                stop = min(start + self._pages_per_task, page_count)
+                in_flight.append((start, pool.submit(extract_page_range, blob.path, start, stop)))
+
+        for _ in range(2 * self._workers):
+            submit_next()
+        try:
+            while in_flight:
+                start, future = in_flight.popleft()
+                texts = future.result()
+                submit_next()
+                for offset, text in enumerate(texts):
+                    yield _page_section(text, start + offset + 1)
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned rather than forked: the daemon is multi-threaded by the time a PDF arrives.
+                # Each worker re-imports the daemon's ``__main__`` module (not just pypdf) when it starts.
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self._workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
 
 
 class DocxParser:
@@ -46,6 +126,22 @@ class DocxParser:
         text = "\n".join(para.text for para in doc.paragraphs if para.text)
         return ParsedDocument(text=text, metadata={"parser": "docx"})
 
+    def iter_sections(self, blob: BlobRef, opts: ParseOptions) -> Iterator[ParsedSection]:
+        doc = DocxDocument(blob.path)
+        group: list[str] = []
+        size = 0
+        separator = ""
+        for para in doc.paragraphs:
+            if not para.text:
+                continue
+            group.append(para.text)
+            size += len(para.text)
+            if size >= SECTION_CHARS:
+                yield ParsedSection(text=separator + "\n".join(group), metadata={"parser": "docx"})
+                group, size, separator = [], 0, "\n"
+        if group:
+            yield ParsedSection(text=separator + "\n".join(group), metadata={"parser": "docx"})
+
 
-def default_parsers() -> list[object]:
-    return [TextParser(), PdfParser(), DocxParser()]
+def default_parsers(pdf_workers: int = 1, pdf_pages_per_task: int = 16) -> list[object]:
+    return [TextParser(), PdfParser(workers=pdf_workers, pages_per_task=pdf_pages_per_task), DocxParser()]
@@ -1,18 +1,102 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import json
+import random
+import time
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
 
+import httpx
 import requests
-from kb_core.ports import Embedder, LLMClient
+from kb_core.ports import AsyncEmbedder, AsyncLLMClient, Embedder, LLMClient, Reranker, TokenCounter
+from kb_core.services import HeuristicTokenCounter, ThreadedEmbedder
+from requests.adapters import HTTPAdapter
 
+from kb_desktop_daemon.adapters.gateway import ProviderGateway, gateway_aslot, gateway_slot
+from kb_desktop_daemon.adapters.hashing_embedder import HashingEmbedder
+from kb_desktop_daemon.adapters.rerankers import TermOverlapReranker
+from kb_desktop_daemon.adapters.token_counters import TokenizerFileCounter
 from kb_desktop_daemon.config import Settings
 
 
+def pooled_session(max_connections: int) -> requests.Session:
+    """A keep-alive session whose connection pool fits ``max_connections`` concurrent requests."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(max_connections, 1))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class _EmbedEndpointMissing(Exception):
+    pass
+
+
+def _batches(texts: list[str], size: int) -> list[list[str]]:
+    return [texts[start : start + size] for start in range(0, len(texts), max(size, 1))]
+
+
+# Token estimates for rate limiting only need to be close, so the heuristic counter is used throughout.
+_ESTIMATOR = HeuristicTokenCounter()
+
+
+def _text_tokens(texts: list[str]) -> int:
+    return sum(_ESTIMATOR.count_batch(texts))
+
+
+def _prompt_tokens(messages: list[dict]) -> int:
+    return _text_tokens([str(message.get("content") or "") for message in messages])
+
+
+def _ollama_payload(model: str, keep_alive: str | None, **fields: Any) -> dict[str, Any]:
+    payload: dict[str, Any] = {"model": model, **fields}
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    return payload
+
+
+def _context_length(show: dict[str, Any]) -> int | None:
+    # /api/show reports it under an architecture-specific key such as "nomic-bert.context_length".
+    for key, value in (show.get("model_info") or {}).items():
+        if key.endswith(".context_length") and isinstance(value, int):
+            return value
+    return None
+
+
 class OllamaEmbedder(Embedder):
-    def __init__(self, base_url: str, model: str) -> None:
+    """Embeds through Ollama's batch ``/api/embed`` endpoint over a pooled keep-alive session.
+
+    Inputs are split into ``batch_size`` requests, and up to ``max_concurrency`` of them are in
+    flight at once. Servers without ``/api/embed`` (Ollama < 0.3) answer 404, after which the
+    embedder falls back to one legacy ``/api/embeddings`` request per text, still fanned out.
+    ``keep_alive`` is sent with every request so the model stays loaded between bursts ("-1" pins
+    it); a known ``dim`` (e.g. from the model registry) saves the probe request.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        session: requests.Session | None = None,
+        gateway: ProviderGateway | None = None,
+        keep_alive: str | None = None,
+        dim: int | None = None,
+    ) -> None:
         self._base_url = base_url.rstrip("/")
         self._model = model
-        self._dim_cache: int | None = None
+        self._gateway = gateway
+        self._keep_alive = keep_alive or None
+        self._batch_size = max(batch_size, 1)
+        self._max_concurrency = max(max_concurrency, 1)
+        self._session = session or pooled_session(self._max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self._max_concurrency, thread_name_prefix="kb-ollama-embed")
+        self._legacy = False
+        self._dim_cache = dim
 
     @property
     def dim(self) -> int:
@@ -21,24 +105,133 @@ class OllamaEmbedder(Embedder):
         return self._dim_cache
 
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        return [self.embed_query(text) for text in texts]
+        if not texts:
+            return []
+        if not self._legacy:
+            batches = _batches(texts, self._batch_size)
+            try:
+                if len(batches) == 1:
+                    return self._embed_batch(batches[0])
+                return [vector for batch in self._executor.map(self._embed_batch, batches) for vector in batch]
+            except _EmbedEndpointMissing:
+                self._legacy = True
+        if len(texts) == 1:
+            return [self._embed_legacy(texts[0])]
+        return list(self._executor.map(self._embed_legacy, texts))
 
     def embed_query(self, text: str) -> list[float]:
-        response = requests.post(
-            f"{self._base_url}/api/embeddings",
-            json={"model": self._model, "prompt": text},
-            timeout=60,
-        )
+        return self.embed_texts([text])[0]
+
+    def max_input_tokens(self) -> int | None:
+        """The model's context length as reported by ``/api/show``, or ``None`` if unavailable."""
+        try:
+            response = self._session.post(f"{self._base_url}/api/show", json={"model": self._model}, timeout=10)
+            response.raise_for_status()
+            return _context_length(response.json())
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        with gateway_slot(self._gateway, _text_tokens(texts), "embed") as call:
+            response = self._session.post(
+                f"{self._base_url}/api/embed",
+                json=_ollama_payload(self._model, self._keep_alive, input=texts),
+                timeout=60,
+            )
+            call.status = response.status_code
+        # A missing model is also a 404, but its error message names the model.
+        if response.status_code == 404 and "model" not in response.text.lower():
+            raise _EmbedEndpointMissing
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    def _embed_legacy(self, text: str) -> list[float]:
+        with gateway_slot(self._gateway, _text_tokens([text]), "embed") as call:
+            response = self._session.post(
+                f"{self._base_url}/api/embeddings",
+                json=_ollama_payload(self._model, self._keep_alive, prompt=text),
+                timeout=60,
+            )
+            call.status = response.status_code
         response.raise_for_status()
         return response.json()["embedding"]
 
 
+# Status codes worth retrying: rate limiting and transient server-side failures.
+_RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+def token_batches(token_counts: list[int], *, max_items: int, max_tokens: int) -> list[tuple[int, int]]:
+    """Split inputs into ordered ``(start, stop)`` spans within both limits.
+
+    An input over ``max_tokens`` on its own still gets a span of its own; the provider decides
+    whether to truncate or reject it.
+    """
+    spans: list[tuple[int, int]] = []
+    start, tokens = 0, 0
+    for index, count in enumerate(token_counts):
+        if index > start and (index - start >= max_items or tokens + count > max_tokens):
+            spans.append((start, index))
+            start, tokens = index, 0
+        tokens += count
+    if start < len(token_counts):
+        spans.append((start, len(token_counts)))
+    return spans
+
+
+def retry_delay(attempt: int, retry_after: str | None, *, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff, deferring to a numeric ``Retry-After`` header when given."""
+    if retry_after is not None:
+        try:
+            return min(max(float(retry_after), 0.0), cap)
+        except ValueError:
+            pass
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+def _embedding_data(payload: dict[str, Any]) -> list[list[float]]:
+    data = payload["data"]
+    data.sort(key=lambda item: item["index"])
+    return [item["embedding"] for item in data]
+
+
 class OpenCompatEmbedder(Embedder):
-    def __init__(self, base_url: str, api_key: str, model: str) -> None:
+    """OpenAI-compatible ``/embeddings`` client that batches by item count and estimated tokens.
+
+    Batches are sent concurrently over a pooled session and reassembled in input order. A batch
+    answered with 429/5xx (or a dropped connection) is retried on its own with jittered backoff;
+    one rejected as too large (413) is split in half and both halves are sent again.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        model: str,
+        max_batch_items: int = 256,
+        max_batch_tokens: int = 8000,
+        max_concurrency: int = 4,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        session: requests.Session | None = None,
+        token_counter: TokenCounter | None = None,
+        gateway: ProviderGateway | None = None,
+        dim: int | None = None,
+    ) -> None:
         self._base_url = base_url.rstrip("/")
         self._api_key = api_key
         self._model = model
-        self._dim_cache: int | None = None
+        self._gateway = gateway
+        self._max_batch_items = max(max_batch_items, 1)
+        self._max_batch_tokens = max(max_batch_tokens, 1)
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._session = session or pooled_session(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max(max_concurrency, 1), thread_name_prefix="kb-compat-embed")
+        self._token_counter = token_counter or HeuristicTokenCounter()
+        self._dim_cache = dim
 
     @property
     def dim(self) -> int:
@@ -50,88 +243,560 @@ class OpenCompatEmbedder(Embedder):
         return {"Authorization": f"Bearer {self._api_key}", "Content-Type": "application/json"}
 
     def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        response = requests.post(
-            f"{self._base_url}/embeddings",
-            headers=self._headers(),
-            json={"model": self._model, "input": texts},
-            timeout=60,
+        if not texts:
+            return []
+        spans = token_batches(
+            self._token_counter.count_batch(texts),
+            max_items=self._max_batch_items,
+            max_tokens=self._max_batch_tokens,
         )
-        response.raise_for_status()
-        data = response.json()["data"]
-        data.sort(key=lambda item: item["index"])
-        return [item["embedding"] for item in data]
+        batches = [texts[start:stop] for start, stop in spans]
+        if len(batches) == 1:
+            return self._embed_batch(batches[0])
+        return [vector for batch in self._executor.map(self._embed_batch, batches) for vector in batch]
 
     def embed_query(self, text: str) -> list[float]:
         return self.embed_texts([text])[0]
 
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        attempt = 0
+        tokens = _text_tokens(texts)
+        while True:
+            try:
+                with gateway_slot(self._gateway, tokens, "embed") as call:
+                    response = self._session.post(
+                        f"{self._base_url}/embeddings",
+                        headers=self._headers(),
+                        json={"model": self._model, "input": texts},
+                        timeout=60,
+                    )
+                    call.status = response.status_code
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self._max_retries:
+                    raise
+                retry_after = None
+            else:
+                if response.status_code == 413 and len(texts) > 1:
+                    middle = len(texts) // 2
+                    return self._embed_batch(texts[:middle]) + self._embed_batch(texts[middle:])
+                if response.status_code not in _RETRY_STATUS or attempt >= self._max_retries:
+                    response.raise_for_status()
+                    return _embedding_data(response.json())
+                retry_after = response.headers.get("Retry-After")
+            time.sleep(retry_delay(attempt, retry_after, base=self._backoff_base, cap=self._backoff_max))
+            attempt += 1
+
+
+class AsyncOllamaEmbedder(AsyncEmbedder):
+    """Async counterpart of :class:`OllamaEmbedder`, sharing the process-wide ``httpx`` client."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        model: str,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        gateway: ProviderGateway | None = None,
+        keep_alive: str | None = None,
+    ) -> None:
+        self._client = client
+        self._base_url = base_url.rstrip("/")
+        self._model = model
+        self._gateway = gateway
+        self._keep_alive = keep_alive or None
+        self._batch_size = max(batch_size, 1)
+        self._max_concurrency = max(max_concurrency, 1)
+        self._legacy = False
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        # Created per call: a semaphore binds to the running loop, and callers may use several loops.
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def bounded(call: Any) -> Any:
+            async with semaphore:
+                return await call
+
+        if not self._legacy:
+            try:
+                batches = await asyncio.gather(
+                    *(bounded(self._embed_batch(batch)) for batch in _batches(texts, self._batch_size))
+                )
+                return [vector for batch in batches for vector in batch]
+            except _EmbedEndpointMissing:
+                self._legacy = True
+        return list(await asyncio.gather(*(bounded(self._embed_legacy(text)) for text in texts)))
+
+    async def embed_query(self, text: str) -> list[float]:
+        return (await self.embed_texts([text]))[0]
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        async with gateway_aslot(self._gateway, _text_tokens(texts), "embed") as call:
+            response = await self._client.post(
+                f"{self._base_url}/api/embed",
+                json=_ollama_payload(self._model, self._keep_alive, input=texts),
+                timeout=60,
+            )
+            call.status = response.status_code
+        # A missing model is also a 404, but its error message names the model.
+        if response.status_code == 404 and "model" not in response.text.lower():
+            raise _EmbedEndpointMissing
+        response.raise_for_status()
+        return response.json()["embeddings"]
+
+    async def _embed_legacy(self, text: str) -> list[float]:
+        async with gateway_aslot(self._gateway, _text_tokens([text]), "embed") as call:
+            response = await self._client.post(
+                f"{self._base_url}/api/embeddings",
+                json=_ollama_payload(self._model, self._keep_alive, prompt=text),
+                timeout=60,
+            )
+            call.status = response.status_code
+        response.raise_for_status()
+        return response.json()["embedding"]
+
+
+class AsyncOpenCompatEmbedder(AsyncEmbedder):
+    """Async counterpart of :class:`OpenCompatEmbedder` with the same batching and retry policy."""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        api_key: str,
+        model: str,
+        max_batch_items: int = 256,
+        max_batch_tokens: int = 8000,
+        max_concurrency: int = 4,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        token_counter: TokenCounter | None = None,
+        gateway: ProviderGateway | None = None,
+    ) -> None:
+        self._client = client
+        self._base_url = base_url.rstrip("/")
+        self._api_key = api_key
+        self._model = model
+        self._gateway = gateway
+        self._max_batch_items = max(max_batch_items, 1)
+        self._max_batch_tokens = max(max_batch_tokens, 1)
+        self._max_concurrency = max(max_concurrency, 1)
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._token_counter = token_counter or HeuristicTokenCounter()
+
+    def _headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self._api_key}", "Content-Type": "application/json"}
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        spans = token_batches(
+            self._token_counter.count_batch(texts),
+            max_items=self._max_batch_items,
+            max_tokens=self._max_batch_tokens,
+        )
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def bounded(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._embed_batch(batch)
+
+        batches = await asyncio.gather(*(bounded(texts[start:stop]) for start, stop in spans))
+        return [vector for batch in batches for vector in batch]
+
+    async def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        attempt = 0
+        tokens = _text_tokens(texts)
+        while True:
+            try:
+                async with gateway_aslot(self._gateway, tokens, "embed") as call:
+                    response = await self._client.post(
+                        f"{self._base_url}/embeddings",
+                        headers=self._headers(),
+                        json={"model": self._model, "input": texts},
+                        timeout=60,
+                    )
+                    call.status = response.status_code
+            except httpx.TransportError:
+                if attempt >= self._max_retries:
+                    raise
+                retry_after = None
+            else:
+                if response.status_code == 413 and len(texts) > 1:
+                    middle = len(texts) // 2
+                    return await self._embed_batch(texts[:middle]) + await self._embed_batch(texts[middle:])
+                if response.status_code not in _RETRY_STATUS or attempt >= self._max_retries:
+                    response.raise_for_status()
+                    return _embedding_data(response.json())
+                retry_after = response.headers.get("Retry-After")
+            await asyncio.sleep(retry_delay(attempt, retry_after, base=self._backoff_base, cap=self._backoff_max))
+            attempt += 1
+
+    async def embed_query(self, text: str) -> list[float]:
+        return (await self.embed_texts([text]))[0]
+
+
+def parse_ollama_stream_line(line: str) -> tuple[str, bool]:
+    """Return ``(token, done)`` for one NDJSON line of an Ollama ``/api/chat`` stream."""
+    if not line.strip():
+        return "", False
+    payload = json.loads(line)
+    if payload.get("error"):
+        raise RuntimeError(f"Ollama stream error: {payload['error']}")
+    return payload.get("message", {}).get("content", ""), bool(payload.get("done"))
+
+
+def parse_sse_stream_line(line: str) -> tuple[str, bool]:
+    """Return ``(token, done)`` for one SSE line of an OpenAI-compatible chat completion stream."""
+    if not line.startswith("data:"):
+        return "", False
+    data = line[len("data:") :].strip()
+    if data == "[DONE]":
+        return "", True
+    choices = json.loads(data).get("choices") or [{}]
+    return (choices[0].get("delta") or {}).get("content") or "", False
+
 
 class OllamaLLMClient(LLMClient):
-    def __init__(self, base_url: str, model: str) -> None:
+    def __init__(self, base_url: str, model: str, gateway: ProviderGateway | None = None) -> None:
         self._base_url = base_url.rstrip("/")
         self._model = model
+        self._gateway = gateway
 
     def chat(self, messages: list[dict], *, temperature: float = 0.0) -> str:
-        response = requests.post(
-            f"{self._base_url}/api/chat",
-            json={"model": self._model, "messages": messages, "stream": False},
-            timeout=60,
-        )
+        with gateway_slot(self._gateway, _prompt_tokens(messages), "chat") as call:
+            response = requests.post(
+                f"{self._base_url}/api/chat",
+                json={
+                    "model": self._model,
+                    "messages": messages,
+                    "stream": False,
+                    "options": {"temperature": temperature},
+                },
+                timeout=60,
+            )
+            call.status = response.status_code
         response.raise_for_status()
         payload = response.json()
         return payload.get("message", {}).get("content", "")
 
+    def stream_chat(self, messages: list[dict], *, temperature: float = 0.0) -> Iterator[str]:
+        # The slot is held for the whole stream: generation occupies the server until the last token.
+        with (
+            gateway_slot(self._gateway, _prompt_tokens(messages), "chat") as call,
+            requests.post(
+                f"{self._base_url}/api/chat",
+                json={
+                    "model": self._model,
+                    "messages": messages,
+                    "stream": True,
+                    "options": {"temperature": temperature},
+                },
+                stream=True,
+                timeout=60,
+            ) as response,
+        ):
+            call.status = response.status_code
+            call.first_byte()
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                token, done = parse_ollama_stream_line(line)
+                if token:
+                    yield token
+                if done:
+                    break
+
 
 class OpenCompatLLMClient(LLMClient):
-    def __init__(self, base_url: str, api_key: str, model: str) -> None:
+    def __init__(self, base_url: str, api_key: str, model: str, gateway: ProviderGateway | None = None) -> None:
         self._base_url = base_url.rstrip("/")
         self._api_key = api_key
         self._model = model
+        self._gateway = gateway
 
     def _headers(self) -> dict[str, str]:
         return {"Authorization": f"Bearer {self._api_key}", "Content-Type": "application/json"}
 
     def chat(self, messages: list[dict], *, temperature: float = 0.0) -> str:
-        response = requests.post(
-            f"{self._base_url}/chat/completions",
-            headers=self._headers(),
-            json={"model": self._model, "messages": messages, "temperature": temperature},
-            timeout=60,
-        )
+        with gateway_slot(self._gateway, _prompt_tokens(messages), "chat") as call:
+            response = requests.post(
+                f"{self._base_url}/chat/completions",
+                headers=self._headers(),
+                json={"model": self._model, "messages": messages, "temperature": temperature},
+                timeout=60,
+            )
+            call.status = response.status_code
         response.raise_for_status()
         payload = response.json()
         return payload["choices"][0]["message"]["content"]
 
+    def stream_chat(self, messages: list[dict], *, temperature: float = 0.0) -> Iterator[str]:
+        with (
+            gateway_slot(self._gateway, _prompt_tokens(messages), "chat") as call,
+            requests.post(
+                f"{self._base_url}/chat/completions",
+                headers=self._headers(),
+                json={"model": self._model, "messages": messages, "temperature": temperature, "stream": True},
+                stream=True,
+                timeout=60,
+            ) as response,
+        ):
+            call.status = response.status_code
+            call.first_byte()
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                token, done = parse_sse_stream_line(line)
+                if token:
+                    yield token
+                if done:
+                    break
+
+
+class AsyncOllamaLLMClient(AsyncLLMClient):
+    def __init__(
+        self, client: httpx.AsyncClient, base_url: str, model: str, gateway: ProviderGateway | None = None
+    ) -> None:
+        self._client = client
+        self._base_url = base_url.rstrip("/")
+        self._model = model
+        self._gateway = gateway
+
+    async def stream_chat(self, messages: list[dict], *, temperature: float = 0.0) -> AsyncIterator[str]:
+        async with (
+            gateway_aslot(self._gateway, _prompt_tokens(messages), "chat") as call,
+            self._client.stream(
+                "POST",
+                f"{self._base_url}/api/chat",
+                json={
+                    "model": self._model,
+                    "messages": messages,
+                    "stream": True,
+                    "options": {"temperature": temperature},
+                },
+            ) as response,
+        ):
+            call.status = response.status_code
+            call.first_byte()
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                token, done = parse_ollama_stream_line(line)
+                if token:
+                    yield token
+                if done:
+                    break
+
+
+class AsyncOpenCompatLLMClient(AsyncLLMClient):
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        api_key: str,
+        model: str,
+        gateway: ProviderGateway | None = None,
+    ) -> None:
+        self._client = client
+        self._base_url = base_url.rstrip("/")
+        self._api_key = api_key
+        self._model = model
+        self._gateway = gateway
+
+    def _headers(self) -> dict[str, str]:
+        return {"Authorization": f"Bearer {self._api_key}", "Content-Type": "application/json"}
+
+    async def stream_chat(self, messages: list[dict], *, temperature: float = 0.0) -> AsyncIterator[str]:
+        async with (
+            gateway_aslot(self._gateway, _prompt_tokens(messages), "chat") as call,
+            self._client.stream(
+                "POST",
+                f"{self._base_url}/chat/completions",
+                headers=self._headers(),
+                json={"model": self._model, "messages": messages, "temperature": temperature, "stream": True},
+            ) as response,
+        ):
+            call.status = response.status_code
+            call.first_byte()
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                token, done = parse_sse_stream_line(line)
+                if token:
+                    yield token
+                if done:
+                    break
+
 
 @dataclass
 class ProviderFactory:
     settings: Settings
+    _gateways: dict[str, ProviderGateway] = field(default_factory=dict, init=False, repr=False)
+
+    @property
+    def gateways(self) -> dict[str, ProviderGateway]:
+        return self._gateways
+
+    def gateway(self, provider: str) -> ProviderGateway:
+        """The gateway shared by every embedder and LLM client that talks to ``provider``."""
+        selected = provider.lower()
+        if selected not in self._gateways:
+            if selected == "ollama":
+                rps = self.settings.ollama_requests_per_second
+                tpm = self.settings.ollama_tokens_per_minute
+                max_concurrency = self.settings.ollama_max_concurrency
+            elif selected == "open_compat":
+                rps = self.settings.open_compat_requests_per_second
+                tpm = self.settings.open_compat_tokens_per_minute
+                max_concurrency = self.settings.open_compat_max_concurrency
+            else:
+                raise ValueError(f"Unsupported provider: {selected}")
+            min_concurrency = min(self.settings.provider_min_concurrency, max_concurrency)
+            self._gateways[selected] = ProviderGateway(
+                selected,
+                requests_per_second=rps,
+                tokens_per_minute=tpm,
+                # Start halfway and let AIMD find the provider's real capacity in either direction.
+                initial_concurrency=max(max_concurrency // 2, min_concurrency),
+                min_concurrency=min_concurrency,
+                max_concurrency=max_concurrency,
+                latency_tolerance=self.settings.provider_latency_tolerance,
+            )
+        return self._gateways[selected]
+
+    def embedding_model(self, provider: str | None = None) -> str:
+        selected = (provider or self.settings.embedding_provider).lower()
+        if selected == "ollama":
+            return self.settings.ollama_embed_model
+        if selected == "open_compat":
+            return self.settings.open_compat_embed_model
+        if selected == "hashing":
+            return self._hashing_embedder().model
+        raise ValueError(f"Unsupported embedding provider: {selected}")
 
-    def create_embedder(self, provider: str | None = None) -> Embedder:
+    def _hashing_embedder(self) -> HashingEmbedder:
+        return HashingEmbedder(
+            dim=self.settings.hashing_embed_dim,
+            ngram_range=(self.settings.hashing_ngram_min, self.settings.hashing_ngram_max),
+        )
+
+    def create_embedder(self, provider: str | None = None, *, dim: int | None = None) -> Embedder:
         selected = (provider or self.settings.embedding_provider).lower()
         if selected == "ollama":
             return OllamaEmbedder(
                 base_url=self.settings.ollama_base_url,
                 model=self.settings.ollama_embed_model,
+                batch_size=self.settings.ollama_embed_batch_size,
+                max_concurrency=self.settings.ollama_embed_concurrency,
+                gateway=self.gateway(selected),
+                keep_alive=self.settings.ollama_keep_alive,
+                dim=dim,
             )
         if selected == "open_compat":
             return OpenCompatEmbedder(
                 base_url=self.settings.open_compat_base_url,
                 api_key=self.settings.open_compat_api_key,
                 model=self.settings.open_compat_embed_model,
+                max_batch_items=self.settings.open_compat_embed_batch_items,
+                max_batch_tokens=self.settings.open_compat_embed_batch_tokens,
+                max_concurrency=self.settings.open_compat_embed_concurrency,
+                max_retries=self.settings.open_compat_max_retries,
+                gateway=self.gateway(selected),
+                dim=dim,
+            )
+        if selected == "hashing":
+            return self._hashing_embedder()
+        raise ValueError(f"Unsupported embedding provider: {selected}")
+
+    def create_http_client(self) -> httpx.AsyncClient:
+        """One pooled client per process, shared by every async provider."""
+        limit = self.settings.http_max_connections
+        return httpx.AsyncClient(
+            timeout=60,
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit),
+        )
+
+    def create_async_embedder(self, client: httpx.AsyncClient, provider: str | None = None) -> AsyncEmbedder:
+        selected = (provider or self.settings.embedding_provider).lower()
+        if selected == "ollama":
+            return AsyncOllamaEmbedder(
+                client,
+                base_url=self.settings.ollama_base_url,
+                model=self.settings.ollama_embed_model,
+                batch_size=self.settings.ollama_embed_batch_size,
+                max_concurrency=self.settings.ollama_embed_concurrency,
+                gateway=self.gateway(selected),
+                keep_alive=self.settings.ollama_keep_alive,
+            )
+        if selected == "open_compat":
+            return AsyncOpenCompatEmbedder(
+                client,
+                base_url=self.settings.open_compat_base_url,
+                api_key=self.settings.open_compat_api_key,
+                model=self.settings.open_compat_embed_model,
+                max_batch_items=self.settings.open_compat_embed_batch_items,
+                max_batch_tokens=self.settings.open_compat_embed_batch_tokens,
+                max_concurrency=self.settings.open_compat_embed_concurrency,
+                max_retries=self.settings.open_compat_max_retries,
+                gateway=self.gateway(selected),
             )
+        if selected == "hashing":
+            # Hashing a query takes microseconds, but a large batch is CPU-bound; keep it off the loop.
+            return ThreadedEmbedder(self._hashing_embedder())
         raise ValueError(f"Unsupported embedding provider: {selected}")
 
+    def create_async_llm_client(self, client: httpx.AsyncClient, provider: str | None = None) -> AsyncLLMClient:
+        selected = (provider or self.settings.llm_provider).lower()
+        if selected == "ollama":
+            return AsyncOllamaLLMClient(
+                client,
+                base_url=self.settings.ollama_base_url,
+                model=self.settings.ollama_llm_model,
+                gateway=self.gateway(selected),
+            )
+        if selected == "open_compat":
+            return AsyncOpenCompatLLMClient(
+                client,
+                base_url=self.settings.open_compat_base_url,
+                api_key=self.settings.open_compat_api_key,
+                model=self.settings.open_compat_llm_model,
+                gateway=self.gateway(selected),
+            )
+        raise ValueError(f"Unsupported llm provider: {selected}")
+
     def create_llm_client(self, provider: str | None = None) -> LLMClient:
         selected = (provider or self.settings.llm_provider).lower()
         if selected == "ollama":
             return OllamaLLMClient(
                 base_url=self.settings.ollama_base_url,
                 model=self.settings.ollama_llm_model,
+                gateway=self.gateway(selected),
             )
         if selected == "open_compat":
             return OpenCompatLLMClient(
                 base_url=self.settings.open_compat_base_url,
                 api_key=self.settings.open_compat_api_key,
                 model=self.settings.open_compat_llm_model,
+                gateway=self.gateway(selected),
             )
-        raise ValueError(f"Unsupported llm provider: {selected}")
+        raise ValueError(f"Unsupported llm provider: {selected}")
+
+    def create_token_counter(self, kind: str | None = None) -> TokenCounter:
+        selected = (kind or self.settings.token_counter).lower()
+        if selected == "heuristic":
+            return HeuristicTokenCounter()
+        if selected == "tokenizer":
+            if not self.settings.tokenizer_path:
+                raise ValueError("TOKENIZER_PATH is required for the tokenizer token counter")
+            return TokenizerFileCounter(self.settings.tokenizer_path)
+        raise ValueError(f"Unsupported token counter: {selected}")
+
+    def create_reranker(self, provider: str | None = None) -> Reranker | None:
+        selected = (provider or self.settings.reranker_provider).lower()
+        if selected == "none":
+            return None
+        if selected == "local":
+            return TermOverlapReranker()
+        raise ValueError(f"Unsupported reranker provider: {selected}")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from kb_core.services import lexical_terms
+
+
+class TermOverlapReranker:
+    """CPU-only stand-in reranker: BM25-style term saturation without corpus statistics.
+
+    Scores depend only on (query, text), so they are stable across batches and safe to cache.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, avg_terms: float = 200.0) -> None:
+        self._k1 = k1
+        self._b = b
+        self._avg_terms = avg_terms
+
+    @property
+    def model(self) -> str:
+        return "term-overlap-v1"
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        query_terms = set(lexical_terms(query))
+        if not query_terms:
+            return [0.0 for _ in texts]
+        scores: list[float] = []
+        for text in texts:
+            terms = lexical_terms(text)
+            counts = Counter(terms)
+            norm = self._k1 * (1 - self._b + self._b * len(terms) / self._avg_terms)
+            total = sum(counts[t] * (self._k1 + 1) / (counts[t] + norm) for t in query_terms if counts[t])
+            scores.append(total / len(query_terms))
+        return scores
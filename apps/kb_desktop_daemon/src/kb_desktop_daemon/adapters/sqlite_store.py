@@ -4,9 +4,26 @@ import json
 import sqlite3
 import threading
 from datetime import datetime
+from hashlib import blake2b
 from typing import Any
 
-from kb_core.models import Chunk, Collection, Document, Job, JobStatus, JobType
+from kb_core.models import (
+    Chunk,
+    Collection,
+    Document,
+    DocumentStatus,
+    EmbeddingModelInfo,
+    Job,
+    JobStatus,
+    JobType,
+    VectorHit,
+)
+from kb_core.services import build_match_query, segment_for_index
+
+
+def _fts_rowid(chunk_id: str) -> int:
+    """FTS rowid derived from the chunk id; unlike ``chunks.rowid`` it survives VACUUM."""
+    return int.from_bytes(blake2b(chunk_id.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
 
 
 class SQLiteRepository:
@@ -58,7 +75,9 @@ class SQLiteRepository:
                     chunk_order INTEGER NOT NULL,
                     metadata_json TEXT NOT NULL,
                     embedding_ref TEXT,
-                    created_at TEXT NOT NULL
+                    created_at TEXT NOT NULL,
+                    start_char INTEGER,
+                    end_char INTEGER
                 );
 
                 CREATE TABLE IF NOT EXISTS jobs (
@@ -80,14 +99,84 @@ class SQLiteRepository:
                     vector_id TEXT NOT NULL
                 );
 
+                CREATE TABLE IF NOT EXISTS embedding_models (
+                    provider TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    normalized INTEGER,
+                    max_input_tokens INTEGER,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (provider, model)
+                );
+
                 CREATE INDEX IF NOT EXISTS idx_documents_collection ON documents(collection_id);
+                CREATE INDEX IF NOT EXISTS idx_documents_hash ON documents(hash);
                 CREATE INDEX IF NOT EXISTS idx_chunks_document ON chunks(document_id);
+                CREATE INDEX IF NOT EXISTS idx_chunks_collection ON chunks(collection_id);
                 CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
                 CREATE INDEX IF NOT EXISTS idx_vector_doc ON chunk_vector_map(document_id);
+
+                -- Lexical index over chunk text; rowid is a hash of the chunk id and terms are pre-segmented
+                -- (CJK runs split into bigrams) because unicode61 cannot split unspaced scripts.
+                CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                    terms,
+                    chunk_id UNINDEXED,
+                    collection_id UNINDEXED,
+                    document_id UNINDEXED,
+                    tokenize = 'unicode61'
+                );
                 """
             )
+            self._ensure_columns(conn, "chunks", {"start_char": "INTEGER", "end_char": "INTEGER"})
+            self._ensure_columns(conn, "collections", {"embedding_model": "TEXT"})
+            sample = conn.execute("SELECT rowid, chunk_id FROM chunks_fts LIMIT 1").fetchone()
+            if sample is not None and sample["rowid"] != _fts_rowid(sample["chunk_id"]):
+                # Indexes keyed by chunks.rowid (and segmented without CJK unigrams) are rebuilt once.
+                conn.execute("DELETE FROM chunks_fts")
+                sample = None
+            if sample is None and conn.execute("SELECT EXISTS (SELECT 1 FROM chunks)").fetchone()[0]:
+                self._index_chunks_fts(conn)
             conn.commit()
 
+    @staticmethod
+    def _ensure_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]) -> None:
+        # Databases created before a column existed get it added in place; new rows fill it in.
+        existing = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
+    @staticmethod
+    def _index_chunks_fts(conn: sqlite3.Connection, chunk_ids: list[str] | None = None) -> None:
+        if chunk_ids is None:
+            rows = conn.execute("SELECT id, collection_id, document_id, text FROM chunks").fetchall()
+        else:
+            rows = []
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start : start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows.extend(
+                    conn.execute(
+                        f"SELECT id, collection_id, document_id, text FROM chunks WHERE id IN ({placeholders})",
+                        tuple(batch),
+                    ).fetchall()
+                )
+        conn.executemany("DELETE FROM chunks_fts WHERE rowid = ?", [(_fts_rowid(row["id"]),) for row in rows])
+        conn.executemany(
+            "INSERT INTO chunks_fts(rowid, terms, chunk_id, collection_id, document_id) VALUES (?, ?, ?, ?, ?)",
+            [
+                (
+                    _fts_rowid(row["id"]),
+                    segment_for_index(row["text"]),
+                    row["id"],
+                    row["collection_id"],
+                    row["document_id"],
+                )
+                for row in rows
+            ],
+        )
+
     @staticmethod
     def _dumps(value: dict[str, Any]) -> str:
         return json.dumps(value, ensure_ascii=True)
@@ -104,18 +193,47 @@ class SQLiteRepository:
             return None
         return datetime.fromisoformat(value)
 
+    def _row_to_document(self, row: sqlite3.Row) -> Document:
+        return Document(
+            id=row["id"],
+            collection_id=row["collection_id"],
+            title=row["title"],
+            source_type=row["source_type"],
+            source_uri=row["source_uri"],
+            mime=row["mime"],
+            size_bytes=row["size_bytes"],
+            hash=row["hash"],
+            blob_ref=row["blob_ref"],
+            status=row["status"],
+            metadata=self._loads(row["metadata_json"]),
+            created_at=self._dt(row["created_at"]),
+            updated_at=self._dt(row["updated_at"]),
+        )
+
+    def _row_to_collection(self, row: sqlite3.Row) -> Collection:
+        return Collection(
+            id=row["id"],
+            name=row["name"],
+            description=row["description"],
+            settings=self._loads(row["settings_json"]),
+            embedding_model=row["embedding_model"],
+            created_at=self._dt(row["created_at"]),
+            updated_at=self._dt(row["updated_at"]),
+        )
+
     def create_collection(self, collection: Collection) -> Collection:
         with self._lock, self._connect() as conn:
             conn.execute(
                 """
-                INSERT INTO collections(id, name, description, settings_json, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?)
+                INSERT INTO collections(id, name, description, settings_json, embedding_model, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     collection.id,
                     collection.name,
                     collection.description,
                     self._dumps(collection.settings),
+                    collection.embedding_model,
                     collection.created_at.isoformat(),
                     collection.updated_at.isoformat(),
                 ),
@@ -128,14 +246,7 @@ class SQLiteRepository:
             row = conn.execute("SELECT * FROM collections WHERE id = ?", (collection_id,)).fetchone()
             if row is None:
                 return None
-            return Collection(
-                id=row["id"],
-                name=row["name"],
-                description=row["description"],
-                settings=self._loads(row["settings_json"]),
-                created_at=self._dt(row["created_at"]),
-                updated_at=self._dt(row["updated_at"]),
-            )
+            return self._row_to_collection(row)
 
     def list_collections(self, limit: int, offset: int) -> list[Collection]:
         with self._connect() as conn:
@@ -143,23 +254,81 @@ class SQLiteRepository:
                 "SELECT * FROM collections ORDER BY created_at DESC LIMIT ? OFFSET ?",
                 (limit, offset),
             ).fetchall()
-            return [
-                Collection(
-                    id=row["id"],
-                    name=row["name"],
-                    description=row["description"],
-                    settings=self._loads(row["settings_json"]),
-                    created_at=self._dt(row["created_at"]),
-                    updated_at=self._dt(row["updated_at"]),
-                )
-                for row in rows
-            ]
+            return [self._row_to_collection(row) for row in rows]
 
     def delete_collection(self, collection_id: str) -> None:
         with self._lock, self._connect() as conn:
             conn.execute("DELETE FROM collections WHERE id = ?", (collection_id,))
             conn.commit()
 
+    def set_collection_embedding_model(self, collection_id: str, embedding_model: str) -> str | None:
+        """Bind the model to a collection that has none yet or holds no chunks; return the model it ends up with.
+
+        A collection with chunks keeps its recorded model, since its vectors were computed with it.
+        """
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE collections SET embedding_model = ?
+                WHERE id = ?
+                  AND (embedding_model IS NULL OR NOT EXISTS (SELECT 1 FROM chunks WHERE collection_id = ?))
+                """,
+                (embedding_model, collection_id, collection_id),
+            )
+            conn.commit()
+            row = conn.execute("SELECT embedding_model FROM collections WHERE id = ?", (collection_id,)).fetchone()
+            return None if row is None else row["embedding_model"]
+
+    def _row_to_embedding_model(self, row: sqlite3.Row) -> EmbeddingModelInfo:
+        return EmbeddingModelInfo(
+            provider=row["provider"],
+            model=row["model"],
+            dim=row["dim"],
+            normalized=None if row["normalized"] is None else bool(row["normalized"]),
+            max_input_tokens=row["max_input_tokens"],
+            created_at=self._dt(row["created_at"]),
+            updated_at=self._dt(row["updated_at"]),
+        )
+
+    def get_embedding_model(self, provider: str, model: str) -> EmbeddingModelInfo | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM embedding_models WHERE provider = ? AND model = ?", (provider, model)
+            ).fetchone()
+            return None if row is None else self._row_to_embedding_model(row)
+
+    def upsert_embedding_model(self, info: EmbeddingModelInfo) -> EmbeddingModelInfo:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO embedding_models(provider, model, dim, normalized, max_input_tokens, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(provider, model) DO UPDATE SET
+                    dim = excluded.dim,
+                    normalized = excluded.normalized,
+                    max_input_tokens = COALESCE(excluded.max_input_tokens, embedding_models.max_input_tokens),
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    info.provider,
+                    info.model,
+                    info.dim,
+                    None if info.normalized is None else int(info.normalized),
+                    info.max_input_tokens,
+                    info.created_at.isoformat(),
+                    info.updated_at.isoformat(),
+                ),
+            )
+            conn.commit()
+        stored = self.get_embedding_model(info.provider, info.model)
+        assert stored is not None
+        return stored
+
+    def list_embedding_models(self) -> list[EmbeddingModelInfo]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM embedding_models ORDER BY provider, model").fetchall()
+            return [self._row_to_embedding_model(row) for row in rows]
+
     def create_document(self, doc: Document) -> Document:
         with self._lock, self._connect() as conn:
             conn.execute(
@@ -193,21 +362,33 @@ class SQLiteRepository:
             row = conn.execute("SELECT * FROM documents WHERE id = ?", (document_id,)).fetchone()
             if row is None:
                 return None
-            return Document(
-                id=row["id"],
-                collection_id=row["collection_id"],
-                title=row["title"],
-                source_type=row["source_type"],
-                source_uri=row["source_uri"],
-                mime=row["mime"],
-                size_bytes=row["size_bytes"],
-                hash=row["hash"],
-                blob_ref=row["blob_ref"],
-                status=row["status"],
-                metadata=self._loads(row["metadata_json"]),
-                created_at=self._dt(row["created_at"]),
-                updated_at=self._dt(row["updated_at"]),
-            )
+            return self._row_to_document(row)
+
+    def get_documents(self, document_ids: list[str]) -> list[Document]:
+        if not document_ids:
+            return []
+        rows: list[sqlite3.Row] = []
+        with self._connect() as conn:
+            for start in range(0, len(document_ids), 500):
+                batch = document_ids[start : start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows.extend(
+                    conn.execute(f"SELECT * FROM documents WHERE id IN ({placeholders})", tuple(batch)).fetchall()
+                )
+        return [self._row_to_document(row) for row in rows]
+
+    def find_document_by_hash(self, content_hash: str, collection_id: str | None = None) -> Document | None:
+        sql = "SELECT * FROM documents WHERE hash = ? AND status = ?"
+        params: list[Any] = [content_hash, DocumentStatus.INGESTED.value]
+        if collection_id is not None:
+            sql += " AND collection_id = ?"
+            params.append(collection_id)
+        sql += " ORDER BY created_at ASC LIMIT 1"
+        with self._connect() as conn:
+            row = conn.execute(sql, tuple(params)).fetchone()
+            if row is None:
+                return None
+            return self._row_to_document(row)
 
     def list_documents(self, collection_id: str, limit: int, offset: int) -> list[Document]:
         with self._connect() as conn:
@@ -220,24 +401,7 @@ class SQLiteRepository:
                 """,
                 (collection_id, limit, offset),
             ).fetchall()
-            return [
-                Document(
-                    id=row["id"],
-                    collection_id=row["collection_id"],
-                    title=row["title"],
-                    source_type=row["source_type"],
-                    source_uri=row["source_uri"],
-                    mime=row["mime"],
-                    size_bytes=row["size_bytes"],
-                    hash=row["hash"],
-                    blob_ref=row["blob_ref"],
-                    status=row["status"],
-                    metadata=self._loads(row["metadata_json"]),
-                    created_at=self._dt(row["created_at"]),
-                    updated_at=self._dt(row["updated_at"]),
-                )
-                for row in rows
-            ]
+            return [self._row_to_document(row) for row in rows]
 
     def update_document(self, doc: Document) -> Document:
         with self._lock, self._connect() as conn:
@@ -278,14 +442,16 @@ class SQLiteRepository:
                 """
                 INSERT INTO chunks(
                     id, collection_id, document_id, text, token_count,
-                    chunk_order, metadata_json, embedding_ref, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    chunk_order, metadata_json, embedding_ref, created_at, start_char, end_char
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ON CONFLICT(id) DO UPDATE SET
                     text = excluded.text,
                     token_count = excluded.token_count,
                     chunk_order = excluded.chunk_order,
                     metadata_json = excluded.metadata_json,
-                    embedding_ref = excluded.embedding_ref
+                    embedding_ref = excluded.embedding_ref,
+                    start_char = excluded.start_char,
+                    end_char = excluded.end_char
                 """,
                 [
                     (
@@ -298,35 +464,40 @@ class SQLiteRepository:
                         self._dumps(chunk.metadata),
                         chunk.embedding_ref,
                         chunk.created_at.isoformat(),
+                        chunk.start_char,
+                        chunk.end_char,
                     )
                     for chunk in chunks
                 ],
             )
+            self._index_chunks_fts(conn, [chunk.id for chunk in chunks])
             conn.commit()
 
+    def _row_to_chunk(self, row: sqlite3.Row) -> Chunk:
+        return Chunk(
+            id=row["id"],
+            collection_id=row["collection_id"],
+            document_id=row["document_id"],
+            text=row["text"],
+            token_count=row["token_count"],
+            order=row["chunk_order"],
+            start_char=row["start_char"],
+            end_char=row["end_char"],
+            metadata=self._loads(row["metadata_json"]),
+            embedding_ref=row["embedding_ref"],
+            created_at=self._dt(row["created_at"]),
+        )
+
     def get_chunks(self, chunk_ids: list[str]) -> list[Chunk]:
         if not chunk_ids:
             return []
-        placeholders = ",".join("?" for _ in chunk_ids)
+        rows: list[sqlite3.Row] = []
         with self._connect() as conn:
-            rows = conn.execute(
-                f"SELECT * FROM chunks WHERE id IN ({placeholders})",
-                tuple(chunk_ids),
-            ).fetchall()
-        return [
-            Chunk(
-                id=row["id"],
-                collection_id=row["collection_id"],
-                document_id=row["document_id"],
-                text=row["text"],
-                token_count=row["token_count"],
-                order=row["chunk_order"],
-                metadata=self._loads(row["metadata_json"]),
-                embedding_ref=row["embedding_ref"],
-                created_at=self._dt(row["created_at"]),
-            )
-            for row in rows
-        ]
+            for start in range(0, len(chunk_ids), 500):
+                batch = chunk_ids[start : start + 500]
+                placeholders = ",".join("?" for _ in batch)
+                rows.extend(conn.execute(f"SELECT * FROM chunks WHERE id IN ({placeholders})", tuple(batch)).fetchall())
+        return [self._row_to_chunk(row) for row in rows]
 
     def list_chunks_by_document(self, document_id: str, limit: int, offset: int) -> list[Chunk]:
         with self._connect() as conn:
@@ -339,26 +510,44 @@ class SQLiteRepository:
                 """,
                 (document_id, limit, offset),
             ).fetchall()
+        return [self._row_to_chunk(row) for row in rows]
+
+    def delete_chunks_by_document(self, document_id: str) -> None:
+        with self._lock, self._connect() as conn:
+            chunk_ids = conn.execute("SELECT id FROM chunks WHERE document_id = ?", (document_id,)).fetchall()
+            conn.executemany("DELETE FROM chunks_fts WHERE rowid = ?", [(_fts_rowid(row["id"]),) for row in chunk_ids])
+            conn.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
+            conn.commit()
+
+    def search_chunks(self, query: str, top_k: int, collection_ids: list[str] | None = None) -> list[VectorHit]:
+        match = build_match_query(query)
+        if not match:
+            return []
+        sql = """
+            SELECT chunk_id, collection_id, document_id, bm25(chunks_fts) AS rank
+            FROM chunks_fts
+            WHERE chunks_fts MATCH ?
+        """
+        params: list[Any] = [match]
+        if collection_ids is not None:
+            sql += f" AND collection_id IN ({','.join('?' for _ in collection_ids)})"
+            params.extend(collection_ids)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(top_k)
+        with self._connect() as conn:
+            rows = conn.execute(sql, tuple(params)).fetchall()
+        # bm25() is lower-is-better; negate it so scores sort like vector similarities.
         return [
-            Chunk(
-                id=row["id"],
+            VectorHit(
+                id=row["chunk_id"],
+                score=-float(row["rank"]),
                 collection_id=row["collection_id"],
                 document_id=row["document_id"],
-                text=row["text"],
-                token_count=row["token_count"],
-                order=row["chunk_order"],
-                metadata=self._loads(row["metadata_json"]),
-                embedding_ref=row["embedding_ref"],
-                created_at=self._dt(row["created_at"]),
+                chunk_id=row["chunk_id"],
             )
             for row in rows
         ]
 
-    def delete_chunks_by_document(self, document_id: str) -> None:
-        with self._lock, self._connect() as conn:
-            conn.execute("DELETE FROM chunks WHERE document_id = ?", (document_id,))
-            conn.commit()
-
     def create_job(self, job: Job) -> Job:
         with self._lock, self._connect() as conn:
             conn.execute(
@@ -485,8 +674,14 @@ class SQLiteRepository:
         document_id: str,
         vector_id: str,
     ) -> None:
+        self.upsert_chunk_vector_map_many([(chunk_id, collection_id, document_id, vector_id)])
+
+    def upsert_chunk_vector_map_many(self, mappings: list[tuple[str, str, str, str]]) -> None:
+        """Write ``(chunk_id, collection_id, document_id, vector_id)`` rows in one transaction."""
+        if not mappings:
+            return
         with self._lock, self._connect() as conn:
-            conn.execute(
+            conn.executemany(
                 """
                 INSERT INTO chunk_vector_map(chunk_id, collection_id, document_id, vector_id)
                 VALUES (?, ?, ?, ?)
@@ -495,11 +690,11 @@ class SQLiteRepository:
                     document_id = excluded.document_id,
                     vector_id = excluded.vector_id
                 """,
-                (chunk_id, collection_id, document_id, vector_id),
+                mappings,
             )
             conn.commit()
 
     def delete_chunk_vector_map_by_document(self, document_id: str) -> None:
         with self._lock, self._connect() as conn:
             conn.execute("DELETE FROM chunk_vector_map WHERE document_id = ?", (document_id,))
-            conn.commit()
+            conn.commit()
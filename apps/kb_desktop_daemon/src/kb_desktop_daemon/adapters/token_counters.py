@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from tokenizers import Tokenizer
+
+
+class TokenizerFileCounter:
+    """Exact token counts from a Hugging Face ``tokenizer.json`` matching the embedding model."""
+
+    def __init__(self, path: str) -> None:
+        self._tokenizer = Tokenizer.from_file(path)
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        if not texts:
+            return []
+        return [len(encoding.ids) for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import secrets
 from pathlib import Path
+from typing import Literal
 
-from pydantic import Field
+from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,22 +18,84 @@ class Settings(BaseSettings):
 
     llm_provider: str = "ollama"
     embedding_provider: str = "ollama"
+    reranker_provider: str = "none"
+    http_max_connections: int = 100
+    async_io_workers: int = 16
 
     ollama_base_url: str = "http://127.0.0.1:11434"
     ollama_llm_model: str = "qwen2.5:7b-instruct"
     ollama_embed_model: str = "nomic-embed-text"
+    ollama_embed_batch_size: int = 64
+    ollama_embed_concurrency: int = 4
+    ollama_keep_alive: str = "30m"
+    ollama_max_concurrency: int = 8
+    ollama_requests_per_second: float = 0.0
+    ollama_tokens_per_minute: float = 0.0
 
     open_compat_base_url: str = "https://api.openai.com/v1"
     open_compat_api_key: str = "YOUR_KEY"
     open_compat_llm_model: str = "gpt-4o-mini"
     open_compat_embed_model: str = "text-embedding-3-small"
+    open_compat_embed_batch_items: int = 256
+    open_compat_embed_batch_tokens: int = 8000
+    open_compat_embed_concurrency: int = 4
+    open_compat_max_retries: int = 4
+    open_compat_max_concurrency: int = 32
+    open_compat_requests_per_second: float = 0.0
+    open_compat_tokens_per_minute: float = 0.0
+    hashing_embed_dim: int = 384
+    hashing_ngram_min: int = 2
+    hashing_ngram_max: int = 4
+    provider_min_concurrency: int = 1
+    provider_latency_tolerance: float = 2.0
+
+    embedding_warmup: bool = True
+    embedding_cache_enabled: bool = True
+    embedding_cache_max_mb: int = 512
 
     retrieve_top_k: int = 10
+    vector_query_workers: int = 4
+    retrieve_mode: str = "vector"
+    retrieve_overfetch: bool = False
+    retrieve_overfetch_factor: float = 2.0
+    retrieve_max_candidates: int = 1000
+    rerank_candidates: int = 50
+    rerank_batch_size: int = 16
+    rerank_budget_ms: float | None = 250.0
+    rerank_cache_size: int = 10000
+    retrieve_mmr: bool = False
+    retrieve_mmr_lambda: float = 0.5
+    retrieve_mmr_candidates: int = 50
+    retrieve_max_per_document: int | None = None
+    answer_max_context_chars: int = 6000
+    query_cache_size: int = 1024
+    query_cache_ttl_seconds: float = 600.0
     chunk_size: int = 800
     chunk_overlap: int = 120
+    chunk_tokens: int | None = None
+    token_counter: str = "heuristic"
+    tokenizer_path: str | None = None
+    ingest_streaming: bool = False
+    ingest_batch_size: int = 64
+    ingest_dedup: Literal["off", "reuse", "clone"] = "off"
+    ingest_dedup_scope: Literal["collection", "global"] = "collection"
+    ingest_pipeline: bool = False
+    ingest_parse_workers: int = 2
+    ingest_chunk_workers: int = 1
+    ingest_embed_workers: int = 2
+    ingest_upsert_workers: int = 1
+    ingest_queue_size: int = 8
+    pdf_parse_workers: int = 1
+    pdf_pages_per_task: int = 16
 
     daemon_state_dir: str = Field(default="~/.openwork/kb")
 
+    @model_validator(mode="after")
+    def _check_dedup(self) -> Settings:
+        if self.ingest_dedup == "reuse" and self.ingest_dedup_scope == "global":
+            raise ValueError("INGEST_DEDUP=reuse requires INGEST_DEDUP_SCOPE=collection; use clone for global")
+        return self
+
     @property
     def data_dir(self) -> Path:
         return Path(self.app_data_dir).resolve()
@@ -41,6 +104,10 @@ class Settings(BaseSettings):
     def sqlite_path(self) -> Path:
         return self.data_dir / "kb.sqlite3"
 
+    @property
+    def embedding_cache_path(self) -> Path:
+        return self.data_dir / "embedding_cache.sqlite3"
+
     @property
     def chroma_path(self) -> Path:
         return self.data_dir / "chroma"
@@ -49,6 +116,10 @@ class Settings(BaseSettings):
     def blob_path(self) -> Path:
         return self.data_dir / "blobs"
 
+    @property
+    def artifact_path(self) -> Path:
+        return self.data_dir / "artifacts"
+
     @property
     def daemon_state_path(self) -> Path:
         return Path(self.daemon_state_dir).expanduser() / "daemon.json"
@@ -57,6 +128,7 @@ class Settings(BaseSettings):
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.chroma_path.mkdir(parents=True, exist_ok=True)
         self.blob_path.mkdir(parents=True, exist_ok=True)
+        self.artifact_path.mkdir(parents=True, exist_ok=True)
         self.daemon_state_path.parent.mkdir(parents=True, exist_ok=True)
 
     def resolved_auth_token(self) -> str:
@@ -1,44 +1,123 @@
 from __future__ import annotations
 
 import json
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 from typing import Any
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
-from kb_core.models import Collection, IngestOptions, Job, JobStatus, JobType, MetadataFilter
+from fastapi.responses import StreamingResponse
+from kb_core.models import (
+    Collection,
+    Document,
+    IngestOptions,
+    Job,
+    JobStatus,
+    JobType,
+    MetadataFilter,
+    RetrieveOptions,
+    RetrieveResult,
+)
 from kb_core.pipelines import (
+    IngestTask,
+    aretrieve,
+    build_answer_messages,
     delete_document,
     get_document_original,
     ingest_document,
     list_document_chunks,
-    retrieve,
+    pack_context,
+    rechunk_document,
 )
+from kb_core.services import CachedEmbedder
 
 from kb_desktop_daemon.http.auth import require_auth
+from kb_desktop_daemon.http.context import AppContext
 from kb_desktop_daemon.http.schemas import (
+    AnswerRequest,
     CapabilitiesResponse,
     CreateCollectionRequest,
     DeleteResponse,
     IngestResponse,
+    RechunkRequest,
+    RechunkResponse,
     RetrieveRequest,
 )
+from kb_desktop_daemon.http.worker import mark_job_finished, mark_job_running
 
 
 def utcnow() -> datetime:
     return datetime.now(UTC)
 
 
+def _retrieve_options(payload: RetrieveRequest, ctx: AppContext) -> RetrieveOptions:
+    options = RetrieveOptions(
+        mode=payload.mode or ctx.settings.retrieve_mode,
+        overfetch=ctx.settings.retrieve_overfetch if payload.overfetch is None else payload.overfetch,
+        overfetch_factor=ctx.settings.retrieve_overfetch_factor,
+        max_candidates=payload.max_candidates or ctx.settings.retrieve_max_candidates,
+        latency_budget_ms=payload.latency_budget_ms,
+        rerank=ctx.reranker is not None if payload.rerank is None else payload.rerank,
+        rerank_candidates=payload.rerank_candidates or ctx.settings.rerank_candidates,
+        rerank_batch_size=ctx.settings.rerank_batch_size,
+        rerank_budget_ms=ctx.settings.rerank_budget_ms,
+        mmr=ctx.settings.retrieve_mmr if payload.mmr is None else payload.mmr,
+        mmr_lambda=ctx.settings.retrieve_mmr_lambda if payload.mmr_lambda is None else payload.mmr_lambda,
+        mmr_candidates=ctx.settings.retrieve_mmr_candidates,
+        max_per_document=payload.max_per_document or ctx.settings.retrieve_max_per_document,
+    )
+    if options.rerank and ctx.reranker is None:
+        raise HTTPException(status_code=400, detail="No reranker configured")
+    return options
+
+
+async def _aretrieve(payload: RetrieveRequest, ctx: AppContext, *, include_chunks: bool) -> RetrieveResult:
+    options = _retrieve_options(payload, ctx)
+    return await aretrieve(
+        query=payload.query,
+        collection_ids=payload.collection_ids,
+        top_k=payload.top_k or ctx.settings.retrieve_top_k,
+        include_chunks=include_chunks,
+        filters=MetadataFilter(equals=payload.filters or {}) if payload.filters else None,
+        embedder=ctx.async_embedder,
+        vector_index=ctx.async_vector_index,
+        chunk_store=ctx.async_chunk_store,
+        document_store=ctx.async_document_store,
+        query_cache=ctx.query_cache,
+        options=options,
+        lexical_index=ctx.repo,
+        reranker=ctx.reranker,
+        rerank_cache=ctx.rerank_cache,
+    )
+
+
+def _claim_embedding_model(ctx: AppContext, collection_id: str) -> None:
+    """Bind the collection to the active embedding model, or refuse with 409 if its chunks use another."""
+    if ctx.repo.get_collection(collection_id) is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    bound = ctx.repo.set_collection_embedding_model(collection_id, ctx.embedding_model)
+    if bound != ctx.embedding_model:
+        # Vectors from two models share no space; mixing them would silently ruin retrieval.
+        raise HTTPException(status_code=409, detail=f"Collection is indexed with {bound}, not {ctx.embedding_model}")
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 def build_api_router() -> APIRouter:
     router = APIRouter(prefix="/api/v1", dependencies=[Depends(require_auth)])
 
     @router.get("/capabilities", response_model=CapabilitiesResponse)
-    def capabilities() -> CapabilitiesResponse:
+    def capabilities(request: Request) -> CapabilitiesResponse:
+        ctx = request.app.state.ctx
         return CapabilitiesResponse(
             parsers=["text", "pdf", "docx"],
             providers={
                 "llm": ["ollama", "open_compat"],
-                "embedding": ["ollama", "open_compat"],
+                "embedding": ["ollama", "open_compat", "hashing"],
+                "reranker": ["none", "local"],
             },
             features={
                 "retrieve": True,
@@ -47,9 +126,50 @@ def build_api_router() -> APIRouter:
                 "list_collection_documents": True,
                 "view_document_original": True,
                 "view_document_chunks": True,
+                "streaming_ingest": True,
+                "ingest_dedup": True,
+                "embedding_cache": ctx.settings.embedding_cache_enabled,
+                "retrieve_overfetch": True,
+                "retrieve_modes": ["vector", "hybrid", "lexical"],
+                "rerank": ctx.reranker is not None,
+                "mmr": True,
+                "async_retrieve": True,
+                "answer_stream": True,
+                "token_budget_chunking": True,
+                "staged_ingest": ctx.settings.ingest_pipeline,
+                "parsed_artifacts": True,
+                "rechunk": True,
+                "provider_gateway": True,
+                "embedding_model_registry": True,
             },
         )
 
+    @router.get("/stats")
+    def stats(request: Request) -> dict[str, Any]:
+        ctx = request.app.state.ctx
+        payload: dict[str, Any] = {}
+        if isinstance(ctx.embedder, CachedEmbedder):
+            payload["embedding_cache"] = ctx.embedder.stats()
+        if ctx.query_cache is not None:
+            payload["query_embedding_cache"] = ctx.query_cache.stats()
+        if ctx.rerank_cache is not None:
+            payload["rerank_cache"] = ctx.rerank_cache.stats()
+        if ctx.ingest_pipeline is not None:
+            payload["ingest_pipeline"] = ctx.ingest_pipeline.stats()
+        if ctx.warmup is not None:
+            payload["embedding_warmup"] = ctx.warmup.stats()
+        if ctx.provider_gateways:
+            payload["provider_gateways"] = {name: gateway.stats() for name, gateway in ctx.provider_gateways.items()}
+        return payload
+
+    @router.get("/embedding-models")
+    def list_embedding_models(request: Request) -> dict[str, Any]:
+        ctx = request.app.state.ctx
+        return {
+            "active": ctx.embedding_model,
+            "models": [info.model_dump() for info in ctx.repo.list_embedding_models()],
+        }
+
     @router.post("/collections")
     def create_collection(payload: CreateCollectionRequest, request: Request) -> dict[str, Any]:
         ctx = request.app.state.ctx
@@ -100,6 +220,7 @@ def build_api_router() -> APIRouter:
     @router.delete("/collections/{collection_id}")
     def delete_collection(collection_id: str, request: Request) -> dict[str, bool]:
         ctx = request.app.state.ctx
+        ctx.vector_index.delete_collection(collection_id)
         ctx.repo.delete_collection(collection_id)
         return {"ok": True}
 
@@ -111,23 +232,30 @@ def build_api_router() -> APIRouter:
         options: str = Form(default="{}"),
     ) -> IngestResponse:
         ctx = request.app.state.ctx
-        collection = ctx.repo.get_collection(collection_id)
-        if collection is None:
-            raise HTTPException(status_code=404, detail="Collection not found")
+        _claim_embedding_model(ctx, collection_id)
 
         try:
             parsed_opts = json.loads(options)
         except json.JSONDecodeError as exc:
             raise HTTPException(status_code=400, detail=f"Invalid options JSON: {exc}") from exc
 
+        try:
+            ingest_options = IngestOptions(
+                chunk_size=int(parsed_opts.get("chunk_size", ctx.settings.chunk_size)),
+                chunk_overlap=int(parsed_opts.get("chunk_overlap", ctx.settings.chunk_overlap)),
+                chunk_tokens=parsed_opts.get("chunk_tokens", ctx.settings.chunk_tokens),
+                parser_name=parsed_opts.get("parser_name"),
+                metadata=parsed_opts.get("metadata", {}),
+                streaming=bool(parsed_opts.get("streaming", ctx.settings.ingest_streaming)),
+                batch_size=int(parsed_opts.get("batch_size", ctx.settings.ingest_batch_size)),
+                dedup=parsed_opts.get("dedup", ctx.settings.ingest_dedup),
+                dedup_scope=parsed_opts.get("dedup_scope", ctx.settings.ingest_dedup_scope),
+            )
+        except (ValueError, TypeError) as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid options: {exc}") from exc
+
         data = await file.read()
         document_id = str(uuid4())
-        ingest_options = IngestOptions(
-            chunk_size=int(parsed_opts.get("chunk_size", ctx.settings.chunk_size)),
-            chunk_overlap=int(parsed_opts.get("chunk_overlap", ctx.settings.chunk_overlap)),
-            parser_name=parsed_opts.get("parser_name"),
-            metadata=parsed_opts.get("metadata", {}),
-        )
 
         job = Job(
             type=JobType.INGEST,
@@ -141,9 +269,42 @@ def build_api_router() -> APIRouter:
         )
         ctx.repo.create_job(job)
 
+        def _on_progress(count: int) -> None:
+            ctx.repo.update_job(job.id, message=f"{count} chunks indexed")
+
+        def _on_deduplicated(document: Document) -> None:
+            # Deduplicated onto an already ingested document; point the job at it.
+            ctx.repo.update_job(
+                job.id,
+                payload={**job.payload, "document_id": document.id, "deduplicated": True},
+                message="Duplicate content; reused existing document",
+            )
+
+        if ctx.ingest_pipeline is not None:
+
+            def _on_done(document: Document | None, error: BaseException | None) -> None:
+                if error is None and document is not None and document.id != document_id:
+                    _on_deduplicated(document)
+                mark_job_finished(ctx.repo, job.id, error)
+
+            ctx.ingest_pipeline.submit(
+                IngestTask(
+                    collection_id=collection_id,
+                    filename=file.filename or "upload.bin",
+                    mime=file.content_type or "application/octet-stream",
+                    content=data,
+                    options=ingest_options,
+                    document_id=document_id,
+                    on_start=lambda: mark_job_running(ctx.repo, job.id),
+                    on_progress=_on_progress,
+                    on_done=_on_done,
+                )
+            )
+            return IngestResponse(job_id=job.id, document_id=document_id)
+
         def _task() -> None:
             ctx.repo.update_job(job.id, progress=30)
-            ingest_document(
+            document = ingest_document(
                 collection_id=collection_id,
                 filename=file.filename or "upload.bin",
                 mime=file.content_type or "application/octet-stream",
@@ -155,31 +316,47 @@ def build_api_router() -> APIRouter:
                 embedder=ctx.embedder,
                 parsers=ctx.parsers,
                 options=ingest_options,
+                token_counter=ctx.token_counter,
+                artifact_store=ctx.artifact_store,
+                collection_store=ctx.repo,
                 document_id=document_id,
+                on_progress=_on_progress,
             )
+            if document.id != document_id:
+                _on_deduplicated(document)
             ctx.repo.update_job(job.id, progress=90)
 
         ctx.worker.submit(job.id, _task)
         return IngestResponse(job_id=job.id, document_id=document_id)
 
     @router.post("/retrieve")
-    def retrieve_api(payload: RetrieveRequest, request: Request) -> dict[str, Any]:
+    async def retrieve_api(payload: RetrieveRequest, request: Request) -> dict[str, Any]:
+        result = await _aretrieve(payload, request.app.state.ctx, include_chunks=payload.include_chunks)
+        return result.model_dump()
+
+    @router.post("/answer")
+    async def answer_api(payload: AnswerRequest, request: Request) -> StreamingResponse:
         ctx = request.app.state.ctx
-        filter_obj = MetadataFilter(equals=payload.filters or {}) if payload.filters else None
-        top_k = payload.top_k or ctx.settings.retrieve_top_k
-
-        result = retrieve(
-            query=payload.query,
-            collection_ids=payload.collection_ids,
-            top_k=top_k,
-            include_chunks=payload.include_chunks,
-            filters=filter_obj,
-            embedder=ctx.embedder,
-            vector_index=ctx.vector_index,
-            chunk_store=ctx.repo,
-            document_store=ctx.repo,
+        # Retrieval errors surface as normal HTTP errors before the stream starts.
+        result = await _aretrieve(payload, ctx, include_chunks=True)
+        hits = pack_context(result.hits, max_chars=payload.max_context_chars or ctx.settings.answer_max_context_chars)
+        messages = build_answer_messages(payload.query, hits)
+
+        async def events() -> AsyncIterator[str]:
+            yield _sse("context", {"hits": [hit.model_dump(exclude={"text"}) for hit in hits]})
+            try:
+                async for token in ctx.async_llm_client.stream_chat(messages, temperature=payload.temperature):
+                    yield _sse("token", {"text": token})
+            except Exception as exc:
+                yield _sse("error", {"detail": str(exc)})
+                return
+            yield _sse("done", {})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
-        return result.model_dump()
 
     @router.delete("/documents/{document_id}", response_model=DeleteResponse)
     def delete_document_api(document_id: str, request: Request) -> DeleteResponse:
@@ -203,11 +380,58 @@ def build_api_router() -> APIRouter:
                 document_store=ctx.repo,
                 chunk_store=ctx.repo,
                 vector_index=ctx.vector_index,
+                artifact_store=ctx.artifact_store,
             )
 
         ctx.worker.submit(job.id, _task)
         return DeleteResponse(job_id=job.id)
 
+    @router.post("/documents/{document_id}/rechunk", response_model=RechunkResponse)
+    def rechunk_document_api(document_id: str, payload: RechunkRequest, request: Request) -> RechunkResponse:
+        ctx = request.app.state.ctx
+        document = ctx.repo.get_document(document_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        _claim_embedding_model(ctx, document.collection_id)
+
+        # An explicit null clears the configured token budget; omitting the field keeps it.
+        chunk_tokens = payload.chunk_tokens if "chunk_tokens" in payload.model_fields_set else ctx.settings.chunk_tokens
+        rechunk_options = IngestOptions(
+            chunk_size=payload.chunk_size or ctx.settings.chunk_size,
+            chunk_overlap=payload.chunk_overlap if payload.chunk_overlap is not None else ctx.settings.chunk_overlap,
+            chunk_tokens=chunk_tokens,
+            batch_size=payload.batch_size or ctx.settings.ingest_batch_size,
+        )
+        job = Job(
+            type=JobType.RECHUNK,
+            status=JobStatus.QUEUED,
+            payload={
+                "document_id": document_id,
+                "collection_id": document.collection_id,
+                "options": rechunk_options.model_dump(include={"chunk_size", "chunk_overlap", "chunk_tokens"}),
+            },
+            created_at=utcnow(),
+        )
+        ctx.repo.create_job(job)
+
+        def _task() -> None:
+            rechunk_document(
+                document_id=document_id,
+                document_store=ctx.repo,
+                chunk_store=ctx.repo,
+                vector_index=ctx.vector_index,
+                embedder=ctx.embedder,
+                blob_store=ctx.blob_store,
+                parsers=ctx.parsers,
+                options=rechunk_options,
+                artifact_store=ctx.artifact_store,
+                token_counter=ctx.token_counter,
+                on_progress=lambda count: ctx.repo.update_job(job.id, message=f"{count} chunks indexed"),
+            )
+
+        ctx.worker.submit(job.id, _task)
+        return RechunkResponse(job_id=job.id)
+
     @router.get("/documents/{document_id}/original")
     def view_document_original(document_id: str, request: Request) -> dict[str, Any]:
         ctx = request.app.state.ctx
@@ -217,6 +441,7 @@ def build_api_router() -> APIRouter:
                 document_store=ctx.repo,
                 blob_store=ctx.blob_store,
                 parsers=ctx.parsers,
+                artifact_store=ctx.artifact_store,
             )
         except ValueError as exc:
             raise HTTPException(status_code=404, detail=str(exc)) from exc
@@ -269,4 +494,4 @@ def build_api_router() -> APIRouter:
             raise HTTPException(status_code=404, detail="Job not found")
         return job.model_dump()
 
-    return router
+    return router
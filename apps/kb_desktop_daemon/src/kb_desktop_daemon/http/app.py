@@ -1,21 +1,35 @@
 from __future__ import annotations
 
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import FileResponse, JSONResponse
+from kb_core.pipelines import RerankScoreCache, StagedIngestPipeline
+from kb_core.ports import Embedder
+from kb_core.services import (
+    CachedEmbedder,
+    QueryEmbeddingCache,
+    ThreadedChunkStore,
+    ThreadedDocumentStore,
+    ThreadedVectorIndex,
+)
 
 from kb_desktop_daemon.adapters import (
     ChromaVectorIndex,
+    LocalArtifactStore,
     LocalBlobStore,
+    PdfParser,
     ProviderFactory,
+    SQLiteEmbeddingCache,
     SQLiteRepository,
     default_parsers,
 )
 from kb_desktop_daemon.config import Settings
 from kb_desktop_daemon.http.api import build_api_router
 from kb_desktop_daemon.http.context import AppContext
+from kb_desktop_daemon.http.warmup import EmbeddingWarmup, RecordingEmbedder
 from kb_desktop_daemon.http.worker import JobWorker
 
 
@@ -32,19 +46,86 @@ def create_app(settings: Settings | None = None, auth_token: str | None = None)
 
     repo = SQLiteRepository(str(cfg.sqlite_path))
     provider_factory = ProviderFactory(cfg)
-    embedder = provider_factory.create_embedder()
+    embedding_provider = cfg.embedding_provider.lower()
+    embedding_model = provider_factory.embedding_model()
+    # A registered dimension spares the embedder its live probe request.
+    known_model = repo.get_embedding_model(embedding_provider, embedding_model)
+    provider_embedder = provider_factory.create_embedder(dim=known_model.dim if known_model is not None else None)
+    embedder: Embedder = provider_embedder
+    if known_model is None:
+        embedder = RecordingEmbedder(embedder, repo, provider=embedding_provider, model=embedding_model)
+    if cfg.embedding_cache_enabled:
+        embedder = CachedEmbedder(
+            embedder,
+            SQLiteEmbeddingCache(str(cfg.embedding_cache_path), max_bytes=cfg.embedding_cache_max_mb * 1024 * 1024),
+            provider=embedding_provider,
+            model=embedding_model,
+        )
+    warmup = None
+    if cfg.embedding_warmup:
+        # Warm the provider directly: a cached probe would never reach the model.
+        warmup = EmbeddingWarmup(provider_embedder, repo, provider=embedding_provider, model=embedding_model)
     llm_client = provider_factory.create_llm_client()
+    query_cache = None
+    if cfg.query_cache_size > 0:
+        query_cache = QueryEmbeddingCache(
+            model=f"{embedding_provider}:{embedding_model}",
+            max_entries=cfg.query_cache_size,
+            ttl_seconds=cfg.query_cache_ttl_seconds,
+        )
+
+    vector_index = ChromaVectorIndex(str(cfg.chroma_path), repo=repo, query_workers=cfg.vector_query_workers)
+    # Async routes keep blocking SQLite/Chroma calls off the event loop on a bounded pool.
+    io_executor = ThreadPoolExecutor(max_workers=cfg.async_io_workers, thread_name_prefix="kb-io")
+    http_client = provider_factory.create_http_client()
+    blob_store = LocalBlobStore(str(cfg.blob_path))
+    artifact_store = LocalArtifactStore(str(cfg.artifact_path))
+    parsers = default_parsers(pdf_workers=cfg.pdf_parse_workers, pdf_pages_per_task=cfg.pdf_pages_per_task)
+    token_counter = provider_factory.create_token_counter()
+    ingest_pipeline = None
+    if cfg.ingest_pipeline:
+        ingest_pipeline = StagedIngestPipeline(
+            blob_store=blob_store,
+            document_store=repo,
+            chunk_store=repo,
+            vector_index=vector_index,
+            embedder=embedder,
+            parsers=parsers,
+            token_counter=token_counter,
+            artifact_store=artifact_store,
+            collection_store=repo,
+            parse_workers=cfg.ingest_parse_workers,
+            chunk_workers=cfg.ingest_chunk_workers,
+            embed_workers=cfg.ingest_embed_workers,
+            upsert_workers=cfg.ingest_upsert_workers,
+            queue_size=cfg.ingest_queue_size,
+        )
 
     ctx = AppContext(
         settings=cfg,
         auth_token=token,
         repo=repo,
-        vector_index=ChromaVectorIndex(str(cfg.chroma_path), repo=repo),
-        blob_store=LocalBlobStore(str(cfg.blob_path)),
+        vector_index=vector_index,
+        blob_store=blob_store,
         embedder=embedder,
         llm_client=llm_client,
-        parsers=default_parsers(),
+        parsers=parsers,
         worker=JobWorker(repo=repo),
+        http_client=http_client,
+        async_embedder=provider_factory.create_async_embedder(http_client),
+        async_vector_index=ThreadedVectorIndex(vector_index, io_executor),
+        async_chunk_store=ThreadedChunkStore(repo, io_executor),
+        async_document_store=ThreadedDocumentStore(repo, io_executor),
+        async_llm_client=provider_factory.create_async_llm_client(http_client),
+        token_counter=token_counter,
+        artifact_store=artifact_store,
+        embedding_model=f"{embedding_provider}:{embedding_model}",
+        query_cache=query_cache,
+        reranker=provider_factory.create_reranker(),
+        rerank_cache=RerankScoreCache(cfg.rerank_cache_size),
+        ingest_pipeline=ingest_pipeline,
+        provider_gateways=provider_factory.gateways,
+        warmup=warmup,
     )
 
     app = FastAPI(title="KB Desktop Daemon", version="0.1.0")
@@ -54,10 +135,22 @@ def create_app(settings: Settings | None = None, auth_token: str | None = None)
     @app.on_event("startup")
     def on_startup() -> None:
         app.state.ctx.worker.start()
+        if app.state.ctx.ingest_pipeline is not None:
+            app.state.ctx.ingest_pipeline.start()
+        if app.state.ctx.warmup is not None:
+            app.state.ctx.warmup.start()
 
     @app.on_event("shutdown")
-    def on_shutdown() -> None:
+    async def on_shutdown() -> None:
         app.state.ctx.worker.stop()
+        if app.state.ctx.ingest_pipeline is not None:
+            app.state.ctx.ingest_pipeline.stop()
+        await app.state.ctx.http_client.aclose()
+        for parser in app.state.ctx.parsers:
+            if isinstance(parser, PdfParser):
+                parser.close()
+        app.state.ctx.vector_index.close()
+        io_executor.shutdown(wait=False)
 
     @app.get("/healthz")
     def healthz() -> dict[str, str]:
@@ -1,11 +1,31 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from kb_core.ports import Embedder, LLMClient
+import httpx
+from kb_core.pipelines import RerankScoreCache, StagedIngestPipeline
+from kb_core.ports import (
+    AsyncChunkStore,
+    AsyncDocumentStore,
+    AsyncEmbedder,
+    AsyncLLMClient,
+    AsyncVectorIndex,
+    Embedder,
+    LLMClient,
+    Reranker,
+    TokenCounter,
+)
+from kb_core.services import QueryEmbeddingCache
 
-from kb_desktop_daemon.adapters import ChromaVectorIndex, LocalBlobStore, SQLiteRepository
+from kb_desktop_daemon.adapters import (
+    ChromaVectorIndex,
+    LocalArtifactStore,
+    LocalBlobStore,
+    ProviderGateway,
+    SQLiteRepository,
+)
 from kb_desktop_daemon.config import Settings
+from kb_desktop_daemon.http.warmup import EmbeddingWarmup
 from kb_desktop_daemon.http.worker import JobWorker
 
 
@@ -19,4 +39,20 @@ class AppContext:
     embedder: Embedder
     llm_client: LLMClient
     parsers: list[object]
-    worker: JobWorker
+    worker: JobWorker
+    http_client: httpx.AsyncClient
+    async_embedder: AsyncEmbedder
+    async_vector_index: AsyncVectorIndex
+    async_chunk_store: AsyncChunkStore
+    async_document_store: AsyncDocumentStore
+    async_llm_client: AsyncLLMClient
+    token_counter: TokenCounter
+    artifact_store: LocalArtifactStore
+    # "<provider>:<model>" of the active embedder, recorded on the collections it indexes.
+    embedding_model: str
+    query_cache: QueryEmbeddingCache | None = None
+    reranker: Reranker | None = None
+    rerank_cache: RerankScoreCache | None = None
+    ingest_pipeline: StagedIngestPipeline | None = None
+    provider_gateways: dict[str, ProviderGateway] = field(default_factory=dict)
+    warmup: EmbeddingWarmup | None = None
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -15,6 +17,20 @@ class RetrieveRequest(BaseModel):
     top_k: int = 10
     filters: dict | None = None
     include_chunks: bool = True
+    mode: Literal["vector", "hybrid", "lexical"] | None = None
+    overfetch: bool | None = None
+    max_candidates: int | None = Field(default=None, ge=1)
+    latency_budget_ms: float | None = Field(default=None, gt=0)
+    rerank: bool | None = None
+    rerank_candidates: int | None = Field(default=None, ge=1)
+    mmr: bool | None = None
+    mmr_lambda: float | None = Field(default=None, ge=0.0, le=1.0)
+    max_per_document: int | None = Field(default=None, ge=1)
+
+
+class AnswerRequest(RetrieveRequest):
+    temperature: float = Field(default=0.0, ge=0.0, le=2.0)
+    max_context_chars: int | None = Field(default=None, ge=1)
 
 
 class IngestResponse(BaseModel):
@@ -26,7 +42,18 @@ class DeleteResponse(BaseModel):
     job_id: str
 
 
+class RechunkRequest(BaseModel):
+    chunk_size: int | None = Field(default=None, ge=1)
+    chunk_overlap: int | None = Field(default=None, ge=0)
+    chunk_tokens: int | None = Field(default=None, ge=1)
+    batch_size: int | None = Field(default=None, ge=1)
+
+
+class RechunkResponse(BaseModel):
+    job_id: str
+
+
 class CapabilitiesResponse(BaseModel):
     parsers: list[str]
     providers: dict
-    features: dict
+    features: dict
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any
+
+from kb_core.models import EmbeddingModelInfo
+from kb_core.ports import Embedder, EmbeddingModelStore
+
+
+def _model_info(embedder: Embedder, vector: list[float], *, provider: str, model: str) -> EmbeddingModelInfo:
+    norm = math.sqrt(sum(value * value for value in vector))
+    max_input_tokens = getattr(embedder, "max_input_tokens", None)
+    return EmbeddingModelInfo(
+        provider=provider,
+        model=model,
+        dim=len(vector),
+        normalized=abs(norm - 1.0) < 1e-3,
+        max_input_tokens=max_input_tokens() if callable(max_input_tokens) else None,
+    )
+
+
+class RecordingEmbedder:
+    """Embedder wrapper that records the model in the registry after its first successful embedding.
+
+    Keeps the registry filled when startup warmup is off, and answers ``dim`` from that embedding
+    so the wrapped embedder never needs its probe request.
+    """
+
+    def __init__(self, inner: Embedder, registry: EmbeddingModelStore, *, provider: str, model: str) -> None:
+        self._inner = inner
+        self._registry = registry
+        self._provider = provider
+        self._model = model
+        self._dim: int | None = None
+
+    @property
+    def inner(self) -> Embedder:
+        return self._inner
+
+    @property
+    def dim(self) -> int:
+        return self._dim if self._dim is not None else self._inner.dim
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        vectors = self._inner.embed_texts(texts)
+        if vectors and self._dim is None:
+            self._record(vectors[0])
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = self._inner.embed_query(text)
+        if self._dim is None:
+            self._record(vector)
+        return vector
+
+    def _record(self, vector: list[float]) -> None:
+        try:
+            self._registry.upsert_embedding_model(
+                _model_info(self._inner, vector, provider=self._provider, model=self._model)
+            )
+        except Exception:  # noqa: BLE001
+            # The registry is an optimization; retry on the next embedding rather than fail this one.
+            return
+        self._dim = len(vector)
+
+
+class EmbeddingWarmup:
+    """Loads the embedding model off the request path at startup and records it in the model registry.
+
+    One probe embedding forces the provider to load the model, so the first real query does not
+    pay for it, and yields the dimension and whether vectors come back unit-normalized.
+    """
+
+    def __init__(self, embedder: Embedder, registry: EmbeddingModelStore, *, provider: str, model: str) -> None:
+        self._embedder = embedder
+        self._registry = registry
+        self._provider = provider
+        self._model = model
+        self._state = "pending"
+        self._seconds: float | None = None
+        self._error: str | None = None
+        self._done = threading.Event()
+
+    def start(self) -> None:
+        threading.Thread(target=self.run, name="kb-embed-warmup", daemon=True).start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+    def run(self) -> EmbeddingModelInfo | None:
+        self._state = "running"
+        started = time.perf_counter()
+        try:
+            vector = self._embedder.embed_query("warmup")
+            info = self._registry.upsert_embedding_model(
+                _model_info(self._embedder, vector, provider=self._provider, model=self._model)
+            )
+        except Exception as exc:  # noqa: BLE001
+            self._state, self._error = "failed", str(exc)
+            return None
+        finally:
+            self._seconds = time.perf_counter() - started
+            self._done.set()
+        self._state = "ready"
+        return info
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "model": f"{self._provider}:{self._model}",
+            "state": self._state,
+            "seconds": None if self._seconds is None else round(self._seconds, 3),
+            "error": self._error,
+        }
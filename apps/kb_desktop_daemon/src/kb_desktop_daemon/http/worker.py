@@ -12,6 +12,27 @@ def utcnow() -> datetime:
     return datetime.now(UTC)
 
 
+def mark_job_running(repo: object, job_id: str) -> None:
+    repo.update_job(job_id, status=JobStatus.RUNNING, progress=10, started_at=utcnow())
+
+
+def mark_job_finished(repo: object, job_id: str, error: BaseException | None = None) -> None:
+    if error is None:
+        repo.update_job(
+            job_id,
+            status=JobStatus.SUCCEEDED,
+            progress=100,
+            finished_at=utcnow(),
+        )
+    else:
+        repo.update_job(
+            job_id,
+            status=JobStatus.FAILED,
+            message=str(error),
+            finished_at=utcnow(),
+        )
+
+
 class JobWorker:
     def __init__(self, repo: object) -> None:
         self._repo = repo
@@ -38,21 +59,11 @@ class JobWorker:
             except queue.Empty:
                 continue
 
-            self._repo.update_job(job_id, status=JobStatus.RUNNING, progress=10, started_at=utcnow())
+            mark_job_running(self._repo, job_id)
             try:
                 fn()
-                self._repo.update_job(
-                    job_id,
-                    status=JobStatus.SUCCEEDED,
-                    progress=100,
-                    finished_at=utcnow(),
-                )
+                mark_job_finished(self._repo, job_id)
             except Exception as exc:  # noqa: BLE001
-                self._repo.update_job(
-                    job_id,
-                    status=JobStatus.FAILED,
-                    message=str(exc),
-                    finished_at=utcnow(),
-                )
+                mark_job_finished(self._repo, job_id, exc)
             finally:
-                self._queue.task_done()
+                self._queue.task_done()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import multiprocessing
 import socket
 from pathlib import Path
 
@@ -44,4 +45,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
-    main()
+    # PDF parse workers are spawned; in the frozen build they re-run this script and must stop here.
+    multiprocessing.freeze_support()
+    main()
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+
+from pypdf import PdfReader
+
+# Process-pool entry point for PdfParser. It lives outside ``adapters`` so unpickling the task does
+# not pull in the adapter package. Spawned workers still re-import the parent's ``__main__`` (the
+# daemon entry point, and with it uvicorn, the HTTP app and Chroma) once at startup; the pool is
+# long-lived, so that cost is paid once per worker rather than per document.
+
+# Opening a reader walks the whole page tree, so each worker keeps the last one it opened; the
+# ranges of one document usually land on the same few workers.
+_reader_key: tuple[str, float, int] | None = None
+_reader: PdfReader | None = None
+
+
+def _open(path: str) -> PdfReader:
+    global _reader_key, _reader
+    stat = os.stat(path)
+    key = (path, stat.st_mtime, stat.st_size)
+    if _reader is None or _reader_key != key:
+        _reader, _reader_key = PdfReader(path), key
+    return _reader
+
+
+def extract_page_range(path: str, start: int, stop: int) -> list[str]:
+    """Extract pages ``[start, stop)`` (0-based)."""
+    reader = _open(path)
+    return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
@@ -0,0 +1,104 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+import httpx
+from fastapi.testclient import TestClient
+from kb_core.models import IngestOptions
+from kb_core.pipelines import ingest_document
+from kb_desktop_daemon.adapters.providers import AsyncOllamaLLMClient
+from kb_desktop_daemon.config import Settings
+from kb_desktop_daemon.http import create_app
+
+
+class StaticEmbedder:
+    @property
+    def dim(self) -> int:
+        return 2
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[1.0, float(len(text))] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0]
+
+
+class AsyncStaticEmbedder:
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return StaticEmbedder().embed_texts(texts)
+
+    async def embed_query(self, text: str) -> list[float]:
+        return StaticEmbedder().embed_query(text)
+
+
+class EchoLLM:
+    def __init__(self) -> None:
+        self.messages: list[dict] = []
+
+    async def stream_chat(self, messages: list[dict], *, temperature: float = 0.0) -> AsyncIterator[str]:
+        self.messages = messages
+        for token in ["Hybrid ", "search ", "[1]"]:
+            yield token
+
+
+def _events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_answer_streams_context_then_tokens(tmp_path) -> None:
+    settings = Settings(app_data_dir=str(tmp_path), auth_token="secret-token")
+    app = create_app(settings=settings, auth_token="secret-token")
+    ctx = app.state.ctx
+    llm = EchoLLM()
+    ctx.async_embedder = AsyncStaticEmbedder()
+    ctx.async_llm_client = llm
+    document = ingest_document(
+        collection_id="c1",
+        filename="notes.txt",
+        mime="text/plain",
+        content=b"Hybrid search fuses BM25 and vector rankings.",
+        blob_store=ctx.blob_store,
+        document_store=ctx.repo,
+        chunk_store=ctx.repo,
+        vector_index=ctx.vector_index,
+        embedder=StaticEmbedder(),
+        parsers=ctx.parsers,
+        options=IngestOptions(),
+    )
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/v1/answer",
+            json={"query": "what is hybrid search", "collection_ids": ["c1"], "top_k": 3},
+            headers={"Authorization": "Bearer secret-token"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert [name for name, _ in events] == ["context", "token", "token", "token", "done"]
+    citation = events[0][1]["hits"][0]["citation"]
+    assert citation["document_id"] == document.id
+    assert (citation["start_char"], citation["end_char"]) == (0, len("Hybrid search fuses BM25 and vector rankings."))
+    assert "".join(data["text"] for name, data in events if name == "token") == "Hybrid search [1]"
+    assert "[1] notes.txt\nHybrid search fuses BM25" in llm.messages[-1]["content"]
+
+
+def test_ollama_stream_sends_temperature() -> None:
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, text='{"message": {"content": "ok"}, "done": true}\n')
+
+    async def collect() -> list[str]:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            llm = AsyncOllamaLLMClient(client, "http://ollama", "m")
+            return [token async for token in llm.stream_chat([{"role": "user", "content": "hi"}], temperature=0.7)]
+
+    assert asyncio.run(collect()) == ["ok"]
+    assert bodies[0]["options"] == {"temperature": 0.7}
@@ -0,0 +1,27 @@
+from kb_core.models import ParsedSection
+from kb_desktop_daemon.adapters import LocalArtifactStore
+
+
+def test_local_artifact_store_round_trips_and_discards_aborted_writes(tmp_path) -> None:
+    store = LocalArtifactStore(str(tmp_path))
+    writer = store.open_writer("abc.pdfparser-v1")
+    writer.add(ParsedSection(text="第一页\n", metadata={"parser": "pdf", "page": 1}))
+    writer.add(ParsedSection(text="page two", metadata={"parser": "pdf", "page": 2}))
+    assert store.read("abc.pdfparser-v1") is None
+    writer.commit({"parser": "pdf"})
+
+    parsed = store.read("abc.pdfparser-v1")
+    assert parsed is not None
+    assert parsed.text == "第一页\npage two"
+    assert parsed.metadata == {"parser": "pdf"}
+    assert [section.metadata["page"] for section in parsed.sections] == [1, 2]
+
+    aborted = store.open_writer("other")
+    aborted.add(ParsedSection(text="partial"))
+    aborted.abort()
+    assert store.read("other") is None
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["abc.pdfparser-v1.jsonl.gz"]
+
+    store.delete_prefix("abc.")
+    assert store.read("abc.pdfparser-v1") is None
+    assert list(tmp_path.iterdir()) == []
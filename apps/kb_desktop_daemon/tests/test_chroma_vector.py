@@ -0,0 +1,103 @@
+import sqlite3
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+from kb_core.models import VectorItem
+from kb_desktop_daemon.adapters import ChromaVectorIndex, SQLiteRepository
+
+
+def _item(chunk_id: str, collection_id: str, vector: list[float]) -> VectorItem:
+    return VectorItem(
+        id=chunk_id,
+        vector=vector,
+        collection_id=collection_id,
+        document_id=f"doc-{collection_id}",
+        chunk_id=chunk_id,
+    )
+
+
+def test_query_searches_only_requested_collections(tmp_path) -> None:
+    index = ChromaVectorIndex(str(tmp_path / "chroma"))
+    index.upsert([_item("a1", "a", [1.0, 0.0]), _item("a2", "a", [0.9, 0.1])])
+    index.upsert([_item("b1", "b", [1.0, 0.0])])
+
+    hits = index.query([1.0, 0.0], top_k=5, collection_ids=["a", "missing"])
+
+    assert [hit.chunk_id for hit in hits] == ["a1", "a2"]
+    assert {hit.collection_id for hit in hits} == {"a"}
+    assert len(index.query([1.0, 0.0], top_k=5)) == 3
+
+
+def test_query_returns_vectors_only_on_request(tmp_path) -> None:
+    index = ChromaVectorIndex(str(tmp_path / "chroma"))
+    index.upsert([_item("a1", "a", [1.0, 0.0]), _item("a2", "a", [0.0, 1.0])])
+
+    assert all(hit.vector is None for hit in index.query([1.0, 0.0], top_k=2))
+    hits = index.query([1.0, 0.0], top_k=2, include_vectors=True)
+    assert [[float(v) for v in hit.vector] for hit in hits if hit.vector is not None] == [[1.0, 0.0], [0.0, 1.0]]
+
+
+def test_fan_out_merges_collections_like_a_global_sort(tmp_path) -> None:
+    index = ChromaVectorIndex(str(tmp_path / "chroma"), query_workers=3)
+    for collection_id, angles in {"a": [0.0, 0.5], "b": [0.1, 0.9], "c": [0.2, 0.3]}.items():
+        index.upsert(
+            [_item(f"{collection_id}{i}", collection_id, [1.0 - angle, angle]) for i, angle in enumerate(angles)]
+        )
+    serial = ChromaVectorIndex(str(tmp_path / "chroma"), query_workers=1)
+
+    hits = index.query([1.0, 0.0], top_k=4, collection_ids=["a", "b", "c"])
+
+    assert [hit.chunk_id for hit in hits] == ["a0", "b0", "c0", "c1"]
+    assert [hit.score for hit in hits] == sorted((hit.score for hit in hits), reverse=True)
+    assert hits == serial.query([1.0, 0.0], top_k=4, collection_ids=["a", "b", "c"])
+    index.close()
+
+
+def test_collection_handles_are_cached_and_invalidated_on_delete(tmp_path) -> None:
+    index = ChromaVectorIndex(str(tmp_path / "chroma"))
+    index.upsert([_item("a1", "a", [1.0, 0.0])])
+    index.upsert([_item("b1", "b", [0.0, 1.0])])
+    assert len(index.query([1.0, 0.0], top_k=5)) == 2
+
+    calls: list[str] = []
+
+    def spy(name: str, original: Callable[..., Any]) -> Callable[..., Any]:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            calls.append(name)
+            return original(*args, **kwargs)
+
+        return wrapper
+
+    for method in ("list_collections", "get_collection", "get_or_create_collection"):
+        setattr(index._client, method, spy(method, getattr(index._client, method)))
+
+    index.query([1.0, 0.0], top_k=5)
+    index.query([1.0, 0.0], top_k=5, collection_ids=["a", "never-indexed"])
+    index.upsert([_item("a2", "a", [0.9, 0.1])])
+    assert index.get_vectors("never-indexed", ["x"]) == {}
+    assert calls == []
+
+    index.delete_collection("a")
+    assert [hit.chunk_id for hit in index.query([1.0, 0.0], top_k=5)] == ["b1"]
+    index.upsert([_item("a3", "a", [1.0, 0.0])])
+    assert [hit.chunk_id for hit in index.query([1.0, 0.0], top_k=5, collection_ids=["a"])] == ["a3"]
+
+
+def test_upsert_records_mappings_and_rolls_back_vectors_when_they_fail(tmp_path) -> None:
+    db_path = str(tmp_path / "kb.sqlite3")
+    repo = SQLiteRepository(db_path)
+    index = ChromaVectorIndex(str(tmp_path / "chroma"), repo=repo)
+    index.upsert([_item("a1", "a", [1.0, 0.0]), _item("b1", "b", [0.0, 1.0])])
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute("SELECT chunk_id, collection_id, vector_id FROM chunk_vector_map ORDER BY 1").fetchall()
+    assert rows == [("a1", "a", "a1"), ("b1", "b", "b1")]
+
+    def fail(mappings: list[tuple[str, str, str, str]]) -> None:
+        raise sqlite3.OperationalError("database is locked")
+
+    setattr(repo, "upsert_chunk_vector_map_many", fail)
+    with pytest.raises(sqlite3.OperationalError):
+        index.upsert([_item("a2", "a", [0.9, 0.1]), _item("b2", "b", [0.1, 0.9])])
+
+    assert sorted(hit.chunk_id for hit in index.query([1.0, 0.0], top_k=5)) == ["a1", "b1"]
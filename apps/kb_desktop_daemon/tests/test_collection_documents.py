@@ -1,6 +1,9 @@
+import pytest
 from fastapi.testclient import TestClient
+from kb_core.models import Chunk, Collection, Document
 from kb_desktop_daemon.config import Settings
 from kb_desktop_daemon.http import create_app
+from pydantic import ValidationError
 
 
 def test_list_collection_documents_returns_404_for_missing_collection(tmp_path) -> None:
@@ -11,4 +14,83 @@ def test_list_collection_documents_returns_404_for_missing_collection(tmp_path)
 
     response = client.get("/api/v1/collections/missing/documents", headers=headers)
 
-    assert response.status_code == 404
+    assert response.status_code == 404
+
+
+def test_rechunk_refuses_collection_indexed_with_another_model(tmp_path) -> None:
+    settings = Settings(app_data_dir=str(tmp_path), auth_token="secret-token", embedding_provider="hashing")
+    app = create_app(settings=settings, auth_token="secret-token")
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer secret-token"}
+    repo = app.state.ctx.repo
+    collection = repo.create_collection(Collection(name="old", embedding_model="ollama:other-model"))
+    document = repo.create_document(
+        Document(collection_id=collection.id, title="a.txt", mime="text/plain", size_bytes=1, blob_ref="a")
+    )
+    repo.upsert_chunks([Chunk(collection_id=collection.id, document_id=document.id, text="old text", order=0)])
+
+    response = client.post(f"/api/v1/documents/{document.id}/rechunk", json={}, headers=headers)
+
+    assert response.status_code == 409
+    assert "ollama:other-model" in response.json()["detail"]
+
+
+def test_new_collection_binds_the_model_of_its_first_ingest(tmp_path) -> None:
+    settings = Settings(app_data_dir=str(tmp_path), auth_token="secret-token", embedding_provider="hashing")
+    app = create_app(settings=settings, auth_token="secret-token")
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer secret-token"}
+    repo = app.state.ctx.repo
+
+    created = client.post("/api/v1/collections", json={"name": "docs"}, headers=headers).json()
+    assert created["embedding_model"] is None
+
+    stale = repo.create_collection(Collection(name="stale", embedding_model="ollama:other-model"))
+    document = repo.create_document(
+        Document(collection_id=stale.id, title="a.txt", mime="text/plain", size_bytes=1, blob_ref="a")
+    )
+    response = client.post(f"/api/v1/documents/{document.id}/rechunk", json={}, headers=headers)
+
+    assert response.status_code == 200
+    assert repo.get_collection(stale.id).embedding_model == app.state.ctx.embedding_model
+
+
+def test_rechunk_null_chunk_tokens_clears_the_configured_budget(tmp_path) -> None:
+    settings = Settings(
+        app_data_dir=str(tmp_path), auth_token="secret-token", embedding_provider="hashing", chunk_tokens=200
+    )
+    app = create_app(settings=settings, auth_token="secret-token")
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer secret-token"}
+    repo = app.state.ctx.repo
+    collection = repo.create_collection(Collection(name="docs"))
+    document = repo.create_document(
+        Document(collection_id=collection.id, title="a.txt", mime="text/plain", size_bytes=1, blob_ref="a")
+    )
+
+    budgets = []
+    for body in ({}, {"chunk_tokens": None}):
+        response = client.post(f"/api/v1/documents/{document.id}/rechunk", json=body, headers=headers)
+        job = repo.get_job(response.json()["job_id"])
+        budgets.append(job.payload["options"]["chunk_tokens"])
+
+    assert budgets == [200, None]
+
+
+def test_upload_rejects_invalid_dedup_options(tmp_path) -> None:
+    settings = Settings(app_data_dir=str(tmp_path), auth_token="secret-token", embedding_provider="hashing")
+    app = create_app(settings=settings, auth_token="secret-token")
+    client = TestClient(app)
+    headers = {"Authorization": "Bearer secret-token"}
+    collection = app.state.ctx.repo.create_collection(Collection(name="docs"))
+
+    for options in ('{"dedup": "resue"}', '{"dedup": "reuse", "dedup_scope": "global"}'):
+        response = client.post(
+            "/api/v1/ingest/upload",
+            data={"collection_id": collection.id, "options": options},
+            files={"file": ("a.txt", b"hello", "text/plain")},
+            headers=headers,
+        )
+        assert response.status_code == 400
+    with pytest.raises(ValidationError):
+        Settings(app_data_dir=str(tmp_path), ingest_dedup="resue")
@@ -0,0 +1,64 @@
+from kb_core.services import CachedEmbedder
+from kb_desktop_daemon.adapters import SQLiteEmbeddingCache
+
+
+class RecordingEmbedder:
+    def __init__(self) -> None:
+        self.batches: list[list[str]] = []
+
+    @property
+    def dim(self) -> int:
+        return 4
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        self.batches.append(list(texts))
+        return [[float(len(text)), 0.5, 0.25, 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_texts([text])[0]
+
+
+def test_cached_embedder_only_sends_misses_in_one_batch(tmp_path) -> None:
+    inner = RecordingEmbedder()
+    cache = SQLiteEmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+    embedder = CachedEmbedder(inner, cache, provider="ollama", model="m1")
+
+    first = embedder.embed_texts(["alpha", "beta"])
+    second = embedder.embed_texts(["beta", "gamma", "alpha", "gamma"])
+
+    assert inner.batches == [["alpha", "beta"], ["gamma"]]
+    assert second[0] == first[1]
+    assert second[2] == first[0]
+    stats = embedder.stats()
+    assert stats["hits"] == 3
+    assert stats["misses"] == 3
+    assert stats["entries"] == 3
+
+
+def test_cache_is_keyed_by_model_and_persists(tmp_path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    inner = RecordingEmbedder()
+    CachedEmbedder(inner, SQLiteEmbeddingCache(path, max_bytes=1024 * 1024), provider="p", model="m1").embed_texts(
+        ["alpha"]
+    )
+
+    reopened = SQLiteEmbeddingCache(path, max_bytes=1024 * 1024)
+    CachedEmbedder(inner, reopened, provider="p", model="m1").embed_texts(["alpha"])
+    CachedEmbedder(inner, reopened, provider="p", model="m2").embed_texts(["alpha"])
+
+    assert inner.batches == [["alpha"], ["alpha"]]
+    assert reopened.stats()["entries"] == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path) -> None:
+    # Each 4-dim float32 vector takes 16 bytes; the budget fits three and a half of them.
+    cache = SQLiteEmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=56)
+    vector = [1.0, 2.0, 3.0, 4.0]
+    cache.put_many("p", "m", {"a": vector, "b": vector, "c": vector})
+    cache.get_many("p", "m", ["a"])
+    cache.put_many("p", "m", {"d": vector})
+
+    remaining = cache.get_many("p", "m", ["a", "b", "c", "d"])
+    assert sorted(remaining) == ["a", "c", "d"]
+    assert remaining["a"] == vector
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from kb_desktop_daemon.adapters.gateway import AimdLimiter, ProviderGateway, TokenBucket
+
+
+def test_token_bucket_charges_debt_as_wait_time() -> None:
+    bucket = TokenBucket(rate_per_second=10, capacity=10)
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(5) == pytest.approx(0.5, abs=0.05)
+
+
+def test_aimd_halves_once_per_cooldown_and_ramps_back() -> None:
+    limiter = AimdLimiter(initial=8, minimum=1, maximum=16, cooldown=60)
+    for _ in range(3):
+        limiter.acquire()
+    for _ in range(3):
+        limiter.release(None, overloaded=True)
+    # A burst of throttled responses costs a single halving.
+    assert limiter.stats()["limit"] == 4
+    assert limiter.stats()["last_decrease_reason"] == "throttled"
+
+    for _ in range(8):
+        limiter.acquire()
+        limiter.release(0.01, overloaded=False)
+    assert 5 <= limiter.stats()["limit"] < 6
+
+
+def test_aimd_keeps_limit_under_a_steady_mix_of_request_sizes() -> None:
+    limiter = AimdLimiter(initial=8, minimum=1, maximum=16, cooldown=0)
+    # Steady service time: a query embed is fast, a 64-text batch and a chat call are slow.
+    calls = [(0.01, 12, "embed"), (0.4, 9000, "embed"), (1.5, 3000, "chat")]
+    for index in range(60):
+        latency, tokens, kind = calls[0] if index % 5 else calls[1 + index // 5 % 2]
+        limiter.acquire()
+        limiter.release(latency, overloaded=False, tokens=tokens, kind=kind)
+    assert limiter.stats()["decreases"] == 0
+    assert limiter.stats()["latency_classes"] == 3
+
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(0.1, overloaded=False, tokens=12, kind="embed")
+    assert limiter.stats()["last_decrease_reason"] == "latency"
+
+
+def test_gateway_bounds_threads_and_coroutines_together() -> None:
+    gateway = ProviderGateway("stub", initial_concurrency=2, max_concurrency=2)
+    lock = threading.Lock()
+    active, peak = 0, 0
+
+    def track(delta: int) -> None:
+        nonlocal active, peak
+        with lock:
+            active += delta
+            peak = max(peak, active)
+
+    def sync_call() -> None:
+        with gateway.slot(tokens=10) as call:
+            track(1)
+            time.sleep(0.02)
+            track(-1)
+            call.status = 200
+
+    async def async_calls() -> None:
+        async def one() -> None:
+            async with gateway.aslot(tokens=10) as call:
+                track(1)
+                await asyncio.sleep(0.02)
+                track(-1)
+                call.status = 429
+
+        await asyncio.gather(*(one() for _ in range(4)))
+
+    threads = [threading.Thread(target=sync_call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(async_calls())
+    for thread in threads:
+        thread.join()
+
+    stats = gateway.stats()
+    assert peak <= 2
+    assert stats["calls"] == 8
+    assert stats["overloaded"] == 4
+    assert stats["concurrency"]["in_flight"] == 0
+    assert stats["concurrency"]["decreases"] == 1
+
+
+def test_cancelled_call_frees_its_slot_without_growing_the_limit() -> None:
+    gateway = ProviderGateway("stub", initial_concurrency=2, max_concurrency=8)
+
+    async def cancelled() -> None:
+        async def hang() -> None:
+            async with gateway.aslot():
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(hang())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancelled())
+    stats = gateway.stats()["concurrency"]
+    assert (stats["limit"], stats["in_flight"], stats["decreases"]) == (2, 0, 0)
+
+
+def test_gateway_counts_transport_errors_as_overload() -> None:
+    gateway = ProviderGateway("stub", requests_per_second=1000)
+    with pytest.raises(ConnectionError), gateway.slot():
+        raise ConnectionError("refused")
+    stats = gateway.stats()
+    assert stats["transport_errors"] == 1
+    assert stats["concurrency"]["in_flight"] == 0
+    assert stats["requests_available"] is not None
@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from kb_core.models import BlobRef, ParseOptions
+from kb_desktop_daemon.adapters import PdfParser
+
+
+def _write_pdf(path: Path, pages: list[str]) -> None:
+    """Write a minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", ""]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        content_id = len(objects) + 2
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 << /Type /Font /Subtype /Type1 /BaseFont /Helvetica >> >> >> "
+            f"/Contents {content_id} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        kids.append(f"{content_id - 1} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(bytes(out))
+
+
+def test_parallel_pdf_parse_matches_serial_and_tags_pages(tmp_path: Path) -> None:
+    path = tmp_path / "manual.pdf"
+    _write_pdf(path, [f"Section {page} body text" for page in range(1, 12)])
+    blob = BlobRef(id="manual", path=str(path), name="manual.pdf", mime="application/pdf")
+
+    serial = PdfParser().parse(blob, ParseOptions())
+    parallel_parser = PdfParser(workers=2, pages_per_task=3)
+    try:
+        parallel = parallel_parser.parse(blob, ParseOptions())
+    finally:
+        parallel_parser.close()
+
+    assert parallel.text == serial.text
+    assert "Section 11 body text" in parallel.text and parallel.text.endswith("[page=11]")
+    assert [section.metadata["page"] for section in parallel.sections] == list(range(1, 12))
+    assert "".join(section.text for section in parallel.sections) == parallel.text
@@ -1,10 +1,24 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from kb_desktop_daemon.adapters.hashing_embedder import HashingEmbedder
 from kb_desktop_daemon.adapters.providers import (
+    AsyncOllamaEmbedder,
+    AsyncOpenCompatEmbedder,
     OllamaEmbedder,
     OllamaLLMClient,
     OpenCompatEmbedder,
     OpenCompatLLMClient,
     ProviderFactory,
+    parse_ollama_stream_line,
+    parse_sse_stream_line,
+    token_batches,
 )
+from kb_desktop_daemon.adapters.rerankers import TermOverlapReranker
 from kb_desktop_daemon.config import Settings
 
 
@@ -28,4 +42,197 @@ def test_provider_factory_supports_mixed_providers() -> None:
     )
     factory = ProviderFactory(settings)
     assert isinstance(factory.create_embedder(), OpenCompatEmbedder)
-    assert isinstance(factory.create_llm_client(provider="open_compat"), OpenCompatLLMClient)
+    assert isinstance(factory.create_llm_client(provider="open_compat"), OpenCompatLLMClient)
+
+
+def test_provider_factory_local_reranker() -> None:
+    settings = Settings(app_data_dir="./data-test", reranker_provider="local")
+    reranker = ProviderFactory(settings).create_reranker()
+    assert isinstance(reranker, TermOverlapReranker)
+    assert ProviderFactory(Settings(app_data_dir="./data-test")).create_reranker() is None
+
+    scores = reranker.score("混合检索 fusion", ["混合检索使用 fusion 排序", "无关内容", "fusion only"])
+    assert scores[0] > scores[2] > scores[1] == 0.0
+
+
+def test_async_embedders_share_one_client() -> None:
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        body = json.loads(request.content)
+        if request.url.path.endswith("/embeddings") and "input" in body:
+            data = [{"index": i, "embedding": [float(len(text))]} for i, text in enumerate(body["input"])]
+            return httpx.Response(200, json={"data": data[::-1]})
+        return httpx.Response(200, json={"embeddings": [[float(len(text))] for text in body["input"]]})
+
+    settings = Settings(app_data_dir="./data-test", open_compat_api_key="key")
+    factory = ProviderFactory(settings)
+
+    async def run() -> tuple[list[float], list[list[float]]]:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            ollama = factory.create_async_embedder(client)
+            compat = factory.create_async_embedder(client, provider="open_compat")
+            assert isinstance(ollama, AsyncOllamaEmbedder)
+            assert isinstance(compat, AsyncOpenCompatEmbedder)
+            return await ollama.embed_query("abc"), await compat.embed_texts(["a", "bb"])
+
+    query_vector, batch = asyncio.run(run())
+    assert query_vector == [3.0]
+    assert batch == [[1.0], [2.0]]
+    assert seen == ["/api/embed", "/v1/embeddings"]
+
+
+class _StubOllama(BaseHTTPRequestHandler):
+    legacy = False
+    requests: list[tuple[str, int]] = []
+
+    def do_POST(self) -> None:  # noqa: N802
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        payload: dict[str, object]
+        if self.path == "/api/embed" and not self.legacy:
+            self.requests.append((self.path, len(body["input"])))
+            payload = {"embeddings": [[float(len(text))] for text in body["input"]]}
+        elif self.path == "/api/embeddings":
+            self.requests.append((self.path, 1))
+            payload = {"embedding": [float(len(body["prompt"]))]}
+        else:
+            self.send_error(404)
+            return
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def test_ollama_embedder_batches_and_falls_back_to_legacy_endpoint() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    texts = [f"text {'x' * i}" for i in range(10)]
+    try:
+        embedder = OllamaEmbedder(base_url, "m", batch_size=4, max_concurrency=2)
+        assert embedder.embed_texts(texts) == [[float(len(text))] for text in texts]
+        assert sorted(size for _, size in _StubOllama.requests) == [2, 4, 4]
+
+        _StubOllama.legacy, _StubOllama.requests = True, []
+        legacy = OllamaEmbedder(base_url, "m", batch_size=4, max_concurrency=2)
+        assert legacy.embed_texts(texts[:3]) == [[float(len(text))] for text in texts[:3]]
+        assert legacy.embed_query("abc") == [3.0]
+        assert [path for path, _ in _StubOllama.requests] == ["/api/embeddings"] * 4
+    finally:
+        _StubOllama.legacy = False
+        server.shutdown()
+
+
+def test_stream_line_parsers() -> None:
+    assert parse_ollama_stream_line('{"message": {"content": "Hi"}, "done": false}') == ("Hi", False)
+    assert parse_ollama_stream_line('{"message": {"content": ""}, "done": true}') == ("", True)
+    assert parse_ollama_stream_line("") == ("", False)
+    assert parse_sse_stream_line('data: {"choices": [{"delta": {"content": "Hi"}}]}') == ("Hi", False)
+    assert parse_sse_stream_line('data: {"choices": [{"delta": {"role": "assistant"}}]}') == ("", False)
+    assert parse_sse_stream_line(": keep-alive") == ("", False)
+    assert parse_sse_stream_line("data: [DONE]") == ("", True)
+
+
+def test_async_open_compat_llm_streams_tokens() -> None:
+    body = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': token}}]})}\n\n" for token in ["Hel", "lo"]
+    ) + "data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    factory = ProviderFactory(Settings(app_data_dir="./data-test", open_compat_api_key="key"))
+
+    async def run() -> list[str]:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            llm = factory.create_async_llm_client(client, provider="open_compat")
+            return [token async for token in llm.stream_chat([{"role": "user", "content": "hi"}])]
+
+    assert asyncio.run(run()) == ["Hel", "lo"]
+
+
+def test_token_batches_respect_item_and_token_limits() -> None:
+    assert token_batches([3, 3, 3, 3, 3], max_items=2, max_tokens=100) == [(0, 2), (2, 4), (4, 5)]
+    assert token_batches([4, 4, 9, 1, 1], max_items=10, max_tokens=8) == [(0, 2), (2, 3), (3, 5)]
+    assert token_batches([], max_items=2, max_tokens=8) == []
+
+
+class _StubCompat(BaseHTTPRequestHandler):
+    calls: list[list[str]] = []
+    failures: dict[str, int] = {}
+
+    def do_POST(self) -> None:  # noqa: N802
+        inputs = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["input"]
+        self.calls.append(inputs)
+        status = 200
+        if len(inputs) > 3:
+            status = 413
+        elif self.failures.get(inputs[0], 0) > 0:
+            self.failures[inputs[0]] -= 1
+            status = 429 if inputs[0] == "t0" else 503
+        data = json.dumps(
+            {"data": [{"index": i, "embedding": [float(text[1:])]} for i, text in enumerate(inputs)][::-1]}
+        ).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def test_open_compat_embedder_retries_failed_batches_and_keeps_order() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubCompat)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    texts = [f"t{i}" for i in range(12)]
+    _StubCompat.calls, _StubCompat.failures = [], {"t0": 2, "t6": 1}
+    try:
+        embedder = OpenCompatEmbedder(
+            f"http://127.0.0.1:{server.server_port}",
+            "key",
+            "m",
+            max_batch_items=6,
+            max_concurrency=3,
+            backoff_base=0.0,
+        )
+        assert embedder.embed_texts(texts) == [[float(i)] for i in range(12)]
+    finally:
+        server.shutdown()
+
+    sent = sorted(tuple(call) for call in _StubCompat.calls)
+    # Both 6-item batches are split after a 413; only the sub-batches that failed are re-sent.
+    assert sent.count(("t0", "t1", "t2")) == 3
+    assert sent.count(("t6", "t7", "t8")) == 2
+    assert sent.count(("t3", "t4", "t5")) == 1 and sent.count(("t9", "t10", "t11")) == 1
+
+
+def test_hashing_embedder_is_deterministic_and_batch_independent() -> None:
+    settings = Settings(app_data_dir="./data-test", embedding_provider="hashing", hashing_embed_dim=64)
+    factory = ProviderFactory(settings)
+    embedder = factory.create_embedder()
+    assert isinstance(embedder, HashingEmbedder) and embedder.dim == 64
+    assert factory.embedding_model() == "char2-4-d64"
+
+    texts = ["The quick brown fox", "quick brown foxes", "季度营收报告", ""]
+    batch = embedder.embed_texts(texts)
+    assert batch == [embedder.embed_query(text) for text in texts]
+    assert batch[3] == [0.0] * 64
+
+    def cosine(a: list[float], b: list[float]) -> float:
+        return sum(x * y for x, y in zip(a, b, strict=True))
+
+    assert cosine(batch[0], batch[0]) == pytest.approx(1.0, abs=1e-5)
+    assert cosine(batch[0], batch[1]) > cosine(batch[0], batch[2])
+    assert asyncio.run(factory.create_async_embedder(httpx.AsyncClient()).embed_query(texts[0])) == batch[0]
@@ -0,0 +1,58 @@
+from kb_core.models import Chunk
+from kb_desktop_daemon.adapters import SQLiteRepository
+
+
+def _chunk(chunk_id: str, text: str, collection_id: str = "c1", document_id: str = "d1") -> Chunk:
+    return Chunk(id=chunk_id, collection_id=collection_id, document_id=document_id, text=text, order=0)
+
+
+def test_fts_matches_cjk_and_identifiers(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "kb.sqlite3"))
+    repo.upsert_chunks(
+        [
+            _chunk("zh", "本地知识库引擎支持混合检索。"),
+            _chunk("code", "Restart after error KB-4041 appears."),
+            _chunk("other", "Unrelated text about gardening.", collection_id="c2"),
+        ]
+    )
+
+    assert [hit.chunk_id for hit in repo.search_chunks("知识库", top_k=5)] == ["zh"]
+    assert [hit.chunk_id for hit in repo.search_chunks("KB-4041", top_k=5)] == ["code"]
+    assert repo.search_chunks("gardening", top_k=5, collection_ids=["c1"]) == []
+
+
+def test_fts_stays_in_sync_with_chunk_writes(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "kb.sqlite3"))
+    repo.upsert_chunks([_chunk("a", "alpha release notes")])
+    repo.upsert_chunks([_chunk("a", "beta release notes")])
+
+    assert repo.search_chunks("alpha", top_k=5) == []
+    assert [hit.chunk_id for hit in repo.search_chunks("beta", top_k=5)] == ["a"]
+
+    repo.delete_chunks_by_document("d1")
+    assert repo.search_chunks("beta", top_k=5) == []
+
+
+def test_fts_matches_single_cjk_character(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "kb.sqlite3"))
+    repo.upsert_chunks([_chunk("zh", "本地知识库"), _chunk("en", "local knowledge base")])
+
+    assert [hit.chunk_id for hit in repo.search_chunks("库", top_k=5)] == ["zh"]
+    assert [hit.chunk_id for hit in repo.search_chunks("知", top_k=5)] == ["zh"]
+
+
+def test_fts_survives_vacuum(tmp_path) -> None:
+    db_path = str(tmp_path / "kb.sqlite3")
+    repo = SQLiteRepository(db_path)
+    repo.upsert_chunks([_chunk("a", "alpha notes", document_id="d1"), _chunk("b", "beta notes", document_id="d2")])
+    repo.delete_chunks_by_document("d1")
+    with repo._connect() as conn:
+        conn.execute("VACUUM")
+
+    repo = SQLiteRepository(db_path)
+    repo.upsert_chunks([_chunk("b", "gamma notes", document_id="d2")])
+    assert repo.search_chunks("beta", top_k=5) == []
+    assert [hit.chunk_id for hit in repo.search_chunks("gamma", top_k=5)] == ["b"]
+
+    repo.delete_chunks_by_document("d2")
+    assert repo.search_chunks("notes", top_k=5) == []
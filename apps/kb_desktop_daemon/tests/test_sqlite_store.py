@@ -0,0 +1,101 @@
+import sqlite3
+
+from kb_core.models import Chunk, Collection, EmbeddingModelInfo
+from kb_desktop_daemon.adapters import SQLiteRepository
+from kb_desktop_daemon.http.warmup import EmbeddingWarmup, RecordingEmbedder
+
+
+def test_chunk_offsets_survive_schema_migration(tmp_path) -> None:
+    db_path = str(tmp_path / "kb.sqlite3")
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            """
+            CREATE TABLE chunks (
+                id TEXT PRIMARY KEY,
+                collection_id TEXT NOT NULL,
+                document_id TEXT NOT NULL,
+                text TEXT NOT NULL,
+                token_count INTEGER,
+                chunk_order INTEGER NOT NULL,
+                metadata_json TEXT NOT NULL,
+                embedding_ref TEXT,
+                created_at TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "INSERT INTO chunks VALUES "
+            "('old', 'c1', 'd1', 'legacy text', 2, 0, '{}', NULL, '2025-01-01T00:00:00+00:00')"
+        )
+
+    repo = SQLiteRepository(db_path)
+    repo.upsert_chunks(
+        [Chunk(id="new", collection_id="c1", document_id="d1", text="fresh", order=1, start_char=12, end_char=17)]
+    )
+
+    chunks = {chunk.id: chunk for chunk in repo.list_chunks_by_document("d1", limit=10, offset=0)}
+    assert (chunks["old"].start_char, chunks["old"].end_char) == (None, None)
+    assert (chunks["new"].start_char, chunks["new"].end_char) == (12, 17)
+
+
+def test_collection_keeps_embedding_model_once_it_has_chunks(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "kb.sqlite3"))
+    repo.create_collection(Collection(id="legacy", name="legacy"))
+    repo.create_collection(Collection(id="empty", name="empty", embedding_model="ollama:a"))
+    repo.create_collection(Collection(id="indexed", name="indexed", embedding_model="ollama:a"))
+    repo.upsert_chunks([Chunk(id="x", collection_id="indexed", document_id="d1", text="t", order=0)])
+
+    assert repo.set_collection_embedding_model("legacy", "ollama:b") == "ollama:b"
+    assert repo.set_collection_embedding_model("empty", "ollama:b") == "ollama:b"
+    assert repo.set_collection_embedding_model("indexed", "ollama:b") == "ollama:a"
+
+    indexed = repo.get_collection("indexed")
+    assert indexed is not None and indexed.embedding_model == "ollama:a"
+
+
+class _UnitEmbedder:
+    dim = 2
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return [[0.6, 0.8] for _ in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [0.6, 0.8]
+
+    def max_input_tokens(self) -> int:
+        return 2048
+
+
+def test_warmup_registers_model_and_keeps_first_seen_date(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "kb.sqlite3"))
+    first = repo.upsert_embedding_model(EmbeddingModelInfo(provider="ollama", model="m", dim=1))
+
+    warmup = EmbeddingWarmup(_UnitEmbedder(), repo, provider="ollama", model="m")
+    info = warmup.run()
+
+    assert info is not None and warmup.stats()["state"] == "ready"
+    assert (info.dim, info.normalized, info.max_input_tokens) == (2, True, 2048)
+    assert info.created_at == first.created_at
+    assert [model.key for model in repo.list_embedding_models()] == ["ollama:m"]
+
+
+def test_first_embedding_records_model_without_warmup(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "kb.sqlite3"))
+    embedder = RecordingEmbedder(_UnitEmbedder(), repo, provider="ollama", model="m")
+
+    assert repo.get_embedding_model("ollama", "m") is None
+    assert embedder.embed_texts([]) == []
+    assert repo.get_embedding_model("ollama", "m") is None
+    embedder.embed_texts(["first chunk"])
+
+    info = repo.get_embedding_model("ollama", "m")
+    assert info is not None and (info.dim, info.normalized) == (2, True)
+    assert embedder.dim == 2
+
+
+def test_get_chunks_batches_large_id_lists(tmp_path) -> None:
+    repo = SQLiteRepository(str(tmp_path / "kb.sqlite3"))
+    chunks = [Chunk(id=f"c{i}", collection_id="c1", document_id="d1", text="t", order=i) for i in range(1200)]
+    repo.upsert_chunks(chunks)
+
+    assert len(repo.get_chunks([chunk.id for chunk in chunks])) == 1200
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+from kb_desktop_daemon.adapters import TokenizerFileCounter
+from kb_desktop_daemon.adapters.providers import ProviderFactory
+from kb_desktop_daemon.config import Settings
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+
+def test_tokenizer_file_counter_matches_tokenizer(tmp_path: Path) -> None:
+    tokenizer = Tokenizer(WordLevel({"[UNK]": 0, "hello": 1, "world": 2}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    path = tmp_path / "tokenizer.json"
+    tokenizer.save(str(path))
+
+    settings = Settings(app_data_dir=str(tmp_path), token_counter="tokenizer", tokenizer_path=str(path))
+    counter = ProviderFactory(settings).create_token_counter()
+
+    assert isinstance(counter, TokenizerFileCounter)
+    assert counter.count("hello world, again") == 4
+    assert counter.count_batch(["hello", "", "a b c"]) == [1, 0, 3]
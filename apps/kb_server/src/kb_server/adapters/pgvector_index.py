@@ -12,8 +12,16 @@ class PgVectorIndex:
         vector: list[float],
         top_k: int,
         filter: MetadataFilter | None = None,
+        collection_ids: list[str] | None = None,
+        include_vectors: bool = False,
     ) -> list[VectorHit]:
         raise NotImplementedError
 
+    def get_vectors(self, collection_id: str, vector_ids: list[str]) -> dict[str, list[float]]:
+        raise NotImplementedError
+
     def delete_by_document(self, collection_id: str, document_id: str) -> None:
-        raise NotImplementedError
+        raise NotImplementedError
+
+    def delete_collection(self, collection_id: str) -> None:
+        raise NotImplementedError
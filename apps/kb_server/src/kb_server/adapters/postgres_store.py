@@ -1,4 +1,4 @@
-from kb_core.models import Chunk, Collection, Document, Job, JobStatus, JobType
+from kb_core.models import Chunk, Collection, Document, EmbeddingModelInfo, Job, JobStatus, JobType
 
 
 class PostgresStore:
@@ -10,6 +10,12 @@ class PostgresStore:
     def get_document(self, document_id: str) -> Document | None:
         raise NotImplementedError
 
+    def get_documents(self, document_ids: list[str]) -> list[Document]:
+        raise NotImplementedError
+
+    def find_document_by_hash(self, content_hash: str, collection_id: str | None = None) -> Document | None:
+        raise NotImplementedError
+
     def list_documents(self, collection_id: str, limit: int, offset: int) -> list[Document]:
         raise NotImplementedError
 
@@ -43,6 +49,15 @@ class PostgresStore:
     def delete_collection(self, collection_id: str) -> None:
         raise NotImplementedError
 
+    def get_embedding_model(self, provider: str, model: str) -> EmbeddingModelInfo | None:
+        raise NotImplementedError
+
+    def upsert_embedding_model(self, info: EmbeddingModelInfo) -> EmbeddingModelInfo:
+        raise NotImplementedError
+
+    def list_embedding_models(self) -> list[EmbeddingModelInfo]:
+        raise NotImplementedError
+
     def create_job(self, job: Job) -> Job:
         raise NotImplementedError
 
@@ -62,4 +77,4 @@ class PostgresStore:
         payload: dict | None = None,
         job_type: JobType | None = None,
     ) -> Job:
-        raise NotImplementedError
+        raise NotImplementedError
@@ -4,13 +4,21 @@ from kb_core.models.entities import (
     Collection,
     Document,
     DocumentStatus,
+    EmbeddingModelInfo,
     Job,
     JobStatus,
     JobType,
     RetrieveHit,
     RetrieveResult,
 )
-from kb_core.models.io import BlobRef, IngestOptions, ParsedDocument, ParseOptions
+from kb_core.models.io import (
+    BlobRef,
+    IngestOptions,
+    ParsedDocument,
+    ParsedSection,
+    ParseOptions,
+    RetrieveOptions,
+)
 from kb_core.models.vector import MetadataFilter, VectorHit, VectorItem
 
 __all__ = [
@@ -20,15 +28,18 @@ __all__ = [
     "Collection",
     "Document",
     "DocumentStatus",
+    "EmbeddingModelInfo",
     "IngestOptions",
     "Job",
     "JobStatus",
     "JobType",
     "MetadataFilter",
     "ParsedDocument",
+    "ParsedSection",
     "ParseOptions",
     "RetrieveHit",
+    "RetrieveOptions",
     "RetrieveResult",
     "VectorHit",
     "VectorItem",
-]
+]
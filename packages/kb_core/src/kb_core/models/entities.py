@@ -23,6 +23,7 @@ class JobType(str, Enum):
     INGEST = "INGEST"
     DELETE = "DELETE"
     REINDEX = "REINDEX"
+    RECHUNK = "RECHUNK"
 
 
 class JobStatus(str, Enum):
@@ -38,10 +39,26 @@ class Collection(BaseModel):
     name: str
     description: str | None = None
     settings: dict[str, Any] = Field(default_factory=dict)
+    # "<provider>:<model>" the collection's vectors were embedded with; None for collections that predate it.
+    embedding_model: str | None = None
     created_at: datetime = Field(default_factory=utcnow)
     updated_at: datetime = Field(default_factory=utcnow)
 
 
+class EmbeddingModelInfo(BaseModel):
+    provider: str
+    model: str
+    dim: int
+    normalized: bool | None = None
+    max_input_tokens: int | None = None
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
 class Document(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
     collection_id: str
@@ -65,6 +82,9 @@ class Chunk(BaseModel):
     text: str
     token_count: int | None = None
     order: int
+    # Character span of the chunk in the parsed document text, when the chunker recorded one.
+    start_char: int | None = None
+    end_char: int | None = None
     metadata: dict[str, Any] = Field(default_factory=dict)
     embedding_ref: str | None = None
     created_at: datetime = Field(default_factory=utcnow)
@@ -90,6 +110,8 @@ class RetrieveHit(BaseModel):
 class RetrieveResult(BaseModel):
     query: str
     hits: list[RetrieveHit]
+    candidates_scanned: int = 0
+    reranked: bool = False
 
 
 class Job(BaseModel):
@@ -101,4 +123,4 @@ class Job(BaseModel):
     payload: dict[str, Any] = Field(default_factory=dict)
     created_at: datetime = Field(default_factory=utcnow)
     started_at: datetime | None = None
-    finished_at: datetime | None = None
+    finished_at: datetime | None = None
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class BlobRef(BaseModel):
@@ -18,13 +18,52 @@ class ParseOptions(BaseModel):
     extras: dict[str, Any] = Field(default_factory=dict)
 
 
+class ParsedSection(BaseModel):
+    """A contiguous slice of parsed text; concatenating all sections yields the document text."""
+
+    text: str
+    metadata: dict[str, Any] = Field(default_factory=dict)
+
+
 class ParsedDocument(BaseModel):
     text: str
     metadata: dict[str, Any] = Field(default_factory=dict)
+    # Optional breakdown of ``text``; when present, chunks take the metadata of the section they start in.
+    sections: list[ParsedSection] = Field(default_factory=list)
 
 
 class IngestOptions(BaseModel):
     chunk_size: int = 800
     chunk_overlap: int = 120
+    # When set, chunks target this many tokens (per the ingest token counter) instead of chunk_size characters.
+    chunk_tokens: int | None = Field(default=None, ge=1)
     parser_name: str | None = None
-    metadata: dict[str, Any] = Field(default_factory=dict)
+    metadata: dict[str, Any] = Field(default_factory=dict)
+    streaming: bool = False
+    batch_size: int = Field(default=64, ge=1)
+    dedup: Literal["off", "reuse", "clone"] = "off"
+    dedup_scope: Literal["collection", "global"] = "collection"
+
+    @model_validator(mode="after")
+    def _check_dedup(self) -> IngestOptions:
+        # Reusing a document from another collection would hand back a collection_id nobody asked for.
+        if self.dedup == "reuse" and self.dedup_scope == "global":
+            raise ValueError("dedup='reuse' only works within a collection; use dedup='clone' for global scope")
+        return self
+
+
+class RetrieveOptions(BaseModel):
+    mode: Literal["vector", "hybrid", "lexical"] = "vector"
+    rrf_k: int = Field(default=60, ge=1)
+    overfetch: bool = False
+    overfetch_factor: float = Field(default=2.0, ge=1.0)
+    max_candidates: int = Field(default=1000, ge=1)
+    latency_budget_ms: float | None = None
+    rerank: bool = False
+    rerank_candidates: int = Field(default=50, ge=1)
+    rerank_batch_size: int = Field(default=16, ge=1)
+    rerank_budget_ms: float | None = None
+    mmr: bool = False
+    mmr_lambda: float = Field(default=0.5, ge=0.0, le=1.0)
+    mmr_candidates: int = Field(default=50, ge=1)
+    max_per_document: int | None = Field(default=None, ge=1)
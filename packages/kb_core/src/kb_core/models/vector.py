@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Any
+from collections.abc import Sequence
+from typing import Annotated, Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, SkipValidation
 
 
 class MetadataFilter(BaseModel):
@@ -24,4 +25,7 @@ class VectorHit(BaseModel):
     collection_id: str
     document_id: str
     chunk_id: str
-    metadata: dict[str, Any] = Field(default_factory=dict)
+    metadata: dict[str, Any] = Field(default_factory=dict)
+    # Only set when the index is asked for vectors; kept unvalidated so index-native arrays
+    # (e.g. numpy rows) pass through without a per-float copy.
+    vector: Annotated[Sequence[float] | None, SkipValidation] = Field(default=None, exclude=True, repr=False)
@@ -1,15 +1,29 @@
+from kb_core.pipelines.answer import DEFAULT_ANSWER_SYSTEM_PROMPT, build_answer_messages, pack_context
 from kb_core.pipelines.rag import (
+    aretrieve,
     delete_document,
     get_document_original,
     ingest_document,
     list_document_chunks,
+    rechunk_document,
     retrieve,
 )
+from kb_core.pipelines.rerank import RerankScoreCache, rerank_candidates
+from kb_core.pipelines.staged_ingest import IngestTask, StagedIngestPipeline
 
 __all__ = [
+    "DEFAULT_ANSWER_SYSTEM_PROMPT",
+    "IngestTask",
+    "RerankScoreCache",
+    "StagedIngestPipeline",
+    "aretrieve",
+    "build_answer_messages",
     "delete_document",
     "get_document_original",
     "ingest_document",
     "list_document_chunks",
+    "pack_context",
+    "rechunk_document",
+    "rerank_candidates",
     "retrieve",
 ]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from kb_core.models import RetrieveHit
+
+DEFAULT_ANSWER_SYSTEM_PROMPT = (
+    "Answer the question using only the numbered context passages. Cite the passages you use as [n]. "
+    "If the context does not contain the answer, say that you do not know."
+)
+
+
+def _hit_text(hit: RetrieveHit) -> str:
+    return (hit.text or hit.citation.snippet).strip()
+
+
+def pack_context(hits: list[RetrieveHit], *, max_chars: int) -> list[RetrieveHit]:
+    """Keep hits in rank order while their text fits in ``max_chars``; the best hit is always kept."""
+    packed: list[RetrieveHit] = []
+    used = 0
+    for hit in hits:
+        size = len(_hit_text(hit))
+        if packed and used + size > max_chars:
+            break
+        packed.append(hit)
+        used += size
+    return packed
+
+
+def build_answer_messages(
+    query: str, hits: list[RetrieveHit], *, system_prompt: str = DEFAULT_ANSWER_SYSTEM_PROMPT
+) -> list[dict]:
+    blocks = []
+    for number, hit in enumerate(hits, start=1):
+        title = hit.document.get("title") or hit.citation.document_id
+        blocks.append(f"[{number}] {title}\n{_hit_text(hit)}")
+    context = "\n\n".join(blocks) if blocks else "(no relevant context found)"
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {query}"},
+    ]
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import asyncio
+import math
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from hashlib import sha256
 from pathlib import Path
+from typing import Any
 from uuid import uuid4
 
+import numpy as np
+
 from kb_core.errors import ParserNotFoundError
 from kb_core.models import (
     BlobRef,
@@ -15,13 +22,44 @@ from kb_core.models import (
     DocumentStatus,
     IngestOptions,
     MetadataFilter,
+    ParsedDocument,
+    ParsedSection,
     ParseOptions,
     RetrieveHit,
+    RetrieveOptions,
     RetrieveResult,
+    VectorHit,
     VectorItem,
 )
-from kb_core.ports import BlobStore, ChunkStore, DocumentStore, Embedder, Parser, VectorIndex
-from kb_core.services import chunk_text, estimate_token_count, match_metadata
+from kb_core.pipelines.rerank import RerankScoreCache, rerank_candidates
+from kb_core.ports import (
+    AsyncChunkStore,
+    AsyncDocumentStore,
+    AsyncEmbedder,
+    AsyncVectorIndex,
+    BlobStore,
+    ChunkStore,
+    CollectionStore,
+    DocumentStore,
+    Embedder,
+    LexicalIndex,
+    ParsedArtifactStore,
+    ParsedArtifactWriter,
+    Parser,
+    Reranker,
+    TokenCounter,
+    VectorIndex,
+)
+from kb_core.services import (
+    HeuristicTokenCounter,
+    QueryEmbeddingCache,
+    iter_section_chunks,
+    match_metadata,
+    mmr_select,
+    reciprocal_rank_fusion,
+)
+
+_MISSING = object()
 
 
 def _select_parser(parsers: Iterable[Parser], mime: str, filename: str, parser_name: str | None = None) -> Parser:
@@ -32,6 +70,285 @@ def _select_parser(parsers: Iterable[Parser], mime: str, filename: str, parser_n
     raise ParserNotFoundError(f"No parser matched mime={mime}, ext={ext}, parser_name={parser_name}")
 
 
+# Character window opened per chunk in token-budget mode; the token cut then decides the real size.
+_MAX_CHARS_PER_TOKEN = 8
+
+
+def _chunk_limits(options: IngestOptions) -> tuple[int, int]:
+    """Return ``(window_chars, token_limit)`` for the configured chunking mode."""
+    if options.chunk_tokens is not None:
+        return options.chunk_tokens * _MAX_CHARS_PER_TOKEN, options.chunk_tokens
+    # Character mode keeps the historical ~4 chars/token guard; pure ASCII windows never hit it.
+    return options.chunk_size, max(math.ceil(options.chunk_size / 4), 1)
+
+
+def _build_records(
+    document: Document,
+    pieces: list[tuple[str, dict[str, Any], int, int]],
+    vectors: list[list[float]],
+    start_order: int,
+    token_counter: TokenCounter,
+) -> tuple[list[Chunk], list[VectorItem]]:
+    chunks: list[Chunk] = []
+    vector_items: list[VectorItem] = []
+    token_counts = token_counter.count_batch([piece[0] for piece in pieces])
+
+    records = zip(pieces, vectors, token_counts, strict=True)
+    for idx, ((piece, metadata, start, end), vector, token_count) in enumerate(records, start=start_order):
+        chunk = Chunk(
+            id=str(uuid4()),
+            collection_id=document.collection_id,
+            document_id=document.id,
+            text=piece,
+            token_count=token_count,
+            order=idx,
+            start_char=start,
+            end_char=end,
+            metadata=metadata,
+        )
+        chunks.append(chunk)
+        vector_items.append(
+            VectorItem(
+                id=chunk.id,
+                vector=vector,
+                collection_id=document.collection_id,
+                document_id=document.id,
+                chunk_id=chunk.id,
+                metadata={"order": idx, **chunk.metadata},
+            )
+        )
+    return chunks, vector_items
+
+
+def _artifact_key(document: Document, parser: Parser) -> str | None:
+    """Artifacts are keyed by content hash plus parser version, so a parser upgrade re-parses once."""
+    if document.hash is None:
+        return None
+    # Parsers may declare a ``version``; bump it whenever their output for the same bytes changes.
+    version = getattr(parser, "version", "1")
+    return f"{_artifact_prefix(document.hash)}{type(parser).__name__.lower()}-v{version}"
+
+
+def _artifact_prefix(content_hash: str) -> str:
+    """Common prefix of every parser's artifact for the same bytes."""
+    return f"{content_hash}."
+
+
+def _open_artifact(
+    artifact_store: ParsedArtifactStore | None, document: Document, parser: Parser
+) -> ParsedArtifactWriter | None:
+    key = _artifact_key(document, parser)
+    if artifact_store is None or key is None:
+        return None
+    return artifact_store.open_writer(key)
+
+
+def _recorded(sections: Iterable[ParsedSection], writer: ParsedArtifactWriter) -> Iterator[ParsedSection]:
+    for section in sections:
+        writer.add(section)
+        yield section
+
+
+def _save_artifact(
+    artifact_store: ParsedArtifactStore | None, document: Document, parser: Parser, parsed: ParsedDocument
+) -> None:
+    writer = _open_artifact(artifact_store, document, parser)
+    if writer is None:
+        return
+    try:
+        for section in _document_sections(parsed):
+            writer.add(section)
+    except Exception:
+        writer.abort()
+        raise
+    writer.commit(parsed.metadata)
+
+
+def _load_parsed(
+    document: Document,
+    parser: Parser,
+    blob_store: BlobStore,
+    artifact_store: ParsedArtifactStore | None,
+) -> ParsedDocument:
+    """Return the stored parse of ``document``, parsing the blob (and storing the result) on a miss."""
+    key = _artifact_key(document, parser)
+    if artifact_store is not None and key is not None:
+        stored = artifact_store.read(key)
+        if stored is not None:
+            return stored
+    blob = BlobRef(id=document.id, path=document.blob_ref, name=document.title, mime=document.mime)
+    # Ensure blob exists/readable and parse content consistently with ingest parser adapters.
+    blob_store.get(blob)
+    parsed = parser.parse(blob, ParseOptions())
+    _save_artifact(artifact_store, document, parser, parsed)
+    return parsed
+
+
+def _document_sections(parsed: ParsedDocument) -> list[ParsedSection]:
+    if parsed.sections:
+        return parsed.sections
+    return [ParsedSection(text=parsed.text, metadata=parsed.metadata)]
+
+
+class _SharedMetadata:
+    """Metadata entries that agree across every section passed through :meth:`track`."""
+
+    def __init__(self) -> None:
+        self._shared: dict[str, Any] | None = None
+
+    @property
+    def value(self) -> dict[str, Any]:
+        return self._shared or {}
+
+    def track(self, sections: Iterable[ParsedSection]) -> Iterator[ParsedSection]:
+        for section in sections:
+            if self._shared is None:
+                self._shared = dict(section.metadata)
+            else:
+                self._shared = {k: v for k, v in self._shared.items() if section.metadata.get(k, _MISSING) == v}
+            yield section
+
+
+def _iter_piece_batches(
+    sections: Iterable[ParsedSection], options: IngestOptions, token_counter: TokenCounter
+) -> Iterator[list[tuple[str, dict[str, Any], int, int]]]:
+    batch: list[tuple[str, dict[str, Any], int, int]] = []
+    window_chars, token_limit = _chunk_limits(options)
+    for piece in iter_section_chunks(
+        sections,
+        chunk_size=window_chars,
+        chunk_overlap=options.chunk_overlap,
+        token_limit=token_limit,
+        token_counter=token_counter,
+    ):
+        batch.append(piece)
+        if len(batch) >= options.batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _ingest_sections(
+    *,
+    document: Document,
+    sections: Iterable[ParsedSection],
+    chunk_store: ChunkStore,
+    vector_index: VectorIndex,
+    embedder: Embedder,
+    options: IngestOptions,
+    token_counter: TokenCounter,
+    on_progress: Callable[[int], None] | None,
+) -> dict[str, Any]:
+    """Chunk, embed and upsert ``batch_size`` chunks at a time; returns metadata shared by all sections."""
+    shared = _SharedMetadata()
+    committed = 0
+    for batch in _iter_piece_batches(shared.track(sections), options, token_counter):
+        vectors = embedder.embed_texts([piece[0] for piece in batch])
+        chunks, vector_items = _build_records(document, batch, vectors, committed, token_counter)
+        chunk_store.upsert_chunks(chunks)
+        vector_index.upsert(vector_items)
+        committed += len(batch)
+        if on_progress is not None:
+            on_progress(committed)
+    return shared.value
+
+
+def _find_duplicate(
+    document_store: DocumentStore, content_hash: str, collection_id: str, options: IngestOptions
+) -> Document | None:
+    existing = document_store.find_document_by_hash(content_hash, collection_id)
+    if existing is None and options.dedup_scope == "global":
+        existing = document_store.find_document_by_hash(content_hash, None)
+    return existing
+
+
+def _shares_vector_space(collection_store: CollectionStore | None, source_id: str, target_id: str) -> bool:
+    """Whether vectors stored for ``source_id`` can be reused in ``target_id``.
+
+    Without a collection store every collection is assumed to use the one active model. With one,
+    both collections must record the same embedding model.
+    """
+    if collection_store is None:
+        return True
+    source = collection_store.get_collection(source_id)
+    target = collection_store.get_collection(target_id)
+    if source is None or target is None or source.embedding_model is None:
+        return False
+    return source.embedding_model == target.embedding_model
+
+
+def _clone_document(
+    *,
+    source: Document,
+    collection_id: str,
+    filename: str,
+    document_store: DocumentStore,
+    chunk_store: ChunkStore,
+    vector_index: VectorIndex,
+    embedder: Embedder,
+    options: IngestOptions,
+    document_id: str | None,
+    collection_store: CollectionStore | None = None,
+) -> Document:
+    """Copy ``source`` into another collection, reusing its blob and chunks.
+
+    Stored vectors are reused when both collections share an embedding model; otherwise the chunk
+    texts are embedded again with ``embedder``.
+    """
+    reuse_vectors = _shares_vector_space(collection_store, source.collection_id, collection_id)
+    document = Document(
+        id=document_id or str(uuid4()),
+        collection_id=collection_id,
+        title=filename,
+        source_type=source.source_type,
+        source_uri=source.source_uri,
+        mime=source.mime,
+        size_bytes=source.size_bytes,
+        hash=source.hash,
+        blob_ref=source.blob_ref,
+        status=DocumentStatus.PENDING,
+        metadata={**source.metadata, **options.metadata, "cloned_from": source.id},
+    )
+    document_store.create_document(document)
+
+    offset = 0
+    while True:
+        page = chunk_store.list_chunks_by_document(source.id, limit=options.batch_size, offset=offset)
+        if not page:
+            break
+        offset += len(page)
+        stored = vector_index.get_vectors(source.collection_id, [chunk.id for chunk in page]) if reuse_vectors else {}
+        # Vectors can be missing if the source index was rebuilt; only those are re-embedded.
+        missing = [chunk for chunk in page if chunk.id not in stored]
+        if missing:
+            stored.update(zip([c.id for c in missing], embedder.embed_texts([c.text for c in missing]), strict=True))
+
+        chunks: list[Chunk] = []
+        vector_items: list[VectorItem] = []
+        for chunk in page:
+            clone = chunk.model_copy(
+                update={"id": str(uuid4()), "collection_id": collection_id, "document_id": document.id}
+            )
+            chunks.append(clone)
+            vector_items.append(
+                VectorItem(
+                    id=clone.id,
+                    vector=stored[chunk.id],
+                    collection_id=collection_id,
+                    document_id=document.id,
+                    chunk_id=clone.id,
+                    metadata={"order": clone.order, **clone.metadata},
+                )
+            )
+        chunk_store.upsert_chunks(chunks)
+        vector_index.upsert(vector_items)
+
+    document.status = DocumentStatus.INGESTED
+    document.updated_at = datetime.now(UTC)
+    return document_store.update_document(document)
+
+
 def ingest_document(
     *,
     collection_id: str,
@@ -46,12 +363,137 @@ def ingest_document(
     parsers: Iterable[Parser],
     options: IngestOptions,
     document_id: str | None = None,
+    on_progress: Callable[[int], None] | None = None,
+    token_counter: TokenCounter | None = None,
+    artifact_store: ParsedArtifactStore | None = None,
+    collection_store: CollectionStore | None = None,
 ) -> Document:
+    counter = token_counter or HeuristicTokenCounter()
     parser = _select_parser(parsers, mime=mime, filename=filename, parser_name=options.parser_name)
     content_hash = sha256(content).hexdigest()
 
-    blob_ref: BlobRef = blob_store.put(content, name=filename, mime=mime)
+    existing = _resolve_duplicate(
+        content_hash=content_hash,
+        collection_id=collection_id,
+        filename=filename,
+        document_store=document_store,
+        chunk_store=chunk_store,
+        vector_index=vector_index,
+        embedder=embedder,
+        options=options,
+        document_id=document_id,
+        collection_store=collection_store,
+    )
+    if existing is not None:
+        return existing
+
+    document, blob_ref = _create_document(
+        collection_id=collection_id,
+        filename=filename,
+        mime=mime,
+        content=content,
+        content_hash=content_hash,
+        blob_store=blob_store,
+        document_store=document_store,
+        options=options,
+        document_id=document_id,
+    )
+
+    parse_options = ParseOptions(parser_name=options.parser_name)
+    if options.streaming:
+        writer = _open_artifact(artifact_store, document, parser)
+        sections = parser.iter_sections(blob_ref, parse_options)
+        try:
+            parse_metadata = _ingest_sections(
+                document=document,
+                sections=sections if writer is None else _recorded(sections, writer),
+                chunk_store=chunk_store,
+                vector_index=vector_index,
+                embedder=embedder,
+                options=options,
+                token_counter=counter,
+                on_progress=on_progress,
+            )
+        except Exception:
+            if writer is not None:
+                writer.abort()
+            _fail_document(document, document_store)
+            raise
+        if writer is not None:
+            writer.commit(parse_metadata)
+    else:
+        parsed = parser.parse(blob_ref, parse_options)
+        _save_artifact(artifact_store, document, parser, parsed)
+        window_chars, token_limit = _chunk_limits(options)
+        pieces = list(
+            iter_section_chunks(
+                _document_sections(parsed),
+                chunk_size=window_chars,
+                chunk_overlap=options.chunk_overlap,
+                token_limit=token_limit,
+                token_counter=counter,
+            )
+        )
+        vectors = embedder.embed_texts([piece[0] for piece in pieces]) if pieces else []
+        chunks, vector_items = _build_records(document, pieces, vectors, 0, counter)
+        if chunks:
+            chunk_store.upsert_chunks(chunks)
+            vector_index.upsert(vector_items)
+        if on_progress is not None:
+            on_progress(len(chunks))
+        parse_metadata = parsed.metadata
+
+    return _finish_document(document, parse_metadata, document_store)
+
+
+def _resolve_duplicate(
+    *,
+    content_hash: str,
+    collection_id: str,
+    filename: str,
+    document_store: DocumentStore,
+    chunk_store: ChunkStore,
+    vector_index: VectorIndex,
+    embedder: Embedder,
+    options: IngestOptions,
+    document_id: str | None,
+    collection_store: CollectionStore | None = None,
+) -> Document | None:
+    """Return the document to use instead of ingesting ``content``, or ``None`` to ingest it."""
+    if options.dedup == "off":
+        return None
+    existing = _find_duplicate(document_store, content_hash, collection_id, options)
+    if existing is None:
+        return None
+    if options.dedup == "reuse" or existing.collection_id == collection_id:
+        return existing
+    return _clone_document(
+        source=existing,
+        collection_id=collection_id,
+        filename=filename,
+        document_store=document_store,
+        chunk_store=chunk_store,
+        vector_index=vector_index,
+        embedder=embedder,
+        options=options,
+        document_id=document_id,
+        collection_store=collection_store,
+    )
 
+
+def _create_document(
+    *,
+    collection_id: str,
+    filename: str,
+    mime: str,
+    content: bytes,
+    content_hash: str,
+    blob_store: BlobStore,
+    document_store: DocumentStore,
+    options: IngestOptions,
+    document_id: str | None,
+) -> tuple[Document, BlobRef]:
+    blob_ref: BlobRef = blob_store.put(content, name=filename, mime=mime)
     document = Document(
         id=document_id or str(uuid4()),
         collection_id=collection_id,
@@ -65,49 +507,198 @@ def ingest_document(
         metadata=options.metadata,
     )
     document_store.create_document(document)
+    return document, blob_ref
 
-    parsed = parser.parse(blob_ref, ParseOptions(parser_name=options.parser_name))
-    pieces = chunk_text(
-        parsed.text,
-        chunk_size=options.chunk_size,
-        chunk_overlap=options.chunk_overlap,
-        token_limit=max(options.chunk_size // 4, 1),
+
+def _finish_document(document: Document, parse_metadata: dict[str, Any], document_store: DocumentStore) -> Document:
+    document.status = DocumentStatus.INGESTED
+    document.metadata = {**document.metadata, **parse_metadata}
+    document.updated_at = datetime.now(UTC)
+    return document_store.update_document(document)
+
+
+def _fail_document(document: Document, document_store: DocumentStore) -> None:
+    # Batches committed so far stay in place; flag the document so callers can re-ingest it.
+    document.status = DocumentStatus.FAILED
+    document.updated_at = datetime.now(UTC)
+    document_store.update_document(document)
+
+
+def _to_retrieve_hit(hit: VectorHit, chunk: Chunk, doc: Document, include_chunks: bool) -> RetrieveHit:
+    snippet = chunk.text[:280]
+    # Offsets point into the parsed document text; chunks stored before offsets existed fall back
+    # to the snippet's position within the chunk.
+    start_char = chunk.start_char if chunk.start_char is not None else 0
+    end_char = chunk.end_char if chunk.end_char is not None else min(len(chunk.text), len(snippet))
+    citation = Citation(
+        document_id=doc.id,
+        chunk_id=chunk.id,
+        snippet=snippet,
+        page=chunk.metadata.get("page"),
+        start_char=start_char,
+        end_char=end_char,
+    )
+    return RetrieveHit(
+        chunk_id=chunk.id,
+        score=hit.score,
+        text=chunk.text if include_chunks else None,
+        citation=citation,
+        document={
+            "id": doc.id,
+            "title": doc.title,
+            "collection_id": doc.collection_id,
+            "metadata": doc.metadata,
+        },
     )
-    vectors = embedder.embed_texts(pieces) if pieces else []
 
-    chunks: list[Chunk] = []
-    vector_items: list[VectorItem] = []
 
-    for idx, (piece, vector) in enumerate(zip(pieces, vectors, strict=True)):
-        chunk = Chunk(
-            id=str(uuid4()),
-            collection_id=collection_id,
-            document_id=document.id,
-            text=piece,
-            token_count=estimate_token_count(piece),
-            order=idx,
-            metadata=parsed.metadata,
-        )
-        chunks.append(chunk)
-        vector_items.append(
-            VectorItem(
-                id=chunk.id,
-                vector=vector,
-                collection_id=collection_id,
-                document_id=document.id,
-                chunk_id=chunk.id,
-                metadata={"order": idx, **chunk.metadata},
-            )
-        )
+def _embed_query(embedder: Embedder, query: str, query_cache: QueryEmbeddingCache | None) -> list[float]:
+    if query_cache is not None:
+        return query_cache.embed(embedder, query)
+    return embedder.embed_query(query)
 
-    if chunks:
-        chunk_store.upsert_chunks(chunks)
-        vector_index.upsert(vector_items)
 
-    document.status = DocumentStatus.INGESTED
-    document.metadata = {**document.metadata, **parsed.metadata}
-    document.updated_at = datetime.now(UTC)
-    return document_store.update_document(document)
+async def _aembed_query(embedder: AsyncEmbedder, query: str, query_cache: QueryEmbeddingCache | None) -> list[float]:
+    if query_cache is not None:
+        return await query_cache.aembed(embedder, query)
+    return await embedder.embed_query(query)
+
+
+def _pool_size(top_k: int, options: RetrieveOptions, has_lexical: bool, has_reranker: bool) -> int:
+    if options.mode != "vector" and not has_lexical:
+        raise ValueError(f"retrieve mode '{options.mode}' requires a lexical index")
+    if options.rerank and not has_reranker:
+        raise ValueError("rerank requested but no reranker is configured")
+    # Reranking and diversification need a wider candidate pool than the final top_k.
+    pool_size = max(top_k, options.rerank_candidates) if options.rerank else top_k
+    if options.mmr or options.max_per_document is not None:
+        pool_size = max(pool_size, options.mmr_candidates)
+    return pool_size
+
+
+def _initial_candidate_count(pool_size: int, options: RetrieveOptions) -> int:
+    if options.overfetch:
+        return min(math.ceil(pool_size * options.overfetch_factor), options.max_candidates)
+    return pool_size
+
+
+def _next_candidate_count(top_k: int, requested: int, scanned: int, survived: int, options: RetrieveOptions) -> int:
+    # Size the next round from the observed filter selectivity, but always grow by at least the factor.
+    selectivity = max(survived, 1) / max(scanned, 1)
+    estimate = math.ceil(top_k / selectivity)
+    grown = math.ceil(requested * options.overfetch_factor)
+    return min(max(estimate, grown, requested + 1), options.max_candidates)
+
+
+def _should_deepen(
+    options: RetrieveOptions, survived: int, pool_size: int, requested: int, exhausted: bool, started: float
+) -> bool:
+    if not options.overfetch or survived >= pool_size:
+        return False
+    over_budget = (
+        options.latency_budget_ms is not None and (time.perf_counter() - started) * 1000 >= options.latency_budget_ms
+    )
+    return not (exhausted or over_budget or requested >= options.max_candidates)
+
+
+def _fuse(
+    vector_hits: list[VectorHit], lexical_hits: list[VectorHit], count: int, options: RetrieveOptions
+) -> tuple[list[VectorHit], bool]:
+    fused = reciprocal_rank_fusion([vector_hits, lexical_hits], k=options.rrf_k)
+    return fused, len(vector_hits) < count and len(lexical_hits) < count
+
+
+def _in_scope(
+    raw_hits: list[VectorHit], collection_ids: list[str], chunk_map: dict[str, Chunk]
+) -> tuple[list[VectorHit], list[str]]:
+    """Split raw hits into those inside the requested collections and the chunk ids not loaded yet."""
+    in_scope = [hit for hit in raw_hits if hit.collection_id in collection_ids]
+    unseen = [hit.chunk_id for hit in in_scope if hit.chunk_id not in chunk_map]
+    return in_scope, unseen
+
+
+def _survivors(
+    in_scope: list[VectorHit], chunk_map: dict[str, Chunk], filters: MetadataFilter | None
+) -> list[tuple[VectorHit, Chunk]]:
+    pairs: list[tuple[VectorHit, Chunk]] = []
+    for hit in in_scope:
+        chunk = chunk_map.get(hit.chunk_id)
+        if chunk is not None and match_metadata(chunk.metadata, filters):
+            pairs.append((hit, chunk))
+    return pairs
+
+
+def _cap_per_document(survivors: list[tuple[VectorHit, Chunk]], max_per_document: int) -> list[tuple[VectorHit, Chunk]]:
+    per_document: dict[str, int] = {}
+    capped: list[tuple[VectorHit, Chunk]] = []
+    for hit, chunk in survivors:
+        seen = per_document.get(chunk.document_id, 0)
+        if seen < max_per_document:
+            per_document[chunk.document_id] = seen + 1
+            capped.append((hit, chunk))
+    return capped
+
+
+def _missing_vectors(pool: list[tuple[VectorHit, Chunk]]) -> dict[str, list[str]]:
+    # Hits from the lexical index (or an index that ignores include_vectors) carry no vector.
+    missing: dict[str, list[str]] = {}
+    for hit, _ in pool:
+        if hit.vector is None:
+            missing.setdefault(hit.collection_id, []).append(hit.id)
+    return missing
+
+
+def _mmr_order(
+    pool: list[tuple[VectorHit, Chunk]],
+    fetched: dict[str, list[float]],
+    *,
+    top_k: int,
+    options: RetrieveOptions,
+    query_vector: list[float] | None,
+    use_query_similarity: bool,
+) -> list[tuple[VectorHit, Chunk]]:
+    """Reorder the candidate pool by MMR, honouring ``max_per_document`` as a group cap."""
+    pool = [(hit, chunk) for hit, chunk in pool if hit.vector is not None or hit.id in fetched]
+    if not pool:
+        return []
+
+    rows = [hit.vector if hit.vector is not None else fetched[hit.id] for hit, _ in pool]
+    matrix = np.asarray(rows, dtype=np.float32)
+    relevance: np.ndarray | None = None
+    if not use_query_similarity or query_vector is None:
+        # Fused, lexical and rerank scores live on their own scales; min-max them into [0, 1].
+        scores = np.asarray([hit.score for hit, _ in pool], dtype=np.float32)
+        spread = float(scores.max() - scores.min())
+        relevance = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+    picks = mmr_select(
+        matrix,
+        k=top_k,
+        query_vector=query_vector,
+        relevance=relevance,
+        lambda_mult=options.mmr_lambda,
+        groups=[chunk.document_id for _, chunk in pool],
+        max_per_group=options.max_per_document,
+    )
+    return [pool[index] for index in picks]
+
+
+def _collect_hits(
+    survivors: list[tuple[VectorHit, Chunk]], documents: list[Document], top_k: int, include_chunks: bool
+) -> list[RetrieveHit]:
+    document_map = {doc.id: doc for doc in documents}
+    results: list[RetrieveHit] = []
+    for hit, chunk in survivors:
+        doc = document_map.get(chunk.document_id)
+        if doc is None:
+            continue
+        results.append(_to_retrieve_hit(hit, chunk, doc, include_chunks))
+        if len(results) >= top_k:
+            break
+    return results
+
+
+def _document_ids(survivors: list[tuple[VectorHit, Chunk]]) -> list[str]:
+    return list(dict.fromkeys(chunk.document_id for _, chunk in survivors))
 
 
 def retrieve(
@@ -121,49 +712,192 @@ def retrieve(
     vector_index: VectorIndex,
     chunk_store: ChunkStore,
     document_store: DocumentStore,
+    query_cache: QueryEmbeddingCache | None = None,
+    options: RetrieveOptions | None = None,
+    lexical_index: LexicalIndex | None = None,
+    reranker: Reranker | None = None,
+    rerank_cache: RerankScoreCache | None = None,
 ) -> RetrieveResult:
-    query_vector = embedder.embed_query(query)
-    raw_hits = vector_index.query(query_vector, top_k=top_k, filter=filters)
+    opts = options or RetrieveOptions()
+    pool_size = _pool_size(top_k, opts, lexical_index is not None, reranker is not None)
+    started = time.perf_counter()
+    query_vector: list[float] | None = None
 
-    filtered_hits = [hit for hit in raw_hits if hit.collection_id in collection_ids]
-    chunk_map = {chunk.id: chunk for chunk in chunk_store.get_chunks([h.chunk_id for h in filtered_hits])}
+    def vector_candidates(count: int) -> list[VectorHit]:
+        nonlocal query_vector
+        if query_vector is None:
+            query_vector = _embed_query(embedder, query, query_cache)
+        return vector_index.query(
+            query_vector, top_k=count, filter=filters, collection_ids=collection_ids, include_vectors=opts.mmr
+        )
 
-    results: list[RetrieveHit] = []
-    for hit in filtered_hits:
-        chunk = chunk_map.get(hit.chunk_id)
-        if chunk is None:
-            continue
-        if not match_metadata(chunk.metadata, filters):
-            continue
-        doc = document_store.get_document(chunk.document_id)
-        if doc is None:
-            continue
+    def lexical_candidates(count: int) -> list[VectorHit]:
+        assert lexical_index is not None
+        return lexical_index.search_chunks(query, top_k=count, collection_ids=collection_ids)
+
+    def candidates(count: int, pool: ThreadPoolExecutor) -> tuple[list[VectorHit], bool]:
+        """Return up to ``count`` ranked candidates per source and whether every source ran dry."""
+        if opts.mode == "vector":
+            hits = vector_candidates(count)
+            return hits, len(hits) < count
+        if opts.mode == "lexical":
+            hits = lexical_candidates(count)
+            return hits, len(hits) < count
+        # BM25 runs on the pool while this thread waits on the embedder and the vector index.
+        lexical_future = pool.submit(lexical_candidates, count)
+        vector_hits = vector_candidates(count)
+        return _fuse(vector_hits, lexical_future.result(), count, opts)
+
+    chunk_map: dict[str, Chunk] = {}
+
+    def survivors_of(raw_hits: list[VectorHit]) -> list[tuple[VectorHit, Chunk]]:
+        in_scope, unseen = _in_scope(raw_hits, collection_ids, chunk_map)
+        chunk_map.update((chunk.id, chunk) for chunk in chunk_store.get_chunks(unseen))
+        return _survivors(in_scope, chunk_map, filters)
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-lexical") as pool:
+        requested = _initial_candidate_count(pool_size, opts)
+        raw_hits, exhausted = candidates(requested, pool)
+        # Each deeper round re-reads the earlier candidates, so count distinct chunks rather than rows.
+        scanned = {hit.chunk_id for hit in raw_hits}
+        survivors = survivors_of(raw_hits)
 
-        snippet = chunk.text[:280]
-        citation = Citation(
-            document_id=doc.id,
-            chunk_id=chunk.id,
-            snippet=snippet,
-            page=chunk.metadata.get("page"),
-            start_char=0,
-            end_char=min(len(chunk.text), len(snippet)),
+        while _should_deepen(opts, len(survivors), pool_size, requested, exhausted, started):
+            requested = _next_candidate_count(pool_size, requested, len(raw_hits), len(survivors), opts)
+            raw_hits, exhausted = candidates(requested, pool)
+            scanned.update(hit.chunk_id for hit in raw_hits)
+            survivors = survivors_of(raw_hits)
+
+    survivors = survivors[:pool_size]
+    reranked = False
+    if opts.rerank and reranker is not None and survivors:
+        survivors, reranked = rerank_candidates(
+            query,
+            survivors,
+            reranker,
+            batch_size=opts.rerank_batch_size,
+            score_cache=rerank_cache,
+            latency_budget_ms=opts.rerank_budget_ms,
         )
-        results.append(
-            RetrieveHit(
-                chunk_id=chunk.id,
-                score=hit.score,
-                text=chunk.text if include_chunks else None,
-                citation=citation,
-                document={
-                    "id": doc.id,
-                    "title": doc.title,
-                    "collection_id": doc.collection_id,
-                    "metadata": doc.metadata,
-                },
-            )
+    if survivors and opts.mmr:
+        pool_hits = survivors[: opts.mmr_candidates]
+        fetched: dict[str, list[float]] = {}
+        for collection_id, vector_ids in _missing_vectors(pool_hits).items():
+            fetched.update(vector_index.get_vectors(collection_id, vector_ids))
+        survivors = _mmr_order(
+            pool_hits,
+            fetched,
+            top_k=top_k,
+            options=opts,
+            query_vector=query_vector,
+            use_query_similarity=opts.mode == "vector" and not reranked,
+        )
+    elif survivors and opts.max_per_document is not None:
+        survivors = _cap_per_document(survivors, opts.max_per_document)
+
+    documents = document_store.get_documents(_document_ids(survivors))
+    results = _collect_hits(survivors, documents, top_k, include_chunks)
+    return RetrieveResult(query=query, hits=results, candidates_scanned=len(scanned), reranked=reranked)
+
+
+async def aretrieve(
+    *,
+    query: str,
+    collection_ids: list[str],
+    top_k: int,
+    include_chunks: bool,
+    filters: MetadataFilter | None,
+    embedder: AsyncEmbedder,
+    vector_index: AsyncVectorIndex,
+    chunk_store: AsyncChunkStore,
+    document_store: AsyncDocumentStore,
+    query_cache: QueryEmbeddingCache | None = None,
+    options: RetrieveOptions | None = None,
+    lexical_index: LexicalIndex | None = None,
+    reranker: Reranker | None = None,
+    rerank_cache: RerankScoreCache | None = None,
+) -> RetrieveResult:
+    """Async counterpart of :func:`retrieve` with the same options and result.
+
+    The embedder, vector index and stores are awaited directly. The lexical index and the
+    reranker stay synchronous ports and run via ``asyncio.to_thread``.
+    """
+    opts = options or RetrieveOptions()
+    pool_size = _pool_size(top_k, opts, lexical_index is not None, reranker is not None)
+    started = time.perf_counter()
+    query_vector: list[float] | None = None
+
+    async def vector_candidates(count: int) -> list[VectorHit]:
+        nonlocal query_vector
+        if query_vector is None:
+            query_vector = await _aembed_query(embedder, query, query_cache)
+        return await vector_index.query(
+            query_vector, top_k=count, filter=filters, collection_ids=collection_ids, include_vectors=opts.mmr
         )
 
-    return RetrieveResult(query=query, hits=results)
+    async def lexical_candidates(count: int) -> list[VectorHit]:
+        assert lexical_index is not None
+        return await asyncio.to_thread(lexical_index.search_chunks, query, top_k=count, collection_ids=collection_ids)
+
+    async def candidates(count: int) -> tuple[list[VectorHit], bool]:
+        if opts.mode == "vector":
+            hits = await vector_candidates(count)
+            return hits, len(hits) < count
+        if opts.mode == "lexical":
+            hits = await lexical_candidates(count)
+            return hits, len(hits) < count
+        vector_hits, lexical_hits = await asyncio.gather(vector_candidates(count), lexical_candidates(count))
+        return _fuse(vector_hits, lexical_hits, count, opts)
+
+    chunk_map: dict[str, Chunk] = {}
+
+    async def survivors_of(raw_hits: list[VectorHit]) -> list[tuple[VectorHit, Chunk]]:
+        in_scope, unseen = _in_scope(raw_hits, collection_ids, chunk_map)
+        chunk_map.update((chunk.id, chunk) for chunk in await chunk_store.get_chunks(unseen))
+        return _survivors(in_scope, chunk_map, filters)
+
+    requested = _initial_candidate_count(pool_size, opts)
+    raw_hits, exhausted = await candidates(requested)
+    scanned = {hit.chunk_id for hit in raw_hits}
+    survivors = await survivors_of(raw_hits)
+
+    while _should_deepen(opts, len(survivors), pool_size, requested, exhausted, started):
+        requested = _next_candidate_count(pool_size, requested, len(raw_hits), len(survivors), opts)
+        raw_hits, exhausted = await candidates(requested)
+        scanned.update(hit.chunk_id for hit in raw_hits)
+        survivors = await survivors_of(raw_hits)
+
+    survivors = survivors[:pool_size]
+    reranked = False
+    if opts.rerank and reranker is not None and survivors:
+        survivors, reranked = await asyncio.to_thread(
+            rerank_candidates,
+            query,
+            survivors,
+            reranker,
+            batch_size=opts.rerank_batch_size,
+            score_cache=rerank_cache,
+            latency_budget_ms=opts.rerank_budget_ms,
+        )
+    if survivors and opts.mmr:
+        pool_hits = survivors[: opts.mmr_candidates]
+        fetched: dict[str, list[float]] = {}
+        for collection_id, vector_ids in _missing_vectors(pool_hits).items():
+            fetched.update(await vector_index.get_vectors(collection_id, vector_ids))
+        survivors = _mmr_order(
+            pool_hits,
+            fetched,
+            top_k=top_k,
+            options=opts,
+            query_vector=query_vector,
+            use_query_similarity=opts.mode == "vector" and not reranked,
+        )
+    elif survivors and opts.max_per_document is not None:
+        survivors = _cap_per_document(survivors, opts.max_per_document)
+
+    documents = await document_store.get_documents(_document_ids(survivors))
+    results = _collect_hits(survivors, documents, top_k, include_chunks)
+    return RetrieveResult(query=query, hits=results, candidates_scanned=len(scanned), reranked=reranked)
 
 
 def delete_document(
@@ -173,10 +907,16 @@ def delete_document(
     document_store: DocumentStore,
     chunk_store: ChunkStore,
     vector_index: VectorIndex,
+    artifact_store: ParsedArtifactStore | None = None,
 ) -> None:
+    document = document_store.get_document(document_id) if artifact_store is not None else None
     vector_index.delete_by_document(collection_id=collection_id, document_id=document_id)
     chunk_store.delete_chunks_by_document(document_id)
     document_store.delete_document(document_id)
+    # Artifacts are keyed by content, so they go only with the last document holding these bytes.
+    if artifact_store is not None and document is not None and document.hash is not None:
+        if document_store.find_document_by_hash(document.hash, None) is None:
+            artifact_store.delete_prefix(_artifact_prefix(document.hash))
 
 
 def get_document_original(
@@ -185,19 +925,62 @@ def get_document_original(
     document_store: DocumentStore,
     blob_store: BlobStore,
     parsers: Iterable[Parser],
+    artifact_store: ParsedArtifactStore | None = None,
 ) -> tuple[Document, str, dict]:
     document = document_store.get_document(document_id)
     if document is None:
         raise ValueError(f"Document not found: {document_id}")
 
-    blob = BlobRef(id=document.id, path=document.blob_ref, name=document.title, mime=document.mime)
     parser = _select_parser(parsers, mime=document.mime, filename=document.title)
-    # Ensure blob exists/readable and parse content consistently with ingest parser adapters.
-    blob_store.get(blob)
-    parsed = parser.parse(blob, ParseOptions())
+    parsed = _load_parsed(document, parser, blob_store, artifact_store)
     return document, parsed.text, parsed.metadata
 
 
+def rechunk_document(
+    *,
+    document_id: str,
+    document_store: DocumentStore,
+    chunk_store: ChunkStore,
+    vector_index: VectorIndex,
+    embedder: Embedder,
+    blob_store: BlobStore,
+    parsers: Iterable[Parser],
+    options: IngestOptions,
+    artifact_store: ParsedArtifactStore | None = None,
+    token_counter: TokenCounter | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> Document:
+    """Rebuild a document's chunks and vectors with new chunking options from its stored parse.
+
+    The parser only runs if no artifact exists for the document's content and parser version.
+    Existing chunks are dropped before the new ones are written, so the document is briefly
+    missing from retrieval while it is re-embedded.
+    """
+    document = document_store.get_document(document_id)
+    if document is None:
+        raise ValueError(f"Document not found: {document_id}")
+    parser = _select_parser(parsers, mime=document.mime, filename=document.title)
+    parsed = _load_parsed(document, parser, blob_store, artifact_store)
+
+    vector_index.delete_by_document(collection_id=document.collection_id, document_id=document.id)
+    chunk_store.delete_chunks_by_document(document.id)
+    try:
+        _ingest_sections(
+            document=document,
+            sections=_document_sections(parsed),
+            chunk_store=chunk_store,
+            vector_index=vector_index,
+            embedder=embedder,
+            options=options,
+            token_counter=token_counter or HeuristicTokenCounter(),
+            on_progress=on_progress,
+        )
+    except Exception:
+        _fail_document(document, document_store)
+        raise
+    return _finish_document(document, parsed.metadata, document_store)
+
+
 def list_document_chunks(
     *,
     document_id: str,
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+
+from kb_core.models import Chunk, VectorHit
+from kb_core.ports import Reranker
+from kb_core.services import LRUCache, normalize_query
+
+RerankScoreCache = LRUCache[tuple[str, str, str], float]
+
+
+def rerank_candidates(
+    query: str,
+    candidates: list[tuple[VectorHit, Chunk]],
+    reranker: Reranker,
+    *,
+    batch_size: int = 16,
+    score_cache: RerankScoreCache | None = None,
+    latency_budget_ms: float | None = None,
+) -> tuple[list[tuple[VectorHit, Chunk]], bool]:
+    """Reorder candidates by reranker score.
+
+    Returns the candidates and whether reranking was applied. If scoring the uncached
+    candidates overruns ``latency_budget_ms``, the input order is returned unchanged; scores
+    computed up to that point are still cached for later requests.
+    """
+    started = time.perf_counter()
+    normalized = normalize_query(query)
+    scores: dict[str, float] = {}
+    pending: list[Chunk] = []
+    for _, chunk in candidates:
+        cached = score_cache.get((normalized, chunk.id, reranker.model)) if score_cache is not None else None
+        if cached is None:
+            pending.append(chunk)
+        else:
+            scores[chunk.id] = cached
+
+    for start in range(0, len(pending), batch_size):
+        if latency_budget_ms is not None and (time.perf_counter() - started) * 1000 >= latency_budget_ms:
+            return candidates, False
+        batch = pending[start : start + batch_size]
+        for chunk, score in zip(batch, reranker.score(normalized, [c.text for c in batch]), strict=True):
+            scores[chunk.id] = score
+            if score_cache is not None:
+                score_cache.put((normalized, chunk.id, reranker.model), score)
+
+    reranked = [(hit.model_copy(update={"score": scores[chunk.id]}), chunk) for hit, chunk in candidates]
+    reranked.sort(key=lambda pair: pair[0].score, reverse=True)
+    return reranked, True
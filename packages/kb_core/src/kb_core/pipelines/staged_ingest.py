@@ -0,0 +1,457 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from hashlib import sha256
+from typing import Any
+
+from kb_core.models import Document, IngestOptions, ParsedSection, ParseOptions
+from kb_core.pipelines.rag import (
+    _build_records,
+    _create_document,
+    _document_sections,
+    _fail_document,
+    _finish_document,
+    _iter_piece_batches,
+    _open_artifact,
+    _recorded,
+    _resolve_duplicate,
+    _save_artifact,
+    _select_parser,
+    _SharedMetadata,
+)
+from kb_core.ports import (
+    BlobStore,
+    ChunkStore,
+    CollectionStore,
+    DocumentStore,
+    Embedder,
+    ParsedArtifactStore,
+    ParsedArtifactWriter,
+    Parser,
+    TokenCounter,
+    VectorIndex,
+)
+from kb_core.services import HeuristicTokenCounter
+
+_POLL_SECONDS = 0.2
+
+
+@dataclass
+class IngestTask:
+    """One upload handed to :class:`StagedIngestPipeline`.
+
+    ``on_done`` receives the resulting document (``None`` if it was never created) and the error,
+    if any; it is called exactly once per task.
+    """
+
+    collection_id: str
+    filename: str
+    mime: str
+    content: bytes
+    options: IngestOptions
+    document_id: str | None = None
+    on_start: Callable[[], None] | None = None
+    on_progress: Callable[[int], None] | None = None
+    on_done: Callable[[Document | None, BaseException | None], None] | None = None
+
+
+@dataclass(eq=False)
+class _Run:
+    task: IngestTask
+    content_hash: str | None = None
+    # Identical uploads parked until this run, the first one in flight, settles.
+    followers: list[_Run] = field(default_factory=list)
+    started: bool = False
+    document: Document | None = None
+    sections: Iterable[ParsedSection] = ()
+    shared: _SharedMetadata = field(default_factory=_SharedMetadata)
+    # Set for whole-document parses; streamed documents keep the metadata all sections share.
+    parse_metadata: dict[str, Any] | None = None
+    artifact: ParsedArtifactWriter | None = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    pending: int = 0
+    committed: int = 0
+    chunked: bool = False
+    finished: bool = False
+    error: BaseException | None = None
+
+
+def _timed(sections: Iterable[ParsedSection], stage: _Stage) -> Iterator[ParsedSection]:
+    """Charge the time spent producing each section to ``stage``."""
+    iterator = iter(sections)
+    while True:
+        started = time.perf_counter()
+        try:
+            section = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            stage.add_streamed(time.perf_counter() - started)
+        yield section
+
+
+@dataclass
+class _Batch:
+    run: _Run
+    pieces: list[tuple[str, dict[str, Any], int, int]]
+    start_order: int
+    vectors: list[list[float]] | None = None
+
+
+class _Stage:
+    def __init__(self, name: str, workers: int, capacity: int, handler: Callable[[Any], int]) -> None:
+        self.name = name
+        self.workers = max(workers, 1)
+        self.queue: queue.Queue[Any] = queue.Queue(maxsize=capacity)
+        self.handler = handler
+        self._lock = threading.Lock()
+        self._processed = 0
+        self._failed = 0
+        self._chunks = 0
+        self._busy_seconds = 0.0
+        self._streamed_seconds = 0.0
+
+    def add_streamed(self, seconds: float) -> None:
+        with self._lock:
+            self._streamed_seconds += seconds
+
+    def record(self, seconds: float, chunks: int, ok: bool) -> None:
+        with self._lock:
+            self._busy_seconds += seconds
+            self._chunks += chunks
+            if ok:
+                self._processed += 1
+            else:
+                self._failed += 1
+
+    def stats(self, elapsed: float) -> dict[str, Any]:
+        with self._lock:
+            busy = self._busy_seconds
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue.qsize(),
+                "queue_capacity": self.queue.maxsize or None,
+                "processed": self._processed,
+                "failed": self._failed,
+                "chunks": self._chunks,
+                "busy_seconds": round(busy, 3),
+                "items_per_second": round(self._processed / elapsed, 3) if elapsed > 0 else 0.0,
+                "chunks_per_second": round(self._chunks / elapsed, 3) if elapsed > 0 else 0.0,
+                # Share of the stage's worker time spent working; the busiest stage is the bottleneck.
+                "utilization": round(busy / (elapsed * self.workers), 3) if elapsed > 0 else 0.0,
+                # Work of this stage done lazily on another stage's workers (streamed parsing).
+                "streamed_seconds": round(self._streamed_seconds, 3),
+            }
+
+
+class StagedIngestPipeline:
+    """Ingest uploads through parse -> chunk -> embed -> upsert stages joined by bounded queues.
+
+    Every stage runs its own worker threads, so one document can be parsed while another is being
+    embedded. Chunk batches of ``options.batch_size`` flow through embed and upsert independently;
+    a document is marked ingested once its last batch is upserted. The bounded queues apply
+    backpressure, so a slow embedder stalls chunking instead of buffering whole documents.
+
+    With ``options.streaming`` the parse stage only opens the document: sections are parsed lazily
+    as the chunk stage pulls them, so that parsing runs on chunk workers and ``parse_workers`` does
+    not bound it. Its time is reported as the parse stage's ``streamed_seconds`` (and is part of the
+    chunk stage's busy time).
+
+    Uploads whose content matches a document still in flight wait for it and are then resolved
+    against the stored result, so concurrent duplicates deduplicate like serial ones. Tasks still
+    unfinished when the pipeline stops are failed, so no job is left running.
+    """
+
+    def __init__(
+        self,
+        *,
+        blob_store: BlobStore,
+        document_store: DocumentStore,
+        chunk_store: ChunkStore,
+        vector_index: VectorIndex,
+        embedder: Embedder,
+        parsers: Iterable[Parser],
+        token_counter: TokenCounter | None = None,
+        artifact_store: ParsedArtifactStore | None = None,
+        collection_store: CollectionStore | None = None,
+        parse_workers: int = 1,
+        chunk_workers: int = 1,
+        embed_workers: int = 1,
+        upsert_workers: int = 1,
+        queue_size: int = 8,
+    ) -> None:
+        self._blob_store = blob_store
+        self._document_store = document_store
+        self._chunk_store = chunk_store
+        self._vector_index = vector_index
+        self._embedder = embedder
+        self._parsers = list(parsers)
+        self._counter = token_counter or HeuristicTokenCounter()
+        self._artifact_store = artifact_store
+        self._collection_store = collection_store
+        # Submissions are unbounded so that enqueueing an upload never blocks a request handler.
+        self._parse = _Stage("parse", parse_workers, 0, self._parse_run)
+        self._chunk = _Stage("chunk", chunk_workers, queue_size, self._chunk_run)
+        self._embed = _Stage("embed", embed_workers, queue_size, self._embed_batch)
+        self._upsert = _Stage("upsert", upsert_workers, queue_size, self._upsert_batch)
+        self._stages = (self._parse, self._chunk, self._embed, self._upsert)
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._active: set[_Run] = set()
+        # content hash -> collection id -> the run currently ingesting that content there.
+        self._leaders: dict[str, dict[str, _Run]] = {}
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop_event.clear()
+        self._started = time.perf_counter()
+        for stage in self._stages:
+            for index in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(stage,), name=f"kb-ingest-{stage.name}-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+        for stage in self._stages:
+            while True:
+                try:
+                    stage.queue.get_nowait()
+                except queue.Empty:
+                    break
+                stage.queue.task_done()
+        with self._lock:
+            unfinished = list(self._active)
+        for run in unfinished:
+            self._fail(run, RuntimeError("ingest pipeline stopped"))
+
+    def submit(self, task: IngestTask) -> None:
+        run = _Run(task=task)
+        with self._lock:
+            self._in_flight += 1
+            self._active.add(run)
+        self._parse.queue.put(run)
+
+    def stats(self) -> dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "documents_in_flight": in_flight,
+            "stages": {stage.name: stage.stats(elapsed) for stage in self._stages},
+        }
+
+    def _work(self, stage: _Stage) -> None:
+        while not self._stop_event.is_set():
+            try:
+                item = stage.queue.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            started = time.perf_counter()
+            chunks, ok = 0, True
+            try:
+                chunks = stage.handler(item)
+            except Exception as exc:  # noqa: BLE001
+                ok = False
+                self._fail(item.run if isinstance(item, _Batch) else item, exc)
+            finally:
+                stage.record(time.perf_counter() - started, chunks, ok)
+                stage.queue.task_done()
+
+    def _put(self, stage: _Stage, item: Any) -> bool:
+        while not self._stop_event.is_set():
+            try:
+                stage.queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _parse_run(self, run: _Run) -> int:
+        task = run.task
+        if task.on_start is not None and not run.started:
+            task.on_start()
+        run.started = True
+        parser = _select_parser(
+            self._parsers, mime=task.mime, filename=task.filename, parser_name=task.options.parser_name
+        )
+        if run.content_hash is None:
+            run.content_hash = sha256(task.content).hexdigest()
+        content_hash = run.content_hash
+        if not self._lead(run):
+            return 0
+        existing = _resolve_duplicate(
+            content_hash=content_hash,
+            collection_id=task.collection_id,
+            filename=task.filename,
+            document_store=self._document_store,
+            chunk_store=self._chunk_store,
+            vector_index=self._vector_index,
+            embedder=self._embedder,
+            options=task.options,
+            document_id=task.document_id,
+            collection_store=self._collection_store,
+        )
+        if existing is not None:
+            run.document = existing
+            with run.lock:
+                run.finished = True
+            self._done(run, existing, None)
+            return 0
+
+        run.document, blob_ref = _create_document(
+            collection_id=task.collection_id,
+            filename=task.filename,
+            mime=task.mime,
+            content=task.content,
+            content_hash=content_hash,
+            blob_store=self._blob_store,
+            document_store=self._document_store,
+            options=task.options,
+            document_id=task.document_id,
+        )
+        parse_options = ParseOptions(parser_name=task.options.parser_name)
+        if task.options.streaming:
+            # Sections are produced lazily as the chunk stage consumes them, bounding memory per document.
+            run.sections = _timed(parser.iter_sections(blob_ref, parse_options), self._parse)
+            run.artifact = _open_artifact(self._artifact_store, run.document, parser)
+            if run.artifact is not None:
+                run.sections = _recorded(run.sections, run.artifact)
+        else:
+            parsed = parser.parse(blob_ref, parse_options)
+            _save_artifact(self._artifact_store, run.document, parser, parsed)
+            run.sections = _document_sections(parsed)
+            run.parse_metadata = parsed.metadata
+        self._put(self._chunk, run)
+        return 0
+
+    def _chunk_run(self, run: _Run) -> int:
+        order = 0
+        for pieces in _iter_piece_batches(run.shared.track(run.sections), run.task.options, self._counter):
+            if run.error is not None:
+                return order
+            with run.lock:
+                run.pending += 1
+            if not self._put(self._embed, _Batch(run=run, pieces=pieces, start_order=order)):
+                return order
+            order += len(pieces)
+        with run.lock:
+            run.chunked = True
+        self._settle(run)
+        return order
+
+    def _embed_batch(self, batch: _Batch) -> int:
+        if batch.run.error is not None:
+            return 0
+        batch.vectors = self._embedder.embed_texts([piece[0] for piece in batch.pieces])
+        self._put(self._upsert, batch)
+        return len(batch.pieces)
+
+    def _upsert_batch(self, batch: _Batch) -> int:
+        run = batch.run
+        if run.error is not None or run.document is None or batch.vectors is None:
+            return 0
+        chunks, vector_items = _build_records(
+            run.document, batch.pieces, batch.vectors, batch.start_order, self._counter
+        )
+        self._chunk_store.upsert_chunks(chunks)
+        self._vector_index.upsert(vector_items)
+        with run.lock:
+            run.pending -= 1
+            run.committed += len(chunks)
+            committed = run.committed
+        if run.task.on_progress is not None:
+            run.task.on_progress(committed)
+        self._settle(run)
+        return len(chunks)
+
+    def _settle(self, run: _Run) -> None:
+        with run.lock:
+            if run.finished or not run.chunked or run.pending > 0:
+                return
+            run.finished = True
+        assert run.document is not None
+        try:
+            metadata = run.shared.value if run.parse_metadata is None else run.parse_metadata
+            if run.artifact is not None:
+                run.artifact.commit(metadata)
+            document = _finish_document(run.document, metadata, self._document_store)
+        except Exception as exc:  # noqa: BLE001
+            self._done(run, run.document, exc)
+            return
+        self._done(run, document, None)
+
+    def _fail(self, run: _Run, exc: BaseException) -> None:
+        with run.lock:
+            if run.finished:
+                return
+            run.finished = True
+            run.error = exc
+        if run.artifact is not None:
+            run.artifact.abort()
+        if run.document is not None:
+            try:
+                _fail_document(run.document, self._document_store)
+            except Exception:  # noqa: BLE001
+                pass
+        self._done(run, run.document, exc)
+
+    def _lead(self, run: _Run) -> bool:
+        """Claim ``run``'s content for its collection, or park it behind the run already ingesting it."""
+        options = run.task.options
+        if options.dedup == "off":
+            return True
+        assert run.content_hash is not None
+        with self._lock:
+            if run.finished:
+                return False
+            leaders = self._leaders.setdefault(run.content_hash, {})
+            if options.dedup_scope == "global":
+                leader = next(iter(leaders.values()), None)
+            else:
+                leader = leaders.get(run.task.collection_id)
+            if leader is not None:
+                leader.followers.append(run)
+                return False
+            leaders[run.task.collection_id] = run
+        return True
+
+    def _release_followers(self, run: _Run) -> None:
+        if run.content_hash is None:
+            return
+        with self._lock:
+            leaders = self._leaders.get(run.content_hash)
+            if leaders is None or leaders.get(run.task.collection_id) is not run:
+                return
+            del leaders[run.task.collection_id]
+            if not leaders:
+                del self._leaders[run.content_hash]
+            followers, run.followers = run.followers, []
+        stopping = self._stop_event.is_set()
+        for follower in followers:
+            # Parsed again, each now finds the settled document (or leads, if this run failed).
+            if stopping:
+                self._fail(follower, RuntimeError("ingest pipeline stopped"))
+            else:
+                self._parse.queue.put(follower)
+
+    def _done(self, run: _Run, document: Document | None, error: BaseException | None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._active.discard(run)
+        self._release_followers(run)
+        if run.task.on_done is not None:
+            run.task.on_done(document, error)
@@ -1,19 +1,35 @@
+from kb_core.ports.artifact import ParsedArtifactStore, ParsedArtifactWriter
 from kb_core.ports.blob import BlobStore
-from kb_core.ports.collection import CollectionStore
-from kb_core.ports.embedder import Embedder, LLMClient
+from kb_core.ports.collection import CollectionStore, EmbeddingModelStore
+from kb_core.ports.embedder import AsyncEmbedder, AsyncLLMClient, Embedder, EmbeddingCache, LLMClient
 from kb_core.ports.job import JobStore
+from kb_core.ports.lexical import LexicalIndex
 from kb_core.ports.parser import Parser
-from kb_core.ports.store import ChunkStore, DocumentStore
-from kb_core.ports.vector import VectorIndex
+from kb_core.ports.reranker import Reranker
+from kb_core.ports.store import AsyncChunkStore, AsyncDocumentStore, ChunkStore, DocumentStore
+from kb_core.ports.tokens import TokenCounter
+from kb_core.ports.vector import AsyncVectorIndex, VectorIndex
 
 __all__ = [
+    "AsyncChunkStore",
+    "AsyncDocumentStore",
+    "AsyncEmbedder",
+    "AsyncLLMClient",
+    "AsyncVectorIndex",
     "BlobStore",
     "ChunkStore",
     "CollectionStore",
     "DocumentStore",
     "Embedder",
+    "EmbeddingCache",
+    "EmbeddingModelStore",
     "JobStore",
+    "LexicalIndex",
     "LLMClient",
+    "ParsedArtifactStore",
+    "ParsedArtifactWriter",
     "Parser",
+    "Reranker",
+    "TokenCounter",
     "VectorIndex",
-]
+]
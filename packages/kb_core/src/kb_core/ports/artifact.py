@@ -0,0 +1,21 @@
+from typing import Any, Protocol
+
+from kb_core.models import ParsedDocument, ParsedSection
+
+
+class ParsedArtifactWriter(Protocol):
+    def add(self, section: ParsedSection) -> None: ...
+
+    def commit(self, metadata: dict[str, Any]) -> None: ...
+
+    def abort(self) -> None: ...
+
+
+class ParsedArtifactStore(Protocol):
+    """Parsed text kept from ingest so views and re-chunking never re-run the parser."""
+
+    def open_writer(self, key: str) -> ParsedArtifactWriter: ...
+
+    def read(self, key: str) -> ParsedDocument | None: ...
+
+    def delete_prefix(self, prefix: str) -> None: ...
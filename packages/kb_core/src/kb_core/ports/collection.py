@@ -1,6 +1,6 @@
 from typing import Protocol
 
-from kb_core.models import Collection
+from kb_core.models import Collection, EmbeddingModelInfo
 
 
 class CollectionStore(Protocol):
@@ -10,4 +10,12 @@ class CollectionStore(Protocol):
 
     def list_collections(self, limit: int, offset: int) -> list[Collection]: ...
 
-    def delete_collection(self, collection_id: str) -> None: ...
+    def delete_collection(self, collection_id: str) -> None: ...
+
+
+class EmbeddingModelStore(Protocol):
+    def get_embedding_model(self, provider: str, model: str) -> EmbeddingModelInfo | None: ...
+
+    def upsert_embedding_model(self, info: EmbeddingModelInfo) -> EmbeddingModelInfo: ...
+
+    def list_embedding_models(self) -> list[EmbeddingModelInfo]: ...
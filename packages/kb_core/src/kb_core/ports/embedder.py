@@ -1,4 +1,5 @@
-from typing import Protocol
+from collections.abc import AsyncIterator, Iterator
+from typing import Any, Protocol
 
 
 class Embedder(Protocol):
@@ -10,5 +11,25 @@ class Embedder(Protocol):
     def embed_query(self, text: str) -> list[float]: ...
 
 
+class AsyncEmbedder(Protocol):
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]: ...
+
+    async def embed_query(self, text: str) -> list[float]: ...
+
+
+class EmbeddingCache(Protocol):
+    def get_many(self, provider: str, model: str, text_hashes: list[str]) -> dict[str, list[float]]: ...
+
+    def put_many(self, provider: str, model: str, vectors: dict[str, list[float]]) -> None: ...
+
+    def stats(self) -> dict[str, Any]: ...
+
+
 class LLMClient(Protocol):
-    def chat(self, messages: list[dict], *, temperature: float = 0.0) -> str: ...
+    def chat(self, messages: list[dict], *, temperature: float = 0.0) -> str: ...
+
+    def stream_chat(self, messages: list[dict], *, temperature: float = 0.0) -> Iterator[str]: ...
+
+
+class AsyncLLMClient(Protocol):
+    def stream_chat(self, messages: list[dict], *, temperature: float = 0.0) -> AsyncIterator[str]: ...
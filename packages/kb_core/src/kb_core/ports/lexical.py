@@ -0,0 +1,7 @@
+from typing import Protocol
+
+from kb_core.models import VectorHit
+
+
+class LexicalIndex(Protocol):
+    def search_chunks(self, query: str, top_k: int, collection_ids: list[str] | None = None) -> list[VectorHit]: ...
@@ -1,9 +1,12 @@
+from collections.abc import Iterator
 from typing import Protocol
 
-from kb_core.models import BlobRef, ParsedDocument, ParseOptions
+from kb_core.models import BlobRef, ParsedDocument, ParsedSection, ParseOptions
 
 
 class Parser(Protocol):
     def can_parse(self, mime: str, ext: str) -> bool: ...
 
-    def parse(self, blob: BlobRef, opts: ParseOptions) -> ParsedDocument: ...
+    def parse(self, blob: BlobRef, opts: ParseOptions) -> ParsedDocument: ...
+
+    def iter_sections(self, blob: BlobRef, opts: ParseOptions) -> Iterator[ParsedSection]: ...
@@ -0,0 +1,8 @@
+from typing import Protocol
+
+
+class Reranker(Protocol):
+    @property
+    def model(self) -> str: ...
+
+    def score(self, query: str, texts: list[str]) -> list[float]: ...
@@ -8,6 +8,10 @@ class DocumentStore(Protocol):
 
     def get_document(self, document_id: str) -> Document | None: ...
 
+    def get_documents(self, document_ids: list[str]) -> list[Document]: ...
+
+    def find_document_by_hash(self, content_hash: str, collection_id: str | None = None) -> Document | None: ...
+
     def list_documents(self, collection_id: str, limit: int, offset: int) -> list[Document]: ...
 
     def update_document(self, doc: Document) -> Document: ...
@@ -23,3 +27,11 @@ class ChunkStore(Protocol):
     def list_chunks_by_document(self, document_id: str, limit: int, offset: int) -> list[Chunk]: ...
 
     def delete_chunks_by_document(self, document_id: str) -> None: ...
+
+
+class AsyncDocumentStore(Protocol):
+    async def get_documents(self, document_ids: list[str]) -> list[Document]: ...
+
+
+class AsyncChunkStore(Protocol):
+    async def get_chunks(self, chunk_ids: list[str]) -> list[Chunk]: ...
@@ -0,0 +1,7 @@
+from typing import Protocol
+
+
+class TokenCounter(Protocol):
+    def count(self, text: str) -> int: ...
+
+    def count_batch(self, texts: list[str]) -> list[int]: ...
@@ -11,6 +11,25 @@ class VectorIndex(Protocol):
         vector: list[float],
         top_k: int,
         filter: MetadataFilter | None = None,
+        collection_ids: list[str] | None = None,
+        include_vectors: bool = False,
     ) -> list[VectorHit]: ...
 
-    def delete_by_document(self, collection_id: str, document_id: str) -> None: ...
+    def get_vectors(self, collection_id: str, vector_ids: list[str]) -> dict[str, list[float]]: ...
+
+    def delete_by_document(self, collection_id: str, document_id: str) -> None: ...
+
+    def delete_collection(self, collection_id: str) -> None: ...
+
+
+class AsyncVectorIndex(Protocol):
+    async def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        filter: MetadataFilter | None = None,
+        collection_ids: list[str] | None = None,
+        include_vectors: bool = False,
+    ) -> list[VectorHit]: ...
+
+    async def get_vectors(self, collection_id: str, vector_ids: list[str]) -> dict[str, list[float]]: ...
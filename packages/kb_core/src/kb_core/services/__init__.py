@@ -1,4 +1,44 @@
-from kb_core.services.chunker import chunk_text, estimate_token_count
+from kb_core.services.async_bridge import (
+    ThreadedChunkStore,
+    ThreadedDocumentStore,
+    ThreadedEmbedder,
+    ThreadedVectorIndex,
+)
+from kb_core.services.cache import LRUCache, QueryEmbeddingCache, normalize_query
+from kb_core.services.chunker import (
+    chunk_text,
+    estimate_token_count,
+    iter_chunk_spans,
+    iter_chunk_text,
+    iter_section_chunks,
+)
+from kb_core.services.embedding_cache import CachedEmbedder, text_hash
+from kb_core.services.fusion import reciprocal_rank_fusion
+from kb_core.services.lexical import build_match_query, lexical_terms, segment_for_index
 from kb_core.services.metadata_filter import match_metadata
+from kb_core.services.mmr import mmr_select
+from kb_core.services.tokens import HeuristicTokenCounter
 
-__all__ = ["chunk_text", "estimate_token_count", "match_metadata"]
+__all__ = [
+    "CachedEmbedder",
+    "HeuristicTokenCounter",
+    "LRUCache",
+    "QueryEmbeddingCache",
+    "ThreadedChunkStore",
+    "ThreadedDocumentStore",
+    "ThreadedEmbedder",
+    "ThreadedVectorIndex",
+    "build_match_query",
+    "chunk_text",
+    "estimate_token_count",
+    "iter_chunk_spans",
+    "iter_chunk_text",
+    "iter_section_chunks",
+    "lexical_terms",
+    "match_metadata",
+    "mmr_select",
+    "normalize_query",
+    "reciprocal_rank_fusion",
+    "segment_for_index",
+    "text_hash",
+]
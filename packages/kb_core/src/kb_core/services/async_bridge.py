@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor
+from functools import partial
+from typing import TypeVar
+
+from kb_core.models import Chunk, Document, MetadataFilter, VectorHit
+from kb_core.ports import ChunkStore, DocumentStore, Embedder, VectorIndex
+
+T = TypeVar("T")
+
+
+class _Offloaded:
+    """Runs blocking adapter calls on ``executor`` (the loop's default executor when ``None``)."""
+
+    def __init__(self, executor: Executor | None = None) -> None:
+        self._executor = executor
+
+    async def _run(self, func: Callable[..., T], *args: object, **kwargs: object) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+
+class ThreadedEmbedder(_Offloaded):
+    def __init__(self, inner: Embedder, executor: Executor | None = None) -> None:
+        super().__init__(executor)
+        self._inner = inner
+
+    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        return await self._run(self._inner.embed_texts, texts)
+
+    async def embed_query(self, text: str) -> list[float]:
+        return await self._run(self._inner.embed_query, text)
+
+
+class ThreadedVectorIndex(_Offloaded):
+    def __init__(self, inner: VectorIndex, executor: Executor | None = None) -> None:
+        super().__init__(executor)
+        self._inner = inner
+
+    async def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        filter: MetadataFilter | None = None,
+        collection_ids: list[str] | None = None,
+        include_vectors: bool = False,
+    ) -> list[VectorHit]:
+        return await self._run(
+            self._inner.query,
+            vector,
+            top_k,
+            filter=filter,
+            collection_ids=collection_ids,
+            include_vectors=include_vectors,
+        )
+
+    async def get_vectors(self, collection_id: str, vector_ids: list[str]) -> dict[str, list[float]]:
+        return await self._run(self._inner.get_vectors, collection_id, vector_ids)
+
+
+class ThreadedDocumentStore(_Offloaded):
+    def __init__(self, inner: DocumentStore, executor: Executor | None = None) -> None:
+        super().__init__(executor)
+        self._inner = inner
+
+    async def get_documents(self, document_ids: list[str]) -> list[Document]:
+        return await self._run(self._inner.get_documents, document_ids)
+
+
+class ThreadedChunkStore(_Offloaded):
+    def __init__(self, inner: ChunkStore, executor: Executor | None = None) -> None:
+        super().__init__(executor)
+        self._inner = inner
+
+    async def get_chunks(self, chunk_ids: list[str]) -> list[Chunk]:
+        return await self._run(self._inner.get_chunks, chunk_ids)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from kb_core.ports import AsyncEmbedder, Embedder
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe bounded LRU cache with an optional per-entry TTL."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max(max_entries, 1)
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._ttl is not None and self._clock() - entry[0] > self._ttl:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def put(self, key: K, value: V) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+class QueryEmbeddingCache:
+    """LRU+TTL cache of query vectors for one embedding model, keyed by normalized query text."""
+
+    def __init__(
+        self,
+        *,
+        model: str,
+        max_entries: int = 1024,
+        ttl_seconds: float | None = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._model = model
+        self._cache: LRUCache[tuple[str, str], list[float]] = LRUCache(max_entries, ttl_seconds, clock)
+
+    def embed(self, embedder: Embedder, query: str) -> list[float]:
+        normalized = normalize_query(query)
+        key = (self._model, normalized)
+        vector = self._cache.get(key)
+        if vector is None:
+            vector = embedder.embed_query(normalized)
+            self._cache.put(key, vector)
+        return vector
+
+    async def aembed(self, embedder: AsyncEmbedder, query: str) -> list[float]:
+        normalized = normalize_query(query)
+        key = (self._model, normalized)
+        vector = self._cache.get(key)
+        if vector is None:
+            vector = await embedder.embed_query(normalized)
+            self._cache.put(key, vector)
+        return vector
+
+    def stats(self) -> dict[str, Any]:
+        return {"model": self._model, **self._cache.stats()}
@@ -1,32 +1,227 @@
 from __future__ import annotations
 
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from kb_core.models import ParsedSection
+from kb_core.ports import TokenCounter
+from kb_core.services.tokens import HeuristicTokenCounter
+
+_DEFAULT_COUNTER = HeuristicTokenCounter()
+
 
 def estimate_token_count(text: str) -> int:
-    return len(text.split())
+    return _DEFAULT_COUNTER.count(text)
+
+
+# A chunk ends just after the last paragraph break in the second half of its window, else after
+# the last sentence end, else after the last space.
+_SENTENCE_MARKS = (". ", "! ", "? ", "。", "！", "？", "；", "\n")
+
+
+def _snap_end(text: str, start: int, hi: int) -> int:
+    lo = start + max((hi - start) // 2, 1)
+    pos = text.rfind("\n\n", lo, hi)
+    if pos != -1:
+        return pos + 1
+    best = -1
+    for mark in _SENTENCE_MARKS:
+        pos = text.rfind(mark, lo, hi)
+        if pos > best:
+            best = pos
+    if best == -1:
+        best = text.rfind(" ", lo, hi)
+    return best + 1 if best != -1 else hi
+
+
+def _clamp_to_tokens(text: str, start: int, hi: int, token_limit: int, counter: TokenCounter) -> int:
+    """Return an end in ``(start, hi]`` whose span fits ``token_limit``, close to the largest such end.
+
+    Token counts grow roughly linearly with span length, so the cut is located by interpolating
+    between a fitting and an overflowing end; the result only needs to land within a few
+    characters of the optimum because the window is snapped back to a boundary afterwards.
+    """
+    # The heuristic never counts more than one token per character; real tokenizers can.
+    if isinstance(counter, HeuristicTokenCounter) and hi - start <= token_limit:
+        return hi
+    high_count = counter.count(text[start:hi])
+    if high_count <= token_limit:
+        return hi
+    low, low_count, high = start, 0, hi
+    tolerance = max((hi - start) // 16, 1)
+    good_enough = token_limit - max(token_limit // 20, 1)
+    while high - low > tolerance and low_count < good_enough:
+        guess = low + (high - low) * (token_limit - low_count) // max(high_count - low_count, 1)
+        guess = min(max(guess, low + 1), high - 1)
+        count = counter.count(text[start:guess])
+        if count <= token_limit:
+            low, low_count = guess, count
+        else:
+            high, high_count = guess, count
+    return max(low, start + 1)
 
 
-def chunk_text(text: str, *, chunk_size: int, chunk_overlap: int, token_limit: int | None = None) -> list[str]:
-    content = text.strip()
-    if not content:
-        return []
+def _spans(
+    text: str,
+    start: int,
+    limit: int,
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    token_limit: int | None,
+    counter: TokenCounter | None = None,
+    final: bool = True,
+) -> Iterator[tuple[int, int, int]]:
+    """Yield ``(chunk_start, chunk_end, next_start)`` per window; unless ``final``, only full windows."""
+    counter = counter or _DEFAULT_COUNTER
+    while start < limit and (final or start + chunk_size < limit):
+        hi = min(start + chunk_size, limit)
+        overlap = chunk_overlap
+        if token_limit is not None:
+            clamped = _clamp_to_tokens(text, start, hi, token_limit, counter)
+            if clamped < hi:
+                # A token-dense window keeps the same overlap ratio rather than the full character overlap.
+                overlap = chunk_overlap * (clamped - start) // chunk_size
+                hi = clamped
+        end = limit if hi >= limit else _snap_end(text, start, hi)
+        chunk_start, chunk_end = start, end
+        while chunk_start < chunk_end and text[chunk_start].isspace():
+            chunk_start += 1
+        while chunk_end > chunk_start and text[chunk_end - 1].isspace():
+            chunk_end -= 1
+        if end >= limit:
+            next_start = limit
+        else:
+            # Overlap backs up from the snapped end to a word start, always advancing at least half the chunk.
+            next_start = max(end - overlap, start + max((end - start) // 2, 1))
+            if overlap > 0 and next_start < end:
+                space = text.find(" ", next_start, end)
+                if space != -1:
+                    next_start = space + 1
+        yield chunk_start, chunk_end, next_start
+        start = next_start
 
-    chunks: list[str] = []
+
+def iter_chunk_spans(
+    text: str,
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    token_limit: int | None = None,
+    token_counter: TokenCounter | None = None,
+) -> Iterator[tuple[int, int]]:
+    """Yield ``(start, end)`` offsets of chunks in ``text`` without copying any of it.
+
+    Boundary searches are bounded ``str.rfind`` calls over one window each, so the pass is linear
+    in the text length. A window with no paragraph, sentence or word break is cut at ``chunk_size``.
+    With ``token_limit`` the window is first cut to that many tokens as measured by
+    ``token_counter`` (a script-aware heuristic by default).
+    """
+    for chunk_start, chunk_end, _ in _spans(
+        text,
+        0,
+        len(text),
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        token_limit=token_limit,
+        counter=token_counter,
+    ):
+        if chunk_end > chunk_start:
+            yield chunk_start, chunk_end
+
+
+def iter_chunk_text(
+    text: str,
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    token_limit: int | None = None,
+    token_counter: TokenCounter | None = None,
+) -> Iterator[str]:
+    spans = iter_chunk_spans(
+        text,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        token_limit=token_limit,
+        token_counter=token_counter,
+    )
+    for start, end in spans:
+        yield text[start:end]
+
+
+def chunk_text(
+    text: str,
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    token_limit: int | None = None,
+    token_counter: TokenCounter | None = None,
+) -> list[str]:
+    return list(
+        iter_chunk_text(
+            text,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            token_limit=token_limit,
+            token_counter=token_counter,
+        )
+    )
+
+
+def iter_section_chunks(
+    sections: Iterable[ParsedSection],
+    *,
+    chunk_size: int,
+    chunk_overlap: int,
+    token_limit: int | None = None,
+    token_counter: TokenCounter | None = None,
+) -> Iterator[tuple[str, dict[str, Any], int, int]]:
+    """Chunk a stream of sections as if they were one concatenated text.
+
+    Yields ``(text, metadata, start, end)`` with offsets into the concatenation, matching
+    :func:`iter_chunk_spans` over the joined text. Only the tail of the stream that can still
+    contribute to a window is buffered, so memory stays proportional to ``chunk_size`` plus the
+    largest section. Each chunk carries the metadata of the section its window starts in.
+    """
+    buffer = ""
+    base = 0
     start = 0
-    text_len = len(content)
-    step = max(chunk_size - chunk_overlap, 1)
+    total = 0
+    mark_offsets: list[int] = []
+    mark_metadata: list[dict[str, Any]] = []
+
+    def emit(final: bool) -> Iterator[tuple[str, dict[str, Any], int, int]]:
+        nonlocal start
+        for chunk_start, chunk_end, next_start in _spans(
+            buffer,
+            start - base,
+            total - base,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            token_limit=token_limit,
+            counter=token_counter,
+            final=final,
+        ):
+            if chunk_end > chunk_start:
+                metadata = mark_metadata[max(bisect_right(mark_offsets, start) - 1, 0)]
+                yield buffer[chunk_start:chunk_end], metadata, base + chunk_start, base + chunk_end
+            start = base + next_start
 
-    while start < text_len:
-        end = min(start + chunk_size, text_len)
-        candidate = content[start:end].strip()
+    for section in sections:
+        if not section.text:
+            continue
+        mark_offsets.append(total)
+        mark_metadata.append(section.metadata)
+        buffer += section.text
+        total += len(section.text)
 
-        if token_limit is not None and estimate_token_count(candidate) > token_limit:
-            words = candidate.split()
-            candidate = " ".join(words[:token_limit])
+        yield from emit(final=False)
 
-        if candidate:
-            chunks.append(candidate)
-        if end >= text_len:
-            break
-        start += step
+        buffer = buffer[start - base :]
+        base = start
+        keep = max(bisect_right(mark_offsets, start) - 1, 0)
+        del mark_offsets[:keep]
+        del mark_metadata[:keep]
 
-    return chunks
+    yield from emit(final=True)
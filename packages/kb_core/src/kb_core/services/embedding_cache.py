@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import threading
+from hashlib import sha256
+from typing import Any
+
+from kb_core.ports import Embedder, EmbeddingCache
+
+
+def text_hash(text: str) -> str:
+    return sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedEmbedder:
+    """Embedder wrapper that serves previously embedded texts from a persistent cache.
+
+    Cache misses of one ``embed_texts`` call are still sent to the wrapped embedder as a single
+    batch. Queries bypass the persistent cache.
+    """
+
+    def __init__(self, inner: Embedder, cache: EmbeddingCache, *, provider: str, model: str) -> None:
+        self._inner = inner
+        self._cache = cache
+        self._provider = provider
+        self._model = model
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def inner(self) -> Embedder:
+        return self._inner
+
+    @property
+    def dim(self) -> int:
+        return self._inner.dim
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        hashes = [text_hash(text) for text in texts]
+        found = self._cache.get_many(self._provider, self._model, list(dict.fromkeys(hashes)))
+
+        missing: dict[str, str] = {}
+        for digest, text in zip(hashes, texts, strict=True):
+            if digest not in found:
+                missing.setdefault(digest, text)
+        if missing:
+            vectors = self._inner.embed_texts(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors, strict=True))
+            self._cache.put_many(self._provider, self._model, fresh)
+            found.update(fresh)
+
+        with self._lock:
+            self._misses += len(missing)
+            self._hits += len(texts) - len(missing)
+        return [found[digest] for digest in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._inner.embed_query(text)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        total = hits + misses
+        return {
+            "provider": self._provider,
+            "model": self._model,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            **self._cache.stats(),
+        }
@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from kb_core.models import VectorHit
+
+
+def reciprocal_rank_fusion(rankings: list[list[VectorHit]], *, k: int = 60) -> list[VectorHit]:
+    """Merge ranked hit lists by summing ``1 / (k + rank)`` per chunk; the fused value becomes the score."""
+    scores: dict[str, float] = {}
+    first_seen: dict[str, VectorHit] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            scores[hit.chunk_id] = scores.get(hit.chunk_id, 0.0) + 1.0 / (k + rank)
+            first_seen.setdefault(hit.chunk_id, hit)
+    fused = [first_seen[chunk_id].model_copy(update={"score": score}) for chunk_id, score in scores.items()]
+    fused.sort(key=lambda hit: hit.score, reverse=True)
+    return fused
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import re
+
+# Han, kana, hangul and compatibility ideographs: scripts written without spaces between words.
+CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff"
+
+_TERM_RE = re.compile(rf"([{CJK_RANGES}]+)|([^\W{CJK_RANGES}]+)")
+
+
+def _bigrams(run: str) -> list[str]:
+    if len(run) == 1:
+        return [run]
+    return [run[i : i + 2] for i in range(len(run) - 1)]
+
+
+def _term_groups(text: str) -> list[list[str]]:
+    groups: list[list[str]] = []
+    for match in _TERM_RE.finditer(text):
+        cjk, word = match.groups()
+        groups.append(_bigrams(cjk) if cjk else [word.lower()])
+    return groups
+
+
+def lexical_terms(text: str) -> list[str]:
+    """Split text into index terms: lowercased words, and overlapping bigrams inside CJK runs."""
+    return [term for group in _term_groups(text) for term in group]
+
+
+def segment_for_index(text: str) -> str:
+    """Index terms as a space-separated string.
+
+    Each CJK run also ends with its last character as a unigram, so every character of the run
+    starts some term and a one-character query can match by prefix.
+    """
+    terms: list[str] = []
+    for match in _TERM_RE.finditer(text):
+        cjk, word = match.groups()
+        if cjk:
+            terms.extend(_bigrams(cjk))
+            if len(cjk) > 1:
+                terms.append(cjk[-1])
+        else:
+            terms.append(word.lower())
+    return " ".join(terms)
+
+
+def build_match_query(query: str) -> str:
+    """Build an FTS5 MATCH expression matching any query word or CJK run (as a bigram phrase).
+
+    A lone CJK character becomes a prefix query, since the index holds it only as a term's first character.
+    """
+    phrases: dict[str, None] = {}
+    for match in _TERM_RE.finditer(query):
+        cjk, word = match.groups()
+        group = _bigrams(cjk) if cjk else [word.lower()]
+        phrase = '"' + " ".join(group).replace('"', '""') + '"'
+        phrases[phrase + "*" if cjk and len(cjk) == 1 else phrase] = None
+    return " OR ".join(phrases)
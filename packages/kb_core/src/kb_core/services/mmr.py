@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+
+
+def mmr_select(
+    candidate_vectors: np.ndarray,
+    *,
+    k: int,
+    query_vector: Sequence[float] | None = None,
+    relevance: Sequence[float] | None = None,
+    lambda_mult: float = 0.5,
+    groups: Sequence[str] | None = None,
+    max_per_group: int | None = None,
+) -> list[int]:
+    """Pick up to ``k`` candidate indices by maximal marginal relevance.
+
+    Relevance is ``relevance`` when given (one score per candidate, higher is better, ideally in
+    [0, 1]) and otherwise the cosine similarity to ``query_vector``. Redundancy is the cosine
+    similarity to the closest already-selected candidate. ``groups`` with ``max_per_group`` caps
+    how many picks may share a group, e.g. a document id. Each step is one matrix-vector product
+    over the candidate matrix, so the cost is O(k * n * dim).
+    """
+    n = candidate_vectors.shape[0]
+    if n == 0 or k <= 0:
+        return []
+    raw = np.asarray(candidate_vectors, dtype=np.float32)
+    norms = np.linalg.norm(raw, axis=1, keepdims=True)
+    vectors = (raw / np.where(norms == 0, 1.0, norms)).astype(np.float32, copy=False)
+
+    if relevance is not None:
+        rel = np.asarray(relevance, dtype=np.float32)
+    elif query_vector is not None:
+        query = np.asarray(query_vector, dtype=np.float32)
+        rel = vectors @ (query / (np.linalg.norm(query) or 1.0))
+    else:
+        raise ValueError("mmr_select needs either query_vector or relevance")
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+
+    group_index: np.ndarray | None = None
+    group_counts: np.ndarray | None = None
+    if groups is not None and max_per_group is not None:
+        labels, group_index = np.unique(np.asarray(groups), return_inverse=True)
+        group_counts = np.zeros(len(labels), dtype=np.int64)
+
+    selected: list[int] = []
+    while len(selected) < k and available.any():
+        redundancy = np.where(np.isfinite(max_sim), max_sim, 0.0)
+        scores = lambda_mult * rel - (1.0 - lambda_mult) * redundancy
+        scores = np.where(available, scores, -np.inf)
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(max_sim, vectors @ vectors[pick], out=max_sim)
+
+        if group_index is not None and group_counts is not None and max_per_group is not None:
+            group = group_index[pick]
+            group_counts[group] += 1
+            if group_counts[group] >= max_per_group:
+                available &= group_index != group
+    return selected
@@ -11,6 +11,58 @@ def test_chunk_text_respects_overlap() -> None:
     assert chunks[0][-5:] == chunks[1][:5]
 
 
+def test_chunk_spans_snap_to_sentences_and_index_source() -> None:
+    from kb_core.services import iter_chunk_spans
+
+    text = "  First sentence here. Second one follows!\n\nNew paragraph starts now. 第二段。还有内容。"
+    spans = list(iter_chunk_spans(text, chunk_size=30, chunk_overlap=0))
+
+    assert [text[start:end] for start, end in spans] == [
+        "First sentence here.",
+        "Second one follows!",
+        "New paragraph starts now.",
+        "第二段。还有内容。",
+    ]
+    assert spans[0][0] == 2
+
+
+def test_token_budget_counts_cjk_and_caps_chunks() -> None:
+    from kb_core.services import HeuristicTokenCounter, iter_chunk_spans
+
+    counter = HeuristicTokenCounter()
+    assert counter.count("abcdefgh") == 2
+    assert counter.count("知识库检索") == 5
+    assert counter.count_batch(["hello world", "检索 test"]) == [3, 4]
+
+    text = "这是一个用于测试分块的句子。" * 60
+    spans = list(iter_chunk_spans(text, chunk_size=400, chunk_overlap=40, token_limit=50))
+
+    assert len(spans) > 1
+    assert all(counter.count(text[start:end]) <= 50 for start, end in spans)
+    assert spans[-1][1] == len(text)
+
+
+class ByteTokenCounter:
+    """Three tokens per non-ASCII character, like byte-level BPE on CJK text."""
+
+    def count(self, text: str) -> int:
+        return sum(1 if ch.isascii() else 3 for ch in text)
+
+    def count_batch(self, texts: list[str]) -> list[int]:
+        return [self.count(text) for text in texts]
+
+
+def test_token_budget_holds_when_tokens_outnumber_characters() -> None:
+    from kb_core.services import iter_chunk_spans
+
+    counter = ByteTokenCounter()
+    text = "这是一个用于测试分块的句子。" * 60 + "短句。" * 5
+    spans = list(iter_chunk_spans(text, chunk_size=800, chunk_overlap=80, token_limit=100, token_counter=counter))
+
+    assert all(counter.count(text[start:end]) <= 100 for start, end in spans)
+    assert spans[-1][1] == len(text)
+
+
 def test_match_metadata_equals() -> None:
     from kb_core.models import MetadataFilter
 
@@ -23,4 +75,78 @@ def test_citation_structure() -> None:
     citation = Citation(document_id="d1", chunk_id="c1", snippet="hello", page=1)
     hit = RetrieveHit(chunk_id="c1", score=0.8, citation=citation, document={"id": "d1"})
     assert hit.citation.document_id == "d1"
-    assert hit.citation.page == 1
+    assert hit.citation.page == 1
+
+
+def test_query_embedding_cache_normalizes_and_expires() -> None:
+    from kb_core.services import QueryEmbeddingCache
+
+    class Embedder:
+        def __init__(self) -> None:
+            self.calls: list[str] = []
+
+        def embed_query(self, text: str) -> list[float]:
+            self.calls.append(text)
+            return [float(len(text))]
+
+    now = [0.0]
+    embedder = Embedder()
+    cache = QueryEmbeddingCache(model="m", max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+
+    assert cache.embed(embedder, "error  E42 ") == cache.embed(embedder, "error E42")
+    now[0] = 11.0
+    cache.embed(embedder, "error E42")
+
+    assert embedder.calls == ["error E42", "error E42"]
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["expirations"] == 1
+
+
+def test_lru_cache_evicts_oldest_entry() -> None:
+    from kb_core.services import LRUCache
+
+    cache: LRUCache[str, int] = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_mmr_select_skips_near_duplicates() -> None:
+    import numpy as np
+    from kb_core.services import mmr_select
+
+    vectors = np.array([[1.0, 0.0], [0.99, 0.01], [0.6, 0.8]])
+    query = [1.0, 0.2]
+
+    assert mmr_select(vectors, k=2, query_vector=query, lambda_mult=1.0) == [1, 0]
+    assert mmr_select(vectors, k=2, query_vector=query, lambda_mult=0.5) == [1, 2]
+    assert mmr_select(vectors, k=3, relevance=[1.0, 0.9, 0.1], groups=["a", "a", "b"], max_per_group=1) == [0, 2]
+
+
+def test_answer_prompt_packs_context_in_rank_order() -> None:
+    from kb_core.pipelines import build_answer_messages, pack_context
+
+    hits = [
+        RetrieveHit(
+            chunk_id=f"c{n}",
+            score=1.0 / n,
+            text=text,
+            citation=Citation(document_id=f"d{n}", chunk_id=f"c{n}", snippet=text[:5]),
+            document={"id": f"d{n}", "title": f"Doc {n}"},
+        )
+        for n, text in enumerate(["a" * 50, "b" * 40, "c" * 30], start=1)
+    ]
+
+    assert [hit.chunk_id for hit in pack_context(hits, max_chars=95)] == ["c1", "c2"]
+    assert [hit.chunk_id for hit in pack_context(hits, max_chars=10)] == ["c1"]
+    messages = build_answer_messages("why?", pack_context(hits, max_chars=95))
+    assert messages[0]["role"] == "system"
+    assert messages[1]["content"].startswith("Context:\n[1] Doc 1\n" + "a" * 50 + "\n\n[2] Doc 2")
+    assert messages[1]["content"].endswith("Question: why?")
@@ -0,0 +1,834 @@
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+
+from kb_core.models import (
+    BlobRef,
+    Chunk,
+    Collection,
+    Document,
+    DocumentStatus,
+    IngestOptions,
+    MetadataFilter,
+    ParsedDocument,
+    ParsedSection,
+    ParseOptions,
+    RetrieveOptions,
+    VectorHit,
+    VectorItem,
+)
+from kb_core.pipelines import (
+    IngestTask,
+    RerankScoreCache,
+    StagedIngestPipeline,
+    aretrieve,
+    delete_document,
+    get_document_original,
+    ingest_document,
+    rechunk_document,
+    rerank_candidates,
+    retrieve,
+)
+from kb_core.services import (
+    ThreadedChunkStore,
+    ThreadedDocumentStore,
+    ThreadedEmbedder,
+    ThreadedVectorIndex,
+    chunk_text,
+    iter_section_chunks,
+)
+
+
+class MemoryBlobStore:
+    def put(self, data: bytes, *, name: str, mime: str) -> BlobRef:
+        return BlobRef(id=name, path=f"/mem/{name}", name=name, mime=mime)
+
+    def get(self, ref: BlobRef) -> bytes:
+        return b""
+
+
+class MemoryRepo:
+    def __init__(self) -> None:
+        self.documents: dict[str, Document] = {}
+        self.chunks: dict[str, Chunk] = {}
+        self.chunk_batches: list[int] = []
+        self.document_lookups = 0
+
+    def create_document(self, doc: Document) -> Document:
+        self.documents[doc.id] = doc.model_copy()
+        return doc
+
+    def get_document(self, document_id: str) -> Document | None:
+        return self.documents.get(document_id)
+
+    def get_documents(self, document_ids: list[str]) -> list[Document]:
+        self.document_lookups += 1
+        return [self.documents[doc_id] for doc_id in document_ids if doc_id in self.documents]
+
+    def find_document_by_hash(self, content_hash: str, collection_id: str | None = None) -> Document | None:
+        for doc in self.documents.values():
+            if doc.hash != content_hash or doc.status != DocumentStatus.INGESTED:
+                continue
+            if collection_id is None or doc.collection_id == collection_id:
+                return doc
+        return None
+
+    def list_documents(self, collection_id: str, limit: int, offset: int) -> list[Document]:
+        docs = [d for d in self.documents.values() if d.collection_id == collection_id]
+        return docs[offset : offset + limit]
+
+    def update_document(self, doc: Document) -> Document:
+        self.documents[doc.id] = doc.model_copy()
+        return doc
+
+    def delete_document(self, document_id: str) -> None:
+        self.documents.pop(document_id, None)
+
+    def upsert_chunks(self, chunks: list[Chunk]) -> None:
+        self.chunk_batches.append(len(chunks))
+        for chunk in chunks:
+            self.chunks[chunk.id] = chunk
+
+    def get_chunks(self, chunk_ids: list[str]) -> list[Chunk]:
+        return [self.chunks[cid] for cid in chunk_ids if cid in self.chunks]
+
+    def list_chunks_by_document(self, document_id: str, limit: int, offset: int) -> list[Chunk]:
+        chunks = sorted((c for c in self.chunks.values() if c.document_id == document_id), key=lambda c: c.order)
+        return chunks[offset : offset + limit]
+
+    def delete_chunks_by_document(self, document_id: str) -> None:
+        self.chunks = {cid: c for cid, c in self.chunks.items() if c.document_id != document_id}
+
+
+class MemoryVectorIndex:
+    def __init__(self) -> None:
+        self.items: dict[str, VectorItem] = {}
+        self.queried_collections: list[str] | None = None
+        self.query_sizes: list[int] = []
+
+    def upsert(self, items: list[VectorItem]) -> None:
+        for item in items:
+            self.items[item.id] = item
+
+    def query(
+        self,
+        vector: list[float],
+        top_k: int,
+        filter: MetadataFilter | None = None,
+        collection_ids: list[str] | None = None,
+        include_vectors: bool = False,
+    ) -> list[VectorHit]:
+        self.queried_collections = collection_ids
+        self.query_sizes.append(top_k)
+        scored = [
+            VectorHit(
+                id=item.id,
+                score=sum(a * b for a, b in zip(vector, item.vector, strict=False)),
+                collection_id=item.collection_id,
+                document_id=item.document_id,
+                chunk_id=item.chunk_id,
+                metadata=item.metadata,
+                vector=item.vector if include_vectors else None,
+            )
+            for item in self.items.values()
+            if collection_ids is None or item.collection_id in collection_ids
+        ]
+        scored.sort(key=lambda hit: hit.score, reverse=True)
+        return scored[:top_k]
+
+    def get_vectors(self, collection_id: str, vector_ids: list[str]) -> dict[str, list[float]]:
+        return {vid: self.items[vid].vector for vid in vector_ids if vid in self.items}
+
+    def delete_by_document(self, collection_id: str, document_id: str) -> None:
+        self.items = {k: v for k, v in self.items.items() if v.document_id != document_id}
+
+    def delete_collection(self, collection_id: str) -> None:
+        self.items = {k: v for k, v in self.items.items() if v.collection_id != collection_id}
+
+
+class CountingEmbedder:
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    @property
+    def dim(self) -> int:
+        return 2
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        self.calls.append(len(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float(len(text)), 1.0]
+
+
+class PagedParser:
+    def __init__(self, pages: list[str], fail_after: int | None = None) -> None:
+        self._pages = pages
+        self._fail_after = fail_after
+
+    def can_parse(self, mime: str, ext: str) -> bool:
+        return True
+
+    def parse(self, blob: BlobRef, opts: ParseOptions) -> ParsedDocument:
+        return ParsedDocument(text="".join(self._pages), metadata={"parser": "paged"})
+
+    def iter_sections(self, blob: BlobRef, opts: ParseOptions) -> Iterator[ParsedSection]:
+        for page, text in enumerate(self._pages, start=1):
+            if self._fail_after is not None and page > self._fail_after:
+                raise RuntimeError("parser crashed")
+            yield ParsedSection(text=text, metadata={"parser": "paged", "page": page})
+
+
+def test_iter_section_chunks_matches_chunk_text() -> None:
+    pages = ["alpha beta gamma " * 7, "delta epsilon " * 11, "zeta " * 3]
+    streamed = list(iter_section_chunks([ParsedSection(text=p) for p in pages], chunk_size=40, chunk_overlap=10))
+
+    joined = "".join(pages)
+    assert [piece for piece, *_ in streamed] == chunk_text(joined, chunk_size=40, chunk_overlap=10)
+    assert all(joined[start:end] == piece for piece, _, start, end in streamed)
+
+
+def test_iter_section_chunks_tags_starting_section() -> None:
+    sections = [ParsedSection(text="a" * 30, metadata={"page": 1}), ParsedSection(text="b" * 30, metadata={"page": 2})]
+    streamed = list(iter_section_chunks(sections, chunk_size=20, chunk_overlap=0))
+
+    assert [meta["page"] for _, meta, *_ in streamed] == [1, 1, 2]
+
+
+def _ingest(
+    repo: MemoryRepo,
+    index: MemoryVectorIndex,
+    embedder: CountingEmbedder,
+    parser: PagedParser,
+    collection_id: str = "c1",
+    **opts,
+):
+    return ingest_document(
+        collection_id=collection_id,
+        filename="book.txt",
+        mime="text/plain",
+        content=b"book",
+        blob_store=MemoryBlobStore(),
+        document_store=repo,
+        chunk_store=repo,
+        vector_index=index,
+        embedder=embedder,
+        parsers=[parser],
+        options=IngestOptions(chunk_size=50, chunk_overlap=0, **opts),
+    )
+
+
+def test_streaming_ingest_commits_fixed_size_batches() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    parser = PagedParser(["x" * 120, "y" * 130])
+
+    document = _ingest(repo, index, embedder, parser, streaming=True, batch_size=2)
+
+    assert document.status == DocumentStatus.INGESTED
+    assert document.metadata["parser"] == "paged"
+    assert "page" not in document.metadata
+    assert embedder.calls == [2, 2, 1]
+    assert repo.chunk_batches == [2, 2, 1]
+    assert sorted(c.order for c in repo.chunks.values()) == [0, 1, 2, 3, 4]
+    assert len(index.items) == 5
+
+
+def test_streaming_ingest_keeps_committed_batches_on_failure() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    parser = PagedParser(["x" * 200, "y" * 200], fail_after=1)
+
+    try:
+        _ingest(repo, index, embedder, parser, streaming=True, batch_size=2)
+    except RuntimeError:
+        pass
+
+    (document,) = repo.documents.values()
+    assert document.status == DocumentStatus.FAILED
+    assert len(repo.chunks) == 2
+
+
+class NamedTextParser(PagedParser):
+    """Returns a per-file text keyed by the blob name, so each submitted document differs."""
+
+    def __init__(self, texts: dict[str, str]) -> None:
+        super().__init__([])
+        self.texts = texts
+
+    def parse(self, blob: BlobRef, opts: ParseOptions) -> ParsedDocument:
+        return ParsedDocument(text=self.texts[blob.name], metadata={"parser": "named"})
+
+
+class PoisonEmbedder(CountingEmbedder):
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        if any("poison" in text for text in texts):
+            raise RuntimeError("embedding failed")
+        return super().embed_texts(texts)
+
+
+def test_staged_pipeline_ingests_documents_and_reports_stages() -> None:
+    repo, index = MemoryRepo(), MemoryVectorIndex()
+    texts = {f"doc{i}.txt": f"document {i} " * 40 for i in range(4)}
+    texts["bad.txt"] = "fine text " * 10 + "poison " * 30
+    parser = NamedTextParser(texts)
+    pipeline = StagedIngestPipeline(
+        blob_store=MemoryBlobStore(),
+        document_store=repo,
+        chunk_store=repo,
+        vector_index=index,
+        embedder=PoisonEmbedder(),
+        parsers=[parser],
+        parse_workers=2,
+        embed_workers=2,
+        queue_size=2,
+    )
+    results: dict[str, tuple[Document | None, BaseException | None]] = {}
+    progress: dict[str, list[int]] = {}
+    finished = threading.Semaphore(0)
+
+    def submit(name: str) -> None:
+        def on_done(document: Document | None, error: BaseException | None) -> None:
+            results[name] = (document, error)
+            finished.release()
+
+        pipeline.submit(
+            IngestTask(
+                collection_id="c1",
+                filename=name,
+                mime="text/plain",
+                content=name.encode(),
+                options=IngestOptions(chunk_size=50, chunk_overlap=0, batch_size=2),
+                on_progress=lambda count: progress.setdefault(name, []).append(count),
+                on_done=on_done,
+            )
+        )
+
+    pipeline.start()
+    try:
+        for name in parser.texts:
+            submit(name)
+        for _ in parser.texts:
+            assert finished.acquire(timeout=5)
+    finally:
+        pipeline.stop()
+
+    for i in range(4):
+        document, error = results[f"doc{i}.txt"]
+        assert error is None and document is not None
+        assert repo.documents[document.id].status == DocumentStatus.INGESTED
+        assert repo.documents[document.id].metadata["parser"] == "named"
+        orders = sorted(c.order for c in repo.chunks.values() if c.document_id == document.id)
+        assert orders == list(range(len(orders)))
+        assert progress[f"doc{i}.txt"][-1] == len(orders)
+    bad, error = results["bad.txt"]
+    assert isinstance(error, RuntimeError)
+    assert bad is not None and repo.documents[bad.id].status == DocumentStatus.FAILED
+
+    stats = pipeline.stats()
+    assert stats["documents_in_flight"] == 0
+    assert stats["stages"]["parse"]["processed"] == 5
+    assert stats["stages"]["embed"]["failed"] >= 1
+    assert stats["stages"]["upsert"]["chunks"] == sum(batch for batch in repo.chunk_batches)
+    assert stats["stages"]["embed"]["workers"] == 2
+
+
+class SlowEmbedder(CountingEmbedder):
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+        self.started = threading.Event()
+
+    def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        self.started.set()
+        time.sleep(self.delay)
+        return super().embed_texts(texts)
+
+
+def _staged(repo: MemoryRepo, embedder: CountingEmbedder, **kwargs) -> StagedIngestPipeline:
+    return StagedIngestPipeline(
+        blob_store=MemoryBlobStore(),
+        document_store=repo,
+        chunk_store=repo,
+        vector_index=MemoryVectorIndex(),
+        embedder=embedder,
+        parsers=[PagedParser(["x" * 120])],
+        **kwargs,
+    )
+
+
+def _collect(pipeline: StagedIngestPipeline, count: int, **opts) -> tuple[list, threading.Semaphore]:
+    results: list[tuple[Document | None, BaseException | None]] = []
+    finished = threading.Semaphore(0)
+
+    def on_done(document: Document | None, error: BaseException | None) -> None:
+        results.append((document, error))
+        finished.release()
+
+    for _ in range(count):
+        pipeline.submit(
+            IngestTask(
+                collection_id="c1",
+                filename="same.txt",
+                mime="text/plain",
+                content=b"same bytes",
+                options=IngestOptions(chunk_size=50, chunk_overlap=0, **opts),
+                on_done=on_done,
+            )
+        )
+    return results, finished
+
+
+def test_staged_pipeline_deduplicates_concurrent_uploads() -> None:
+    repo, embedder = MemoryRepo(), SlowEmbedder(delay=0.05)
+    pipeline = _staged(repo, embedder, parse_workers=3)
+    pipeline.start()
+    try:
+        results, finished = _collect(pipeline, 3, dedup="reuse")
+        for _ in range(3):
+            assert finished.acquire(timeout=5)
+    finally:
+        pipeline.stop()
+
+    assert len(repo.documents) == 1
+    assert {document.id for document, error in results if error is None and document is not None} == set(repo.documents)
+    assert embedder.calls == [3]
+    assert pipeline.stats()["documents_in_flight"] == 0
+
+
+def test_staged_pipeline_fails_unfinished_tasks_on_stop() -> None:
+    repo, embedder = MemoryRepo(), SlowEmbedder(delay=0.2)
+    pipeline = _staged(repo, embedder)
+    pipeline.start()
+    results, finished = _collect(pipeline, 2, dedup="off")
+    assert embedder.started.wait(timeout=5)
+
+    pipeline.stop()
+
+    for _ in range(2):
+        assert finished.acquire(timeout=1)
+    assert all(isinstance(error, RuntimeError) for _, error in results)
+    assert all(document.status == DocumentStatus.FAILED for document in repo.documents.values())
+    assert pipeline.stats()["documents_in_flight"] == 0
+
+
+class SlowPagedParser(PagedParser):
+    def iter_sections(self, blob: BlobRef, opts: ParseOptions) -> Iterator[ParsedSection]:
+        for section in super().iter_sections(blob, opts):
+            time.sleep(0.02)
+            yield section
+
+
+def test_staged_pipeline_reports_streamed_parse_time() -> None:
+    repo = MemoryRepo()
+    pipeline = StagedIngestPipeline(
+        blob_store=MemoryBlobStore(),
+        document_store=repo,
+        chunk_store=repo,
+        vector_index=MemoryVectorIndex(),
+        embedder=CountingEmbedder(),
+        parsers=[SlowPagedParser(["x" * 120, "y" * 120, "z" * 120])],
+    )
+    pipeline.start()
+    try:
+        results, finished = _collect(pipeline, 1, streaming=True)
+        assert finished.acquire(timeout=5)
+    finally:
+        pipeline.stop()
+
+    assert results[0][1] is None
+    stages = pipeline.stats()["stages"]
+    assert stages["parse"]["streamed_seconds"] >= 0.05
+    assert stages["parse"]["busy_seconds"] < stages["parse"]["streamed_seconds"]
+
+
+class MemoryArtifactStore:
+    def __init__(self) -> None:
+        self.artifacts: dict[str, ParsedDocument] = {}
+
+    def open_writer(self, key: str) -> "MemoryArtifactWriter":
+        return MemoryArtifactWriter(self, key)
+
+    def read(self, key: str) -> ParsedDocument | None:
+        return self.artifacts.get(key)
+
+    def delete_prefix(self, prefix: str) -> None:
+        self.artifacts = {key: value for key, value in self.artifacts.items() if not key.startswith(prefix)}
+
+
+class MemoryArtifactWriter:
+    def __init__(self, store: MemoryArtifactStore, key: str) -> None:
+        self._store = store
+        self._key = key
+        self._sections: list[ParsedSection] = []
+
+    def add(self, section: ParsedSection) -> None:
+        self._sections.append(section)
+
+    def commit(self, metadata: dict) -> None:
+        text = "".join(section.text for section in self._sections)
+        self._store.artifacts[self._key] = ParsedDocument(text=text, metadata=metadata, sections=self._sections)
+
+    def abort(self) -> None:
+        self._sections = []
+
+
+class CountingParser(PagedParser):
+    def __init__(self, pages: list[str]) -> None:
+        super().__init__(pages)
+        self.parses = 0
+
+    def parse(self, blob: BlobRef, opts: ParseOptions) -> ParsedDocument:
+        self.parses += 1
+        return super().parse(blob, opts)
+
+    def iter_sections(self, blob: BlobRef, opts: ParseOptions) -> Iterator[ParsedSection]:
+        self.parses += 1
+        return super().iter_sections(blob, opts)
+
+
+def test_rechunk_and_view_reuse_the_stored_parse() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    parser, artifacts = CountingParser(["page one text " * 10, "page two text " * 10]), MemoryArtifactStore()
+    common = {"document_store": repo, "blob_store": MemoryBlobStore(), "parsers": [parser]}
+
+    document = ingest_document(
+        collection_id="c1",
+        filename="book.txt",
+        mime="text/plain",
+        content=b"book",
+        chunk_store=repo,
+        vector_index=index,
+        embedder=embedder,
+        options=IngestOptions(chunk_size=50, chunk_overlap=0, streaming=True),
+        artifact_store=artifacts,
+        **common,
+    )
+    (key,) = artifacts.artifacts
+    assert key.startswith(f"{document.hash}.countingparser-v")
+    assert artifacts.artifacts[key].metadata == {"parser": "paged"}
+
+    _, text, metadata = get_document_original(document_id=document.id, artifact_store=artifacts, **common)
+    assert text == "page one text " * 10 + "page two text " * 10
+    assert metadata == {"parser": "paged"}
+
+    before = len(repo.chunks)
+    rechunked = rechunk_document(
+        document_id=document.id,
+        chunk_store=repo,
+        vector_index=index,
+        embedder=embedder,
+        options=IngestOptions(chunk_size=100, chunk_overlap=0, batch_size=2),
+        artifact_store=artifacts,
+        **common,
+    )
+
+    assert parser.parses == 1
+    assert rechunked.status == DocumentStatus.INGESTED
+    assert 0 < len(repo.chunks) < before
+    assert set(index.items) == set(repo.chunks)
+    assert {chunk.metadata["page"] for chunk in repo.chunks.values()} == {1, 2}
+
+
+def test_deleting_the_last_document_with_the_content_drops_its_artifact() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    artifacts = MemoryArtifactStore()
+    stores = {"document_store": repo, "chunk_store": repo, "vector_index": index}
+    documents = [
+        ingest_document(
+            collection_id=collection_id,
+            filename="book.txt",
+            mime="text/plain",
+            content=b"book",
+            blob_store=MemoryBlobStore(),
+            embedder=embedder,
+            parsers=[PagedParser(["page one text " * 10])],
+            options=IngestOptions(chunk_size=50, chunk_overlap=0, dedup="clone", dedup_scope="global"),
+            artifact_store=artifacts,
+            **stores,
+        )
+        for collection_id in ("c1", "c2")
+    ]
+    assert documents[1].metadata["cloned_from"] == documents[0].id
+
+    delete_document(collection_id="c1", document_id=documents[0].id, artifact_store=artifacts, **stores)
+    assert len(artifacts.artifacts) == 1
+    delete_document(collection_id="c2", document_id=documents[1].id, artifact_store=artifacts, **stores)
+    assert artifacts.artifacts == {}
+
+
+def test_dedup_reuse_returns_existing_document() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    parser = PagedParser(["x" * 120])
+
+    first = _ingest(repo, index, embedder, parser, dedup="reuse")
+    second = _ingest(repo, index, embedder, parser, dedup="reuse")
+
+    assert second.id == first.id
+    assert len(repo.documents) == 1
+    assert embedder.calls == [3]
+
+
+def test_dedup_clone_copies_vectors_without_embedding() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    parser = PagedParser(["x" * 120])
+
+    source = _ingest(repo, index, embedder, parser, collection_id="c1")
+    clone = _ingest(repo, index, embedder, parser, collection_id="c2", dedup="clone", dedup_scope="global")
+
+    assert clone.id != source.id
+    assert clone.collection_id == "c2"
+    assert clone.blob_ref == source.blob_ref
+    assert clone.metadata["cloned_from"] == source.id
+    assert embedder.calls == [3]
+    cloned_items = [item for item in index.items.values() if item.collection_id == "c2"]
+    assert len(cloned_items) == 3
+    source_items = [item for item in index.items.values() if item.collection_id == "c1"]
+    assert sorted(item.vector for item in cloned_items) == sorted(item.vector for item in source_items)
+
+
+class MemoryCollections:
+    def __init__(self, models: dict[str, str]) -> None:
+        self.collections = {cid: Collection(id=cid, name=cid, embedding_model=model) for cid, model in models.items()}
+
+    def get_collection(self, collection_id: str) -> Collection | None:
+        return self.collections.get(collection_id)
+
+
+def test_dedup_clone_reembeds_across_embedding_models() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    parser = PagedParser(["x" * 120])
+    collections = MemoryCollections({"c1": "ollama:old-model", "c2": "ollama:new-model"})
+
+    source = _ingest(repo, index, embedder, parser, collection_id="c1")
+    for item in list(index.items.values()):
+        # Stand-in for vectors of another model and dimension.
+        index.items[item.id] = item.model_copy(update={"vector": [9.0, 9.0, 9.0]})
+    clone = ingest_document(
+        collection_id="c2",
+        filename="book.txt",
+        mime="text/plain",
+        content=b"book",
+        blob_store=MemoryBlobStore(),
+        document_store=repo,
+        chunk_store=repo,
+        vector_index=index,
+        embedder=embedder,
+        parsers=[parser],
+        options=IngestOptions(chunk_size=50, chunk_overlap=0, dedup="clone", dedup_scope="global"),
+        collection_store=collections,
+    )
+
+    assert clone.metadata["cloned_from"] == source.id
+    assert embedder.calls == [3, 3]
+    assert all(len(item.vector) == 2 for item in index.items.values() if item.collection_id == "c2")
+
+
+def test_retrieve_hydrates_documents_in_one_lookup() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    parser = PagedParser(["x" * 500])
+    _ingest(repo, index, embedder, parser, collection_id="c1")
+    _ingest(repo, index, embedder, PagedParser(["y" * 300]), collection_id="c2")
+
+    result = retrieve(
+        query="q",
+        collection_ids=["c1", "c2"],
+        top_k=20,
+        include_chunks=False,
+        filters=None,
+        embedder=embedder,
+        vector_index=index,
+        chunk_store=repo,
+        document_store=repo,
+    )
+
+    assert len(result.hits) == 16
+    assert {hit.document["collection_id"] for hit in result.hits} == {"c1", "c2"}
+    assert repo.document_lookups == 1
+    assert index.queried_collections == ["c1", "c2"]
+
+
+def test_overfetch_widens_until_top_k_survive_filter() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    _ingest(repo, index, embedder, PagedParser(["x" * 50] * 40), collection_id="c1", streaming=True)
+    # Tag one chunk in ten; the filter only sees chunk metadata, so the index cannot pre-filter.
+    for chunk in repo.chunks.values():
+        chunk.metadata = {"tag": "keep" if chunk.order % 10 == 0 else "drop"}
+
+    def run(options: RetrieveOptions | None):
+        return retrieve(
+            query="q",
+            collection_ids=["c1"],
+            top_k=3,
+            include_chunks=False,
+            filters=MetadataFilter(equals={"tag": "keep"}),
+            embedder=embedder,
+            vector_index=index,
+            chunk_store=repo,
+            document_store=repo,
+            options=options,
+        )
+
+    assert len(run(None).hits) < 3
+    index.query_sizes.clear()
+    result = run(RetrieveOptions(overfetch=True, max_candidates=100))
+
+    assert len(result.hits) == 3
+    assert index.query_sizes[0] == 6
+    assert len(index.query_sizes) > 1
+    # Deeper rounds re-read the earlier candidates; each chunk counts once.
+    assert result.candidates_scanned == min(index.query_sizes[-1], len(repo.chunks))
+
+
+def test_max_per_document_caps_hits_with_and_without_mmr() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    _ingest(repo, index, embedder, PagedParser(["x" * 300]), collection_id="c1")
+    _ingest(repo, index, embedder, PagedParser(["y" * 100]), collection_id="c1")
+
+    def run(options: RetrieveOptions):
+        return retrieve(
+            query="q",
+            collection_ids=["c1"],
+            top_k=4,
+            include_chunks=False,
+            filters=None,
+            embedder=embedder,
+            vector_index=index,
+            chunk_store=repo,
+            document_store=repo,
+            options=options,
+        )
+
+    for options in (RetrieveOptions(max_per_document=2), RetrieveOptions(mmr=True, max_per_document=2)):
+        result = run(options)
+        doc_ids = [hit.document["id"] for hit in result.hits]
+        assert len(doc_ids) == 4
+        assert max(doc_ids.count(doc_id) for doc_id in set(doc_ids)) <= 2
+
+
+def test_aretrieve_matches_sync_retrieve() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    _ingest(repo, index, embedder, PagedParser(["x" * 300]), collection_id="c1")
+    _ingest(repo, index, embedder, PagedParser(["y" * 200]), collection_id="c2")
+    options = RetrieveOptions(mmr=True, max_per_document=3)
+    common = {"query": "q", "collection_ids": ["c1", "c2"], "top_k": 5, "include_chunks": True, "filters": None}
+
+    expected = retrieve(
+        **common, embedder=embedder, vector_index=index, chunk_store=repo, document_store=repo, options=options
+    )
+
+    async def run_concurrently():
+        return await asyncio.gather(
+            *(
+                aretrieve(
+                    **common,
+                    embedder=ThreadedEmbedder(embedder),
+                    vector_index=ThreadedVectorIndex(index),
+                    chunk_store=ThreadedChunkStore(repo),
+                    document_store=ThreadedDocumentStore(repo),
+                    options=options,
+                )
+                for _ in range(8)
+            )
+        )
+
+    for result in asyncio.run(run_concurrently()):
+        assert result.model_dump() == expected.model_dump()
+
+
+class KeywordIndex:
+    def __init__(self, repo: MemoryRepo) -> None:
+        self._repo = repo
+
+    def search_chunks(self, query: str, top_k: int, collection_ids: list[str] | None = None) -> list[VectorHit]:
+        hits = [
+            VectorHit(
+                id=c.id,
+                score=1.0,
+                collection_id=c.collection_id,
+                document_id=c.document_id,
+                chunk_id=c.id,
+            )
+            for c in self._repo.chunks.values()
+            if query in c.text and (collection_ids is None or c.collection_id in collection_ids)
+        ]
+        return hits[:top_k]
+
+
+class FailingEmbedder(CountingEmbedder):
+    def embed_query(self, text: str) -> list[float]:
+        raise AssertionError("lexical mode must not embed the query")
+
+
+def test_lexical_and_hybrid_modes() -> None:
+    repo, index, embedder = MemoryRepo(), MemoryVectorIndex(), CountingEmbedder()
+    _ingest(repo, index, embedder, PagedParser(["x" * 50, "y" * 20 + "E42" + "y" * 27]), streaming=True)
+
+    def run(mode: str, query_embedder: CountingEmbedder):
+        return retrieve(
+            query="E42",
+            collection_ids=["c1"],
+            top_k=2,
+            include_chunks=True,
+            filters=None,
+            embedder=query_embedder,
+            vector_index=index,
+            chunk_store=repo,
+            document_store=repo,
+            options=RetrieveOptions(mode=mode),
+            lexical_index=KeywordIndex(repo),
+        )
+
+    lexical = run("lexical", FailingEmbedder())
+    assert [hit.text for hit in lexical.hits] == ["y" * 20 + "E42" + "y" * 27]
+
+    hybrid = run("hybrid", embedder)
+    assert hybrid.hits[0].text == "y" * 20 + "E42" + "y" * 27
+    assert len(hybrid.hits) == 2
+
+
+class LengthReranker:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.batches: list[int] = []
+        self._delay = delay
+
+    @property
+    def model(self) -> str:
+        return "length"
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        time.sleep(self._delay)
+        self.batches.append(len(texts))
+        return [float(len(text)) for text in texts]
+
+
+def _candidates(lengths: list[int]) -> list[tuple[VectorHit, Chunk]]:
+    pairs = []
+    for idx, length in enumerate(lengths):
+        chunk = Chunk(id=f"c{idx}", collection_id="c1", document_id="d1", text="x" * length, order=idx)
+        hit = VectorHit(id=chunk.id, score=1.0 - idx / 10, collection_id="c1", document_id="d1", chunk_id=chunk.id)
+        pairs.append((hit, chunk))
+    return pairs
+
+
+def test_rerank_candidates_batches_and_caches_scores() -> None:
+    reranker, cache = LengthReranker(), RerankScoreCache(100)
+    candidates = _candidates([5, 30, 10, 20, 1])
+
+    reranked, applied = rerank_candidates("q", candidates, reranker, batch_size=2, score_cache=cache)
+    assert applied
+    assert [chunk.id for _, chunk in reranked] == ["c1", "c3", "c2", "c0", "c4"]
+    assert reranker.batches == [2, 2, 1]
+
+    rerank_candidates("q", candidates, reranker, batch_size=2, score_cache=cache)
+    assert reranker.batches == [2, 2, 1]
+
+
+def test_rerank_candidates_falls_back_when_over_budget() -> None:
+    candidates = _candidates([5, 30, 10, 20])
+    reranker = LengthReranker(delay=0.02)
+
+    reranked, applied = rerank_candidates("q", candidates, reranker, batch_size=1, latency_budget_ms=5)
+
+    assert not applied
+    assert reranked == candidates
@@ -0,0 +1,105 @@
+"""Measure ingest and retrieval throughput with the in-process hashing embedder.
+
+No model server is involved, so the timings isolate chunking, SQLite and Chroma. Run from the
+repo root:
+
+    uv run --package kb-desktop-daemon python scripts/bench_ingest.py --docs 200 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from kb_core.models import Collection, IngestOptions
+from kb_core.pipelines import ingest_document, retrieve
+from kb_desktop_daemon.adapters import (
+    ChromaVectorIndex,
+    HashingEmbedder,
+    LocalBlobStore,
+    SQLiteRepository,
+    default_parsers,
+)
+
+WORDS = (
+    "index vector chunk query retrieval latency embedding document collection storage cache "
+    "throughput parser section token budget ranking score filter metadata batch pipeline"
+).split()
+
+
+def synthetic_document(rng: random.Random, paragraphs: int) -> str:
+    return "\n\n".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))) + "." for _ in range(paragraphs)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100)
+    parser.add_argument("--paragraphs", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    embedder = HashingEmbedder(dim=args.dim)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        repo = SQLiteRepository(str(root / "kb.sqlite3"))
+        vector_index = ChromaVectorIndex(str(root / "chroma"), repo=repo)
+        blob_store = LocalBlobStore(str(root / "blobs"))
+        parsers = default_parsers()
+        collection = repo.create_collection(Collection(name="bench"))
+        options = IngestOptions(chunk_size=800, chunk_overlap=120)
+
+        started = time.perf_counter()
+        for index in range(args.docs):
+            ingest_document(
+                collection_id=collection.id,
+                filename=f"doc-{index}.txt",
+                mime="text/plain",
+                content=synthetic_document(rng, args.paragraphs).encode(),
+                blob_store=blob_store,
+                document_store=repo,
+                chunk_store=repo,
+                vector_index=vector_index,
+                embedder=embedder,
+                parsers=parsers,
+                options=options,
+            )
+        ingest_seconds = time.perf_counter() - started
+        chunks = sum(
+            len(repo.list_chunks_by_document(document.id, limit=100_000, offset=0))
+            for document in repo.list_documents(collection.id, limit=args.docs, offset=0)
+        )
+
+        latencies = []
+        for _ in range(args.queries):
+            query = " ".join(rng.choice(WORDS) for _ in range(4))
+            started = time.perf_counter()
+            retrieve(
+                query=query,
+                collection_ids=[collection.id],
+                top_k=10,
+                include_chunks=False,
+                filters=None,
+                embedder=embedder,
+                vector_index=vector_index,
+                chunk_store=repo,
+                document_store=repo,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    rate = args.docs / ingest_seconds
+    print(f"ingest  : {args.docs} docs / {chunks} chunks in {ingest_seconds:.2f}s ({rate:.1f} docs/s)")
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"retrieve: p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms over {len(latencies)} queries")
+
+
+if __name__ == "__main__":
+    main()
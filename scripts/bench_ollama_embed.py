@@ -0,0 +1,88 @@
+"""Compare per-text vs batched, concurrent Ollama embedding against a local stub server.
+
+The stub charges a fixed per-request latency plus a small per-input cost, roughly how a local
+Ollama behaves once the model is loaded. Run from the repo root:
+
+    uv run --package kb-desktop-daemon python scripts/bench_ollama_embed.py --texts 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from kb_desktop_daemon.adapters.providers import OllamaEmbedder
+
+DIM = 768
+
+
+def make_handler(request_ms: float, per_input_ms: float) -> type[BaseHTTPRequestHandler]:
+    class StubOllama(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:  # noqa: N802
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            inputs = body["input"] if self.path == "/api/embed" else [body["prompt"]]
+            time.sleep((request_ms + per_input_ms * len(inputs)) / 1000)
+            vectors = [[0.001] * DIM for _ in inputs]
+            payload = {"embeddings": vectors} if self.path == "/api/embed" else {"embedding": vectors[0]}
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    return StubOllama
+
+
+def per_text(base_url: str, texts: list[str]) -> None:
+    # The previous OllamaEmbedder: one un-pooled /api/embeddings request per text, sequentially.
+    for text in texts:
+        response = requests.post(f"{base_url}/api/embeddings", json={"model": "stub", "prompt": text}, timeout=60)
+        response.raise_for_status()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--request-ms", type=float, default=5.0)
+    parser.add_argument("--per-input-ms", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.request_ms, args.per_input_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    texts = [f"chunk {i} " + "lorem ipsum " * 40 for i in range(args.texts)]
+
+    try:
+        started = time.perf_counter()
+        per_text(base_url, texts)
+        baseline = time.perf_counter() - started
+
+        embedder = OllamaEmbedder(base_url, "stub", batch_size=args.batch_size, max_concurrency=args.concurrency)
+        started = time.perf_counter()
+        vectors = embedder.embed_texts(texts)
+        batched = time.perf_counter() - started
+        assert len(vectors) == len(texts)
+    finally:
+        server.shutdown()
+
+    print(f"per-text /api/embeddings : {baseline:7.2f}s  {len(texts) / baseline:8.1f} texts/s")
+    print(
+        f"batched /api/embed (batch={args.batch_size}, concurrency={args.concurrency}): "
+        f"{batched:7.2f}s  {len(texts) / batched:8.1f} texts/s  ({baseline / batched:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()